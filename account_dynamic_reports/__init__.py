@@ -1,4 +1,12 @@
 from . import models
 from . import wizard
 from . import report
-from . import controllers
\ No newline at end of file
+from . import controllers
+
+
+def uninstall_hook(cr, registry):
+    ''' The ledger change triggers write into a table dropped with the module '''
+    for table in ('account_move_line', 'account_account'):
+        for operation in ('insert', 'update', 'delete'):
+            cr.execute('DROP TRIGGER IF EXISTS ins_ledger_change_%s_%s ON %s' % (table, operation, table))
+    cr.execute('DROP FUNCTION IF EXISTS ins_ledger_change_notify()')
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 {
     'name' : 'All in one Dynamic Financial Reports v16',
-    'version' : '16.0.6',
+    'version' : '16.0.12',
     'summary': "General Ledger Trial Balance Ageing Balance Sheet Profit and Loss Cash Flow Dynamic",
     'sequence': 15,
     'description': """
@@ -50,6 +50,7 @@
     },
     'license': 'OPL-1',
     'qweb': ['static/src/xml/view.xml'],
+    'uninstall_hook': 'uninstall_hook',
     'installable': True,
     'application': True,
     'auto_install': False,
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+
+
+def migrate(cr, version):
+    """ The ledger changes become one counter row per company and the cached
+    results are stored as JSON: the former change log and pickled results
+    are dropped """
+    cr.execute("DELETE FROM ins_ledger_change")
+    cr.execute("DELETE FROM ins_report_result_cache")
@@ -1,3 +1,5 @@
 from . import res_company
 from . import account_account_type
-from . import account_move_line
\ No newline at end of file
+from . import account_move_line
+from . import report_result_cache
+from . import report_filter_options
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+from odoo import api, models, _
+from odoo.exceptions import UserError
+from odoo.osv import expression
+
+# fields matched by the search term of the filter widgets, per model
+FILTER_OPTION_SEARCH_FIELDS = {
+    'account.account': ['code', 'name'],
+    'account.journal': ['code', 'name'],
+    'res.partner': ['name', 'ref'],
+}
+
+
+class InsReportFilterMixin(models.AbstractModel):
+    """ Options of the many2many filters of the dynamic reports, served one
+        page at a time to the select2 widgets instead of being loaded with
+        the report.
+    """
+    _name = 'ins.report.filter.mixin'
+    _description = 'Dynamic Report Filter Options Mixin'
+
+    # maximum number of options returned by one call
+    _filter_option_limit = 80
+
+    def _get_filter_option_domains(self):
+        ''' Domain of the selectable records of each filter field of the wizard
+        :return: dict field name -> domain '''
+        return {}
+
+    @api.model
+    def _get_filter_option_search_domain(self, model_name, search):
+        fnames = FILTER_OPTION_SEARCH_FIELDS.get(model_name) or [self.env[model_name]._rec_name]
+        return expression.OR([[(fname, 'ilike', search)] for fname in fnames])
+
+    def get_filter_options(self, field_name, search='', offset=0, limit=None):
+        '''
+        Page of the options of a filter widget, called from the select2 widgets
+        :param field_name: many2many filter field of the wizard
+        :param search: text typed in the widget
+        :return: {'results': [{'id': id, 'text': name}], 'more': True if there are more pages}
+        '''
+        domains = self._get_filter_option_domains()
+        if field_name not in domains:
+            raise UserError(_('%s is not a filter of this report.') % field_name)
+        model_name = self._fields[field_name].comodel_name
+        limit = min(int(limit or self._filter_option_limit), self._filter_option_limit)
+        domain = domains[field_name]
+        if search:
+            domain = expression.AND([domain, self._get_filter_option_search_domain(model_name, search)])
+        records = self.env[model_name].search(domain, offset=int(offset or 0), limit=limit + 1)
+        return {
+            'results': [{'id': record_id, 'text': name} for record_id, name in records[:limit].name_get()],
+            'more': len(records) > limit,
+        }
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import logging
+
+import psycopg2
+
+from odoo import api, fields, models, _
+from odoo.tools import date_utils
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 500
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class InsLedgerChange(models.Model):
+    """ Change counter of the ledger of each company.
+
+        The row of a company is bumped by statement level triggers on
+        account_move_line and account_account, its counter is the ledger
+        watermark of the result cache. The bump is transactional: a report
+        computed before the commit of a change is stored under the previous
+        counter, and the lookup of the watermark reads one row per company.
+    """
+    _name = 'ins.ledger.change'
+    _description = 'Ledger Change'
+    _log_access = False
+
+    company_id = fields.Integer(string='Company', required=True)
+    counter = fields.Integer(string='Changes', required=True, default=0)
+
+    def init(self):
+        cr = self.env.cr
+        cr.execute("""
+            DROP INDEX IF EXISTS ins_ledger_change_company_id_id_index;
+            CREATE UNIQUE INDEX IF NOT EXISTS ins_ledger_change_company_id_uniq_index
+                ON ins_ledger_change (company_id);
+
+            CREATE OR REPLACE FUNCTION ins_ledger_change_notify() RETURNS trigger AS $$
+            BEGIN
+                -- the rows are bumped in a stable order to avoid deadlocks between
+                -- transactions, the counter wraps around instead of overflowing
+                INSERT INTO ins_ledger_change (company_id, counter)
+                     SELECT DISTINCT company_id, 1 FROM ins_changed_rows
+                      WHERE company_id IS NOT NULL
+                   ORDER BY company_id
+                ON CONFLICT (company_id) DO UPDATE
+                        SET counter = ins_ledger_change.counter % 2147483647 + 1;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql;
+        """)
+        for table in ('account_move_line', 'account_account'):
+            for operation, transition in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')):
+                trigger = 'ins_ledger_change_%s_%s' % (table, operation.lower())
+                cr.execute("""
+                    DROP TRIGGER IF EXISTS {trigger} ON {table};
+                    CREATE TRIGGER {trigger} AFTER {operation} ON {table}
+                        REFERENCING {transition} TABLE AS ins_changed_rows
+                        FOR EACH STATEMENT EXECUTE FUNCTION ins_ledger_change_notify();
+                """.format(trigger=trigger, table=table, operation=operation, transition=transition))
+
+    @api.model
+    def _get_watermark(self, company_ids):
+        self.env.cr.execute("""
+            SELECT company_id, counter
+              FROM ins_ledger_change
+             WHERE company_id IN %s
+          ORDER BY company_id
+        """, (tuple(company_ids) or (0,),))
+        return self.env.cr.fetchall()
+
+
+class InsReportResultCache(models.Model):
+    """ Results of the dynamic reports, shared by all the workers through the
+        database and evicted in least recently used order once the number of
+        entries or their total size exceeds the configured limits.
+    """
+    _name = 'ins.report.result.cache'
+    _description = 'Dynamic Report Result Cache'
+    _log_access = False
+
+    key = fields.Char(string='Key', required=True, index=True)
+    report_model = fields.Char(string='Report', required=True)
+    # JSON of the result, dates are serialized as strings
+    payload = fields.Binary(string='Result', attachment=False)
+    size = fields.Integer(string='Size')
+    hits = fields.Integer(string='Hits', default=0)
+    last_access = fields.Datetime(string='Last Access', index=True)
+
+    _sql_constraints = [
+        ('key_uniq', 'unique(key)', 'The report cache key must be unique.'),
+    ]
+
+    @api.model
+    def _get_limits(self):
+        get_param = self.env['ir.config_parameter'].sudo().get_param
+        return (int(get_param('account_dynamic_reports.report_cache_max_entries', DEFAULT_MAX_ENTRIES)),
+                int(get_param('account_dynamic_reports.report_cache_max_bytes', DEFAULT_MAX_BYTES)))
+
+    @api.model
+    def _is_enabled(self):
+        if self.env.context.get('ins_report_no_cache'):
+            return False
+        value = self.env['ir.config_parameter'].sudo().get_param('account_dynamic_reports.report_cache_enabled', '1')
+        return value not in ('0', 'False', '')
+
+    @api.model
+    def _fetch(self, key):
+        cr = self.env.cr
+        cr.execute("SELECT id, payload FROM ins_report_result_cache WHERE key = %s", (key,))
+        row = cr.fetchone()
+        if not row or row[1] is None:
+            return None
+        try:
+            result = json.loads(bytes(row[1]))
+        except Exception:
+            _logger.warning("Unreadable report cache entry %s, dropping it", key)
+            self._run_best_effort("DELETE FROM ins_report_result_cache WHERE id = %s", (row[0],))
+            return None
+        self._run_best_effort("""
+            UPDATE ins_report_result_cache
+               SET hits = hits + 1, last_access = now() at time zone 'UTC'
+             WHERE id = (SELECT id FROM ins_report_result_cache WHERE id = %s FOR UPDATE NOWAIT)
+        """, (row[0],))
+        return result
+
+    @api.model
+    def _store(self, key, report_model, result):
+        """ Store the result and return it as read back from the cache, so a
+            report gets the same values whether it was cached or not """
+        try:
+            payload = json.dumps(result, default=date_utils.json_default).encode()
+        except Exception:
+            _logger.warning("Result of %s cannot be cached", report_model, exc_info=True)
+            return result
+        max_entries, max_bytes = self._get_limits()
+        if len(payload) > max_bytes:
+            return result
+        self._run_best_effort("""
+            INSERT INTO ins_report_result_cache (key, report_model, payload, size, hits, last_access)
+                 VALUES (%s, %s, %s, %s, 0, now() at time zone 'UTC')
+            ON CONFLICT (key) DO UPDATE
+                    SET payload = EXCLUDED.payload, size = EXCLUDED.size, last_access = EXCLUDED.last_access
+        """, (key, report_model, psycopg2.Binary(payload), len(payload)))
+        self._run_best_effort("""
+            DELETE FROM ins_report_result_cache
+             WHERE id IN (
+                SELECT id FROM (
+                    SELECT id,
+                           ROW_NUMBER() OVER w AS position,
+                           SUM(size) OVER w AS total_size
+                      FROM ins_report_result_cache
+                    WINDOW w AS (ORDER BY last_access DESC, id DESC)
+                ) entries
+                WHERE position > %s OR total_size > %s)
+        """, (max_entries, max_bytes))
+        return json.loads(payload)
+
+    @api.model
+    def _run_best_effort(self, query, params):
+        """ Cache bookkeeping must never make a report fail: statements
+            conflicting with a concurrent worker are simply dropped.
+        """
+        try:
+            with self.env.cr.savepoint(flush=False):
+                self.env.cr.execute(query, params, log_exceptions=False)
+        except psycopg2.Error as e:
+            _logger.debug("Report cache statement skipped: %s", e)
+
+    @api.model
+    def _clear(self):
+        self.env.cr.execute("DELETE FROM ins_report_result_cache")
+
+
+class InsReportCacheMixin(models.AbstractModel):
+    _name = 'ins.report.cache.mixin'
+    _description = 'Dynamic Report Result Cache Mixin'
+
+    def _get_report_cache_key(self, default_filters):
+        ''' Hash of the filters of the report, the companies and access rights
+        of the user and the watermark of the ledger of these companies '''
+        filters = {key: value for key, value in self.get_filters(default_filters=dict(default_filters)).items()
+                   if not key.endswith('_list')}
+        company_ids = [filters['company_id']] if filters.get('company_id') else self.env.companies.ids
+        key_data = {
+            'report': self._name,
+            'filters': filters,
+            'company_ids': sorted(company_ids),
+            'allowed_company_ids': sorted(self.env.companies.ids),
+            'groups': sorted(self.env.user.groups_id.ids),
+            'rules': str(self.env['ir.rule']._compute_domain('account.move.line', 'read')),
+            'lang': self.env.lang,
+            'watermark': self.env['ins.ledger.change']._get_watermark(company_ids),
+        }
+        return hashlib.sha256(json.dumps(
+            key_data, sort_keys=True, default=date_utils.json_default).encode()).hexdigest()
+
+    def _get_cached_report_datas(self, compute, default_filters=None):
+        ''' Returns the result of compute() from the result cache when the filters
+        and the ledger did not change since it was stored '''
+        Cache = self.env['ins.report.result.cache'].sudo()
+        if not Cache._is_enabled():
+            return compute()
+        key = self._get_report_cache_key(default_filters or {})
+        result = Cache._fetch(key)
+        if result is None:
+            result = compute()
+            if result is not None:
+                result = Cache._store(key, self._name, result)
+        return result
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 
+from datetime import timedelta
+
 from odoo import api, fields, models, _
+from odoo.tools import date_utils
 
 
 class ResCompany(models.Model):
@@ -29,9 +32,27 @@ class ResCompany(models.Model):
     financial_year = fields.Selection([
         ('april_march','1 April to 31 March'),
         ('july_june','1 july to 30 June'),
-        ('january_december','1 Jan to 31 Dec')
+        ('january_december','1 Jan to 31 Dec'),
+        ('company', 'Company Fiscal Year')
         ], string='Financial Year', default='january_december', required=True)
 
+    def _get_ins_fiscal_year(self, day, previous=False):
+        ''' Start and end dates of the fiscal year of the company containing
+        day, or of the fiscal year before it. The fiscal calendars are used
+        when om_fiscal_year is installed, the fiscal year end of the company
+        otherwise (compute_fiscalyear_dates returns the calendar year).
+        :return: (date_from, date_to) '''
+        self.ensure_one()
+        if 'account.fiscal.calendar' in self.env:
+            fiscal_year = self.compute_fiscalyear_dates(day)
+            date_from, date_to = fiscal_year['date_from'], fiscal_year['date_to']
+        else:
+            date_from, date_to = date_utils.get_fiscal_year(
+                day, day=self.fiscalyear_last_day, month=int(self.fiscalyear_last_month))
+        if previous:
+            return self._get_ins_fiscal_year(date_from - timedelta(days=1))
+        return date_from, date_to
+
 
 class ResCurrency(models.Model):
     _inherit = 'res.currency'
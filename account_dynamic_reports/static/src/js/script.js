@@ -16,6 +16,39 @@ var round_di = utils.round_decimals;
 var QWeb = core.qweb;
 var _t = core._t;
 var exports = {};
+var FILTER_OPTION_LIMIT = 80;
+// select2 (3.5) filter widget attached to a hidden input: the options are
+// loaded one page at a time from get_filter_options instead of rendering every
+// record in the filters, the records of the filters ([id, name] pairs) are
+// preselected
+var filter_option_select2 = function(widget, $input, model, field_name, selected, placeholder){
+selected = selected || [];
+$input.val(_.map(selected, function(record){ return record[0]; }).join(','));
+return $input.select2({
+multiple: true,
+placeholder: placeholder,
+ajax: {
+quietMillis: 250,
+data: function(term, page){
+return {term: term, page: page};
+},
+transport: function(params){
+var page = params.data.page || 1;
+return widget._rpc({
+model: model,
+method: 'get_filter_options',
+args: [[widget.wizard_id], field_name, params.data.term || '', (page - 1) * FILTER_OPTION_LIMIT, FILTER_OPTION_LIMIT],
+}).then(params.success, params.error);
+},
+results: function(data, page){
+return {results: data.results, more: data.more};
+},
+},
+initSelection: function(element, callback){
+callback(_.map(selected, function(record){ return {id: record[0], text: record[1]}; }));
+},
+});
+};
 var DynamicFrMain = AbstractAction.extend({
 template:'DynamicFrMain',
 events: {
@@ -423,24 +456,20 @@ placeholder:'Extra Options...',
 })
 .val(['include_details','initial_balance']).trigger('change')
 ;
-self.$el.find('.account-multiple').select2({
-placeholder:'Select Account...',
-});
-self.$el.find('.account-tag-multiple').select2({
-placeholder:'Account Tags...',
-});
+filter_option_select2(self, self.$el.find('.account-multiple'), 'ins.general.ledger', 'account_ids',
+self.filter_data.accounts_list, 'Select Account...');
+filter_option_select2(self, self.$el.find('.account-tag-multiple'), 'ins.general.ledger', 'account_tag_ids',
+self.filter_data.account_tag_list, 'Account Tags...');
 self.$el.find('.analytic-tag-multiple').select2({
 placeholder:'Analytic Tags...',
 });
-self.$el.find('.partner-multiple').select2({
-placeholder:'Partners Tags...',
-});
+filter_option_select2(self, self.$el.find('.partner-multiple'), 'ins.general.ledger', 'partner_ids',
+self.filter_data.partners_list, 'Partners Tags...');
 self.$el.find('.analytic-multiple').select2({
 placeholder:'Select Analytic...',
 });
-self.$el.find('.journal-multiple').select2({
-placeholder:'Select Journal...',
-});
+filter_option_select2(self, self.$el.find('.journal-multiple'), 'ins.general.ledger', 'journal_ids',
+self.filter_data.journals_list, 'Select Journal...');
 }
 self.$('.py-data-container-orig').html(QWeb.render('DataSection', {
 account_data : datas[1]
@@ -753,12 +782,10 @@ self.$el.find('.partner-type-multiple').select2({
 maximumSelectionSize: 1,
 placeholder:'Select Partner Type...',
 });
-self.$el.find('.partner-multiple').select2({
-placeholder:'Select Partner...',
-});
-self.$el.find('.partner-tag-multiple').select2({
-placeholder:'Select Tag...',
-});
+filter_option_select2(self, self.$el.find('.partner-multiple'), 'ins.partner.ageing', 'partner_ids',
+self.filter_data.partners_list, 'Select Partner...');
+filter_option_select2(self, self.$el.find('.partner-tag-multiple'), 'ins.partner.ageing', 'partner_category_ids',
+self.filter_data.category_list, 'Select Tag...');
 self.$el.find('.extra-multiple').select2({
 placeholder:'Extra Options...',
 })
@@ -1083,18 +1110,14 @@ self.$el.find('.reconciled-multiple').select2({
 maximumSelectionSize: 1,
 placeholder:'Select Reconciled...',
 });
-self.$el.find('.partner-multiple').select2({
-placeholder:'Select Partner...',
-});
-self.$el.find('.partner-tag-multiple').select2({
-placeholder:'Select Tag...',
-});
-self.$el.find('.account-multiple').select2({
-placeholder:'Select Account...',
-});
-self.$el.find('.journal-multiple').select2({
-placeholder:'Select Journal...',
-});
+filter_option_select2(self, self.$el.find('.partner-multiple'), 'ins.partner.ledger', 'partner_ids',
+self.filter_data.partners_list, 'Select Partner...');
+filter_option_select2(self, self.$el.find('.partner-tag-multiple'), 'ins.partner.ledger', 'partner_category_ids',
+self.filter_data.category_list, 'Select Tag...');
+filter_option_select2(self, self.$el.find('.account-multiple'), 'ins.partner.ledger', 'account_ids',
+self.filter_data.accounts_list, 'Select Account...');
+filter_option_select2(self, self.$el.find('.journal-multiple'), 'ins.partner.ledger', 'journal_ids',
+self.filter_data.journals_list, 'Select Journal...');
 }
 self.$('.py-data-container-orig').html(QWeb.render('DataSectionPl', {
 account_data : datas[1]
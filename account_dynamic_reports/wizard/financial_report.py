@@ -79,6 +79,9 @@ class InsFinancialReport(models.TransientModel):
                     self.date_from = datetime(date.year, 10, 1).strftime("%Y-%m-%d")
                     self.date_to = datetime(date.year, 12, calendar.mdays[12]).strftime("%Y-%m-%d")
             if self.date_range == 'this_financial_year':
+                if self.financial_year == 'company':
+                    self.date_from, self.date_to = (self.company_id or self.env.company)._get_ins_fiscal_year(
+                        date.date())
                 if self.financial_year == 'january_december':
                     self.date_from = datetime(date.year, 1, 1).strftime("%Y-%m-%d")
                     self.date_to = datetime(date.year, 12, 31).strftime("%Y-%m-%d")
@@ -125,6 +128,9 @@ class InsFinancialReport(models.TransientModel):
                     self.date_to = datetime(date.year, 12, calendar.mdays[12]).strftime("%Y-%m-%d")
             date = (datetime.now() - relativedelta(years=1))
             if self.date_range == 'last_financial_year':
+                if self.financial_year == 'company':
+                    self.date_from, self.date_to = (self.company_id or self.env.company)._get_ins_fiscal_year(
+                        datetime.today().date(), previous=True)
                 if self.financial_year == 'january_december':
                     self.date_from = datetime(date.year, 1, 1).strftime("%Y-%m-%d")
                     self.date_to = datetime(date.year, 12, 31).strftime("%Y-%m-%d")
@@ -474,7 +480,8 @@ class InsFinancialReport(models.TransientModel):
     financial_year = fields.Selection(
         [('april_march', '1 April to 31 March'),
          ('july_june', '1 july to 30 June'),
-         ('january_december', '1 Jan to 31 Dec')],
+         ('january_december', '1 Jan to 31 Dec'),
+         ('company', 'Company Fiscal Year')],
         string='Financial Year', default=lambda self: self.env.company.financial_year, required=True)
 
     date_range = fields.Selection(
@@ -39,6 +39,7 @@ FETCH_RANGE = 2000
 
 class InsGeneralLedger(models.TransientModel):
     _name = "ins.general.ledger"
+    _inherit = ['ins.report.cache.mixin', 'ins.report.filter.mixin']
 
     @api.onchange('date_range','financial_year')
     def onchange_date_range(self):
@@ -68,6 +69,9 @@ class InsGeneralLedger(models.TransientModel):
                     self.date_from = datetime(date.year, 10, 1).strftime("%Y-%m-%d")
                     self.date_to = datetime(date.year, 12, calendar.mdays[12]).strftime("%Y-%m-%d")
             if self.date_range == 'this_financial_year':
+                if self.financial_year == 'company':
+                    self.date_from, self.date_to = (self.company_id or self.env.company)._get_ins_fiscal_year(
+                        date.date())
                 if self.financial_year == 'january_december':
                     self.date_from = datetime(date.year, 1, 1).strftime("%Y-%m-%d")
                     self.date_to = datetime(date.year, 12, 31).strftime("%Y-%m-%d")
@@ -114,6 +118,9 @@ class InsGeneralLedger(models.TransientModel):
                     self.date_to = datetime(date.year, 12, calendar.mdays[12]).strftime("%Y-%m-%d")
             date = (datetime.now() - relativedelta(years=1))
             if self.date_range == 'last_financial_year':
+                if self.financial_year == 'company':
+                    self.date_from, self.date_to = (self.company_id or self.env.company)._get_ins_fiscal_year(
+                        datetime.today().date(), previous=True)
                 if self.financial_year == 'january_december':
                     self.date_from = datetime(date.year, 1, 1).strftime("%Y-%m-%d")
                     self.date_to = datetime(date.year, 12, 31).strftime("%Y-%m-%d")
@@ -145,7 +152,8 @@ class InsGeneralLedger(models.TransientModel):
     financial_year = fields.Selection(
         [('april_march', '1 April to 31 March'),
         ('july_june', '1 july to 30 June'),
-        ('january_december', '1 Jan to 31 Dec')],
+        ('january_december', '1 Jan to 31 Dec'),
+        ('company', 'Company Fiscal Year')],
         string='Financial Year', default=lambda self:self.env.company.financial_year, required=True)
 
     date_range = fields.Selection(
@@ -720,22 +728,21 @@ class InsGeneralLedger(models.TransientModel):
             page_count += 1
         return [i+1 for i in range(0, int(page_count))] or []
 
+    def _get_filter_option_domains(self):
+        company_domain = [('company_id', '=', self.env.company.id)]
+        return {
+            'journal_ids': company_domain,
+            'account_ids': company_domain,
+            'account_tag_ids': [],
+            'partner_ids': [('parent_id', '=', False),
+                            '|',
+                            ('company_id', '=', self.env.company.id),
+                            ('company_id', '=', False)],
+        }
+
     def get_filters(self, default_filters={}):
 
         self.onchange_date_range()
-        company_domain = [('company_id','=', self.env.company.id)]
-        partner_company_domain = [('parent_id','=', False),
-                                  '|',
-                                    ('company_id','=', self.env.company.id),
-                                    ('company_id','=',False)]
-
-        journals = self.journal_ids if self.journal_ids else self.env['account.journal'].search(company_domain)
-        accounts = self.account_ids if self.account_ids else self.env['account.account'].search(company_domain)
-        account_tags = self.account_tag_ids if self.account_tag_ids else self.env['account.account.tag'].search([])
-        #analytics = self.analytic_ids if self.analytic_ids else self.env['account.analytic.account'].search(company_domain)
-        # analytic_tags = self.analytic_tag_ids if self.analytic_tag_ids else self.env['account.analytic.tag'].sudo().search(
-        #     ['|',('company_id','=',self.env.company.id),('company_id','=',False)])
-        partners = self.partner_ids if self.partner_ids else self.env['res.partner'].search(partner_company_domain)
 
         filter_dict = {
             'journal_ids': self.journal_ids.ids,
@@ -753,10 +760,11 @@ class InsGeneralLedger(models.TransientModel):
             'display_accounts': self.display_accounts,
             'include_details': self.include_details,
 
-            'journals_list': [(j.id, j.name) for j in journals],
-            'accounts_list': [(a.id, a.name) for a in accounts],
-            'account_tag_list': [(a.id, a.name) for a in account_tags],
-            'partners_list': [(p.id, p.name) for p in partners],
+            # selected records only, the other options are loaded by get_filter_options
+            'journals_list': [(j.id, j.name) for j in self.journal_ids],
+            'accounts_list': [(a.id, a.name) for a in self.account_ids],
+            'account_tag_list': [(a.id, a.name) for a in self.account_tag_ids],
+            'partners_list': [(p.id, p.name) for p in self.partner_ids],
             #'analytics_list': [(anl.id, anl.name) for anl in analytics],
             #'analytic_tag_list': [(anltag.id, anltag.name) for anltag in analytic_tags],
             'company_name': self.company_id and self.company_id.name,
@@ -771,9 +779,8 @@ class InsGeneralLedger(models.TransientModel):
         :return: All the datas for GL
         '''
         if self.validate_data():
-            filters = self.process_filters()
-            account_lines = self.process_data()
-            return filters, account_lines
+            return self._get_cached_report_datas(
+                lambda: (self.process_filters(), self.process_data()), default_filters)
 
     def action_pdf(self):
         filters, account_lines = self.get_report_datas()
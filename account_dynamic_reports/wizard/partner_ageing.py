@@ -39,6 +39,7 @@ DATE_DICT = {
 
 class InsPartnerAgeing(models.TransientModel):
     _name = "ins.partner.ageing"
+    _inherit = ['ins.report.cache.mixin', 'ins.report.filter.mixin']
 
     @api.onchange('partner_type')
     def onchange_partner_type(self):
@@ -110,18 +111,19 @@ class InsPartnerAgeing(models.TransientModel):
             raise ValidationError(_('"Bucket order must be ascending"'))
         return True
 
-    def get_filters(self, default_filters={}):
-
-        partner_company_domain = [('parent_id','=', False),
-                                  '|',
-                                  ('customer_rank', '>', 0),
-                                  ('supplier_rank', '>', 0),
-                                  '|',
-                                  ('company_id', '=', self.env.company.id),
-                                  ('company_id', '=', False)]
+    def _get_filter_option_domains(self):
+        return {
+            'partner_ids': [('parent_id', '=', False),
+                            '|',
+                            ('customer_rank', '>', 0),
+                            ('supplier_rank', '>', 0),
+                            '|',
+                            ('company_id', '=', self.env.company.id),
+                            ('company_id', '=', False)],
+            'partner_category_ids': [],
+        }
 
-        partners = self.partner_ids if self.partner_ids else self.env['res.partner'].search(partner_company_domain)
-        categories = self.partner_category_ids if self.partner_category_ids else self.env['res.partner.category'].search([])
+    def get_filters(self, default_filters={}):
 
         filter_dict = {
             'partner_ids': self.partner_ids.ids,
@@ -137,8 +139,9 @@ class InsPartnerAgeing(models.TransientModel):
             'bucket_5': self.bucket_5,
             'include_details': self.include_details,
 
-            'partners_list': [(p.id, p.name) for p in partners],
-            'category_list': [(c.id, c.name) for c in categories],
+            # selected records only, the other options are loaded by get_filter_options
+            'partners_list': [(p.id, p.name) for p in self.partner_ids],
+            'category_list': [(c.id, c.name) for c in self.partner_category_ids],
             'company_name': self.company_id and self.company_id.name,
         }
         filter_dict.update(default_filters)
@@ -578,10 +581,12 @@ class InsPartnerAgeing(models.TransientModel):
         :return: All the datas for GL
         '''
         if self.validate_data():
-            filters = self.process_filters()
-            period_dict, ageing_lines = self.process_data()
-            period_list = [period_dict[a]['name'] for a in period_dict]
-            return filters, ageing_lines, period_dict, period_list
+            def compute():
+                filters = self.process_filters()
+                period_dict, ageing_lines = self.process_data()
+                period_list = [period_dict[a]['name'] for a in period_dict]
+                return filters, ageing_lines, period_dict, period_list
+            return self._get_cached_report_datas(compute, default_filters)
 
     def action_pdf(self):
         filters, ageing_lines, period_dict, period_list = self.get_report_datas()
@@ -39,6 +39,7 @@ FETCH_RANGE = 2000
 
 class InsPartnerLedger(models.TransientModel):
     _name = "ins.partner.ledger"
+    _inherit = ['ins.report.cache.mixin', 'ins.report.filter.mixin']
 
     @api.onchange('date_range', 'financial_year')
     def onchange_date_range(self):
@@ -68,6 +69,9 @@ class InsPartnerLedger(models.TransientModel):
                     self.date_from = datetime(date.year, 10, 1).strftime("%Y-%m-%d")
                     self.date_to = datetime(date.year, 12, calendar.mdays[12]).strftime("%Y-%m-%d")
             if self.date_range == 'this_financial_year':
+                if self.financial_year == 'company':
+                    self.date_from, self.date_to = (self.company_id or self.env.company)._get_ins_fiscal_year(
+                        date.date())
                 if self.financial_year == 'january_december':
                     self.date_from = datetime(date.year, 1, 1).strftime("%Y-%m-%d")
                     self.date_to = datetime(date.year, 12, 31).strftime("%Y-%m-%d")
@@ -114,6 +118,9 @@ class InsPartnerLedger(models.TransientModel):
                     self.date_to = datetime(date.year, 12, calendar.mdays[12]).strftime("%Y-%m-%d")
             date = (datetime.now() - relativedelta(years=1))
             if self.date_range == 'last_financial_year':
+                if self.financial_year == 'company':
+                    self.date_from, self.date_to = (self.company_id or self.env.company)._get_ins_fiscal_year(
+                        datetime.today().date(), previous=True)
                 if self.financial_year == 'january_december':
                     self.date_from = datetime(date.year, 1, 1).strftime("%Y-%m-%d")
                     self.date_to = datetime(date.year, 12, 31).strftime("%Y-%m-%d")
@@ -145,7 +152,8 @@ class InsPartnerLedger(models.TransientModel):
     financial_year = fields.Selection(
         [('april_march', '1 April to 31 March'),
          ('july_june', '1 july to 30 June'),
-         ('january_december', '1 Jan to 31 Dec')],
+         ('january_december', '1 Jan to 31 Dec'),
+         ('company', 'Company Fiscal Year')],
         string='Financial Year', default=lambda self: self.env.company.financial_year, required=True)
 
     date_range = fields.Selection(
@@ -721,21 +729,22 @@ class InsPartnerLedger(models.TransientModel):
             page_count += 1
         return [i+1 for i in range(0, int(page_count))] or []
 
+    def _get_filter_option_domains(self):
+        company_domain = [('company_id', '=', self.env.company.id)]
+        return {
+            'journal_ids': company_domain,
+            'account_ids': company_domain,
+            'partner_ids': [('parent_id', '=', False),
+                            '|',
+                            ('company_id', '=', self.env.company.id),
+                            ('company_id', '=', False)],
+            'partner_category_ids': [],
+        }
+
     def get_filters(self, default_filters={}):
 
         self.onchange_date_range()
 
-        company_domain = [('company_id', '=', self.env.company.id)]
-        partner_company_domain = [('parent_id','=', False),
-                                  '|',
-                                  ('company_id', '=', self.env.company.id),
-                                  ('company_id', '=', False)]
-
-        journals = self.journal_ids if self.journal_ids else self.env['account.journal'].search(company_domain)
-        accounts = self.account_ids if self.account_ids else self.env['account.account'].search(company_domain)
-        partners = self.partner_ids if self.partner_ids else self.env['res.partner'].search(partner_company_domain)
-        categories = self.partner_category_ids if self.partner_category_ids else self.env['res.partner.category'].search([])
-
         filter_dict = {
             'journal_ids': self.journal_ids.ids,
             'account_ids': self.account_ids.ids,
@@ -752,10 +761,11 @@ class InsPartnerLedger(models.TransientModel):
             'balance_less_than_zero': self.balance_less_than_zero,
             'balance_greater_than_zero': self.balance_greater_than_zero,
 
-            'journals_list': [(j.id, j.name) for j in journals],
-            'accounts_list': [(a.id, a.name) for a in accounts],
-            'partners_list': [(p.id, p.name) for p in partners],
-            'category_list': [(c.id, c.name) for c in categories],
+            # selected records only, the other options are loaded by get_filter_options
+            'journals_list': [(j.id, j.name) for j in self.journal_ids],
+            'accounts_list': [(a.id, a.name) for a in self.account_ids],
+            'partners_list': [(p.id, p.name) for p in self.partner_ids],
+            'category_list': [(c.id, c.name) for c in self.partner_category_ids],
             'company_name': self.company_id and self.company_id.name,
         }
         filter_dict.update(default_filters)
@@ -768,9 +778,8 @@ class InsPartnerLedger(models.TransientModel):
         :return: All the datas for GL
         '''
         if self.validate_data():
-            filters = self.process_filters()
-            account_lines = self.process_data()
-            return filters, account_lines
+            return self._get_cached_report_datas(
+                lambda: (self.process_filters(), self.process_data()), default_filters)
 
     def action_pdf(self):
         filters, account_lines = self.get_report_datas()
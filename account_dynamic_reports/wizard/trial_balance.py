@@ -39,6 +39,7 @@ DATE_DICT = {
 
 class InsTrialBalance(models.TransientModel):
     _name = "ins.trial.balance"
+    _inherit = 'ins.report.cache.mixin'
 
     def _get_journals(self):
         return self.env['account.journal'].search([])
@@ -71,6 +72,9 @@ class InsTrialBalance(models.TransientModel):
                     self.date_from = datetime(date.year, 10, 1).strftime("%Y-%m-%d")
                     self.date_to = datetime(date.year, 12, calendar.mdays[12]).strftime("%Y-%m-%d")
             if self.date_range == 'this_financial_year':
+                if self.financial_year == 'company':
+                    self.date_from, self.date_to = (self.company_id or self.env.company)._get_ins_fiscal_year(
+                        date.date())
                 if self.financial_year == 'january_december':
                     self.date_from = datetime(date.year, 1, 1).strftime("%Y-%m-%d")
                     self.date_to = datetime(date.year, 12, 31).strftime("%Y-%m-%d")
@@ -117,6 +121,9 @@ class InsTrialBalance(models.TransientModel):
                     self.date_to = datetime(date.year, 12, calendar.mdays[12]).strftime("%Y-%m-%d")
             date = (datetime.now() - relativedelta(years=1))
             if self.date_range == 'last_financial_year':
+                if self.financial_year == 'company':
+                    self.date_from, self.date_to = (self.company_id or self.env.company)._get_ins_fiscal_year(
+                        datetime.today().date(), previous=True)
                 if self.financial_year == 'january_december':
                     self.date_from = datetime(date.year, 1, 1).strftime("%Y-%m-%d")
                     self.date_to = datetime(date.year, 12, 31).strftime("%Y-%m-%d")
@@ -148,7 +155,8 @@ class InsTrialBalance(models.TransientModel):
     financial_year = fields.Selection(
         [('april_march', '1 April to 31 March'),
          ('july_june', '1 july to 30 June'),
-         ('january_december', '1 Jan to 31 Dec')],
+         ('january_december', '1 Jan to 31 Dec'),
+         ('company', 'Company Fiscal Year')],
         string='Financial Year', default=lambda self: self.env.company.financial_year, required=True)
 
     date_range = fields.Selection(
@@ -582,10 +590,12 @@ class InsTrialBalance(models.TransientModel):
         :return: All the datas for GL
         '''
         if self.validate_data():
-            data = self.get_filters(default_filters)
-            filters = self.process_filters(data)
-            account_lines, retained, subtotal = self.process_data(data)
-            return filters, account_lines, retained, subtotal
+            def compute():
+                data = self.get_filters(default_filters)
+                filters = self.process_filters(data)
+                account_lines, retained, subtotal = self.process_data(data)
+                return filters, account_lines, retained, subtotal
+            return self._get_cached_report_datas(compute, default_filters)
 
     def action_pdf(self):
         filters, account_lines, retained, subtotal = self.get_report_datas()
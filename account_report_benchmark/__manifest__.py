@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+
+{
+    'name': 'Accounting Reports Benchmark',
+    'version': '16.0.1.0.0',
+    'category': 'Accounting',
+    'summary': 'Synthetic ledger generator and timing baselines for the accounting reports',
+    'description': 'Generates synthetic companies with large ledgers and times every report entry point',
+    'license': 'LGPL-3',
+    'depends': ['account'],
+    'demo': [],
+    'data': [],
+    'installable': True,
+    'application': False,
+    'auto_install': False,
+}
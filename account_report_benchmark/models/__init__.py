@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+from . import ledger_generator
+from . import report_benchmark
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import time
+from datetime import date
+
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+# (code prefix, account_type, reconcile) of the generated chart of accounts
+ACCOUNT_LAYOUT = [
+    ('100', 'asset_cash', False),
+    ('110', 'asset_receivable', True),
+    ('120', 'asset_current', False),
+    ('150', 'asset_fixed', False),
+    ('200', 'liability_payable', True),
+    ('210', 'liability_current', False),
+    ('300', 'equity', False),
+    ('400', 'income', False),
+    ('500', 'expense', False),
+    ('510', 'expense_direct_cost', False),
+]
+
+
+class AccountReportBenchmarkGenerator(models.AbstractModel):
+    _name = 'account.report.benchmark.generator'
+    _description = 'Synthetic Ledger Generator'
+
+    @api.model
+    def generate(self, accounts=50, partners=1000, journals=5, moves=100000,
+                 reconcile_ratio=0.3, date_from=None, date_to=None, seed=0.42, company_name=None):
+        """ Create a company with a synthetic ledger.
+
+            Master data (accounts, partners, journals) goes through the ORM,
+            moves, move lines and partial reconciliations are inserted with
+            set-based SQL so that millions of lines can be generated.
+
+            Every move has one debit and one credit line of the same amount:
+            a third of them are customer invoices (receivable/income), a third
+            vendor bills (expense/payable) and a third miscellaneous entries.
+            For ``reconcile_ratio`` of the invoices a bank payment is created
+            and partially or fully reconciled with the invoice.
+
+            :return: the generated res.company
+        """
+        if moves <= 0 or accounts < len(ACCOUNT_LAYOUT) or partners <= 0:
+            raise UserError(_("The synthetic ledger needs at least one move, one partner and %s accounts.")
+                            % len(ACCOUNT_LAYOUT))
+        date_from = fields.Date.to_date(date_from) or date(fields.Date.today().year - 1, 1, 1)
+        date_to = fields.Date.to_date(date_to) or fields.Date.today()
+        start = time.time()
+
+        company = self.env['res.company'].create({
+            'name': company_name or _('Benchmark %s') % fields.Datetime.now(),
+            'currency_id': self.env.company.currency_id.id,
+        })
+        self.env.user.company_ids |= company
+        account_ids = self._generate_accounts(company, accounts)
+        journal_ids = self._generate_journals(company, journals, account_ids)
+        partner_ids = self._generate_partners(company, partners)
+        self.env.flush_all()
+
+        self.env.cr.execute("SELECT setseed(%s)", (seed,))
+        self._generate_moves(company, account_ids, journal_ids, partner_ids, moves, reconcile_ratio,
+                             date_from, date_to)
+        self.env.invalidate_all()
+        _logger.info("Generated synthetic ledger for %s: %s moves in %.2fs",
+                     company.name, moves, time.time() - start)
+        return company
+
+    def _generate_accounts(self, company, count):
+        """ :return: dict account_type -> list of account ids """
+        vals_list = []
+        for index in range(count):
+            prefix, account_type, reconcile = ACCOUNT_LAYOUT[index % len(ACCOUNT_LAYOUT)]
+            vals_list.append({
+                'code': '%s%03d' % (prefix, index // len(ACCOUNT_LAYOUT)),
+                'name': 'Benchmark %s %s' % (account_type, index),
+                'account_type': account_type,
+                'reconcile': reconcile,
+                'company_id': company.id,
+            })
+        result = {}
+        for account in self.env['account.account'].create(vals_list):
+            result.setdefault(account.account_type, []).append(account.id)
+        return result
+
+    def _generate_journals(self, company, count, account_ids):
+        """ :return: dict journal type -> list of journal ids """
+        types = ['sale', 'purchase', 'bank', 'cash', 'general']
+        vals_list = []
+        for index in range(max(count, len(types))):
+            journal_type = types[index % len(types)]
+            vals = {
+                'name': 'Benchmark %s %s' % (journal_type, index),
+                'code': 'BM%s' % index,
+                'type': journal_type,
+                'company_id': company.id,
+            }
+            if journal_type in ('bank', 'cash'):
+                vals['default_account_id'] = account_ids['asset_cash'][index % len(account_ids['asset_cash'])]
+            vals_list.append(vals)
+        result = {}
+        for journal in self.env['account.journal'].create(vals_list):
+            if journal.type in ('bank', 'cash'):
+                method_lines = journal.inbound_payment_method_line_ids | journal.outbound_payment_method_line_ids
+                method_lines.write({'payment_account_id': journal.default_account_id.id})
+            result.setdefault(journal.type, []).append(journal.id)
+        return result
+
+    def _generate_partners(self, company, count):
+        partner_ids = []
+        batch_size = 5000
+        for offset in range(0, count, batch_size):
+            partners = self.env['res.partner'].create([{
+                'name': 'Benchmark Partner %s' % index,
+                'company_id': company.id,
+            } for index in range(offset, min(offset + batch_size, count))])
+            partner_ids += partners.ids
+        return partner_ids
+
+    def _generate_moves(self, company, account_ids, journal_ids, partner_ids, count, reconcile_ratio,
+                        date_from, date_to):
+        cr = self.env.cr
+        span = max((date_to - date_from).days, 0)
+        cr.execute("""
+            CREATE TEMP TABLE benchmark_move_spec ON COMMIT DROP AS
+            SELECT g AS seq,
+                   g %% 3 AS kind,
+                   NULL::integer AS invoice_seq,
+                   nextval('account_move_id_seq') AS move_id,
+                   nextval('account_move_line_id_seq') AS debit_line_id,
+                   nextval('account_move_line_id_seq') AS credit_line_id,
+                   %(date_from)s::date + floor(random() * (%(span)s + 1))::integer AS date,
+                   round((1 + random() * 9999)::numeric, 2) AS amount,
+                   (%(partners)s::integer[])[1 + floor(random() * %(partner_count)s)::integer] AS partner_id
+              FROM generate_series(1, %(count)s) g
+        """, {
+            'date_from': date_from, 'span': span, 'count': count,
+            'partners': partner_ids, 'partner_count': len(partner_ids),
+        })
+        # kind 3: payments of a share of the invoices (kind 0)
+        cr.execute("""
+            INSERT INTO benchmark_move_spec
+            SELECT %(count)s + row_number() OVER (ORDER BY s.seq), 3, s.seq,
+                   nextval('account_move_id_seq'), nextval('account_move_line_id_seq'), nextval('account_move_line_id_seq'),
+                   LEAST(s.date + floor(random() * 60)::integer, %(date_to)s::date),
+                   round(s.amount * (0.3 + random() * 0.7)::numeric, 2),
+                   s.partner_id
+              FROM benchmark_move_spec s
+             WHERE s.kind = 0 AND random() < %(ratio)s
+        """, {'count': count, 'date_to': max(date_to, date_from), 'ratio': reconcile_ratio})
+
+        # kind -> (journal type, debit account type, credit account type, partner on debit, partner on credit)
+        layout = {
+            0: ('sale', 'asset_receivable', 'income', True, False),
+            1: ('purchase', 'expense', 'liability_payable', False, True),
+            2: ('general', 'expense_direct_cost', 'liability_current', False, False),
+            3: ('bank', 'asset_cash', 'asset_receivable', False, True),
+        }
+        currency_id = company.currency_id.id
+        for kind, (journal_type, debit_type, credit_type, debit_partner, credit_partner) in layout.items():
+            params = {
+                'kind': kind,
+                'journals': journal_ids[journal_type],
+                'company_id': company.id,
+                'currency_id': currency_id,
+                'uid': self.env.uid,
+                'prefix': 'BM%s/' % kind,
+            }
+            cr.execute("""
+                INSERT INTO account_move (id, name, ref, date, journal_id, company_id, currency_id, partner_id,
+                                          state, move_type, auto_post, create_uid, write_uid, create_date, write_date)
+                SELECT s.move_id, %(prefix)s || s.seq, NULL, s.date,
+                       (%(journals)s::integer[])[1 + s.seq %% array_length(%(journals)s::integer[], 1)],
+                       %(company_id)s, %(currency_id)s, s.partner_id, 'posted', 'entry', 'no',
+                       %(uid)s, %(uid)s, now() at time zone 'UTC', now() at time zone 'UTC'
+                  FROM benchmark_move_spec s
+                 WHERE s.kind = %(kind)s
+            """, params)
+            for side, account_type, with_partner in (('debit', debit_type, debit_partner),
+                                                     ('credit', credit_type, credit_partner)):
+                sign = 1 if side == 'debit' else -1
+                cr.execute("""
+                    INSERT INTO account_move_line (id, move_id, move_name, date, date_maturity, parent_state,
+                                                   journal_id, company_id, company_currency_id, currency_id,
+                                                   account_id, partner_id, name, display_type,
+                                                   debit, credit, balance, amount_currency,
+                                                   amount_residual, amount_residual_currency, reconciled,
+                                                   create_uid, write_uid, create_date, write_date)
+                    SELECT CASE WHEN %(sign)s > 0 THEN s.debit_line_id ELSE s.credit_line_id END,
+                           s.move_id, m.name, s.date, s.date, 'posted',
+                           m.journal_id, %(company_id)s, %(currency_id)s, %(currency_id)s,
+                           (%(accounts)s::integer[])[1 + s.seq %% array_length(%(accounts)s::integer[], 1)],
+                           CASE WHEN %(with_partner)s THEN s.partner_id END, m.name, 'product',
+                           GREATEST(%(sign)s * s.amount, 0.0), GREATEST(-%(sign)s * s.amount, 0.0),
+                           %(sign)s * s.amount, %(sign)s * s.amount,
+                           %(residual)s * %(sign)s * s.amount, %(residual)s * %(sign)s * s.amount, FALSE,
+                           %(uid)s, %(uid)s, now() at time zone 'UTC', now() at time zone 'UTC'
+                      FROM benchmark_move_spec s
+                      JOIN account_move m ON m.id = s.move_id
+                     WHERE s.kind = %(kind)s
+                """, dict(params, sign=sign, accounts=account_ids[account_type], with_partner=with_partner,
+                          residual=1 if account_type in ('asset_receivable', 'liability_payable') else 0))
+
+        cr.execute("""
+            INSERT INTO account_partial_reconcile (debit_move_id, credit_move_id, amount, debit_amount_currency,
+                                                   credit_amount_currency, debit_currency_id, credit_currency_id,
+                                                   company_id, max_date, create_uid, write_uid, create_date, write_date)
+            SELECT inv.debit_line_id, pay.credit_line_id, pay.amount, pay.amount, pay.amount,
+                   %(currency_id)s, %(currency_id)s, %(company_id)s, GREATEST(inv.date, pay.date),
+                   %(uid)s, %(uid)s, now() at time zone 'UTC', now() at time zone 'UTC'
+              FROM benchmark_move_spec pay
+              JOIN benchmark_move_spec inv ON inv.seq = pay.invoice_seq
+             WHERE pay.kind = 3
+        """, {'currency_id': currency_id, 'company_id': company.id, 'uid': self.env.uid})
+        cr.execute("""
+            UPDATE account_move_line l
+               SET amount_residual = l.amount_residual - r.amount,
+                   amount_residual_currency = l.amount_residual_currency - r.amount,
+                   reconciled = l.amount_residual - r.amount = 0
+              FROM (SELECT debit_move_id AS line_id, SUM(amount) AS amount
+                      FROM account_partial_reconcile WHERE company_id = %(company_id)s GROUP BY debit_move_id) r
+             WHERE l.id = r.line_id
+        """, {'company_id': company.id})
+        cr.execute("""
+            UPDATE account_move_line l
+               SET amount_residual = 0.0, amount_residual_currency = 0.0, reconciled = TRUE
+              FROM account_partial_reconcile r
+             WHERE r.company_id = %(company_id)s AND l.id = r.credit_move_id
+        """, {'company_id': company.id})
+        cr.execute("DROP TABLE benchmark_move_spec")
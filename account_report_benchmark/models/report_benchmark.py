@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import platform
+import statistics
+import time
+
+from odoo import api, fields, models, release
+
+_logger = logging.getLogger(__name__)
+
+# Every report entry point that can be timed. Entry points whose wizard model
+# is not installed in the database are skipped.
+#   name: key of the entry point in the baseline
+#   model: wizard (transient) model
+#   method: method called on the wizard
+#   vals: extra wizard values, the company and the date range are always set
+#   context: extra context for the call
+#   render: also compute the values of the qweb report returned by the method
+ENTRY_POINTS = [
+    {'name': 'ins.general.ledger', 'model': 'ins.general.ledger', 'method': 'get_report_datas',
+     'vals': {'date_range': False}},
+    {'name': 'ins.general.ledger.xlsx', 'model': 'ins.general.ledger', 'method': 'action_xlsx',
+     'vals': {'date_range': False}},
+    {'name': 'ins.partner.ledger', 'model': 'ins.partner.ledger', 'method': 'get_report_datas',
+     'vals': {'date_range': False}},
+    {'name': 'ins.partner.ledger.xlsx', 'model': 'ins.partner.ledger', 'method': 'action_xlsx',
+     'vals': {'date_range': False}},
+    {'name': 'ins.trial.balance', 'model': 'ins.trial.balance', 'method': 'get_report_datas',
+     'vals': {'date_range': False}},
+    {'name': 'ins.trial.balance.xlsx', 'model': 'ins.trial.balance', 'method': 'action_xlsx',
+     'vals': {'date_range': False}},
+    {'name': 'ins.partner.ageing', 'model': 'ins.partner.ageing', 'method': 'get_report_datas',
+     'vals': {}, 'dates': 'as_on_date'},
+    {'name': 'ins.partner.ageing.xlsx', 'model': 'ins.partner.ageing', 'method': 'action_xlsx',
+     'vals': {}, 'dates': 'as_on_date'},
+    {'name': 'ins.financial.report', 'model': 'ins.financial.report', 'method': 'get_report_values',
+     'vals': {'date_range': False}},
+    {'name': 'ins.financial.report.xlsx', 'model': 'ins.financial.report', 'method': 'action_xlsx',
+     'vals': {'date_range': False}},
+    {'name': 'accounting_pdf_reports.general_ledger', 'model': 'account.report.general.ledger',
+     'method': 'check_report', 'vals': {'initial_balance': True}, 'render': True},
+    {'name': 'accounting_pdf_reports.partner_ledger', 'model': 'account.report.partner.ledger',
+     'method': 'check_report', 'vals': {}, 'render': True},
+    {'name': 'accounting_pdf_reports.trial_balance', 'model': 'account.balance.report',
+     'method': 'check_report', 'vals': {}, 'render': True},
+    {'name': 'accounting_pdf_reports.aged_partner', 'model': 'account.aged.trial.balance',
+     'method': 'check_report', 'vals': {}, 'render': True},
+    {'name': 'accounting_pdf_reports.financial', 'model': 'accounting.report',
+     'method': 'check_report', 'vals': {}, 'render': True},
+    {'name': 'accounting_pdf_reports.journal', 'model': 'account.print.journal',
+     'method': 'check_report', 'vals': {}, 'render': True},
+    {'name': 'accounting_pdf_reports.tax', 'model': 'account.tax.report.wizard',
+     'method': 'check_report', 'vals': {}, 'render': True},
+    {'name': 'om_account_daily_reports.daybook', 'model': 'account.daybook.report',
+     'method': 'check_report', 'vals': {}, 'render': True},
+    {'name': 'om_account_daily_reports.cashbook', 'model': 'account.cashbook.report',
+     'method': 'check_report', 'vals': {'initial_balance': True}, 'render': True},
+    {'name': 'om_account_daily_reports.bankbook', 'model': 'account.bankbook.report',
+     'method': 'check_report', 'vals': {'initial_balance': True}, 'render': True},
+    {'name': 'accounting.report.bi.balance_sheet', 'model': 'accounting.report.bi',
+     'method': 'check_report', 'vals': {}, 'context': {'report_type': 'excel'}},
+    {'name': 'accounting.report.bi.general_ledger', 'model': 'accounting.report.bi',
+     'method': 'print_general_ledger', 'vals': {}, 'context': {'report_type': 'excel'}},
+    {'name': 'accounting.report.bi.trial_balance', 'model': 'accounting.report.bi',
+     'method': 'print_trial_balance', 'vals': {}, 'context': {'report_type': 'excel'}},
+]
+
+
+class AccountReportBenchmark(models.AbstractModel):
+    _name = 'account.report.benchmark'
+    _description = 'Accounting Reports Benchmark'
+
+    @api.model
+    def _get_entry_points(self, names=None):
+        return [entry for entry in ENTRY_POINTS
+                if entry['model'] in self.env and (not names or entry['name'] in names)]
+
+    def _prepare_wizard_vals(self, entry, company, date_from, date_to):
+        model = self.env[entry['model']]
+        vals = {}
+        if 'company_id' in model._fields:
+            vals['company_id'] = company.id
+        if entry.get('dates') == 'as_on_date':
+            vals['as_on_date'] = date_to
+        else:
+            vals.update({'date_from': date_from, 'date_to': date_to})
+        if 'journal_ids' in model._fields:
+            vals['journal_ids'] = [(6, 0, self.env['account.journal'].search(
+                [('company_id', '=', company.id)]).ids)]
+        if 'account_report_id' in model._fields and not model.default_get(['account_report_id']).get('account_report_id'):
+            vals['account_report_id'] = self.env[model._fields['account_report_id'].comodel_name].search(
+                [('parent_id', '=', False)], limit=1).id
+        vals.update(entry.get('vals', {}))
+        return {key: value for key, value in vals.items() if key in model._fields}
+
+    def _run_entry_point(self, entry, company, date_from, date_to):
+        context = dict(entry.get('context', {}), allowed_company_ids=[company.id], discard_logo_check=True)
+        wizard = self.env[entry['model']].with_context(context).with_company(company).create(
+            self._prepare_wizard_vals(entry, company, date_from, date_to))
+        context.update(active_model=wizard._name, active_id=wizard.id, active_ids=wizard.ids)
+        wizard = wizard.with_context(context)
+        result = getattr(wizard, entry['method'])()
+        if entry.get('render') and isinstance(result, dict):
+            # unwrap the layout configurator action some report actions return
+            action = result.get('context', {}).get('report_action') or result
+            if action.get('report_name'):
+                self.env['report.%s' % action['report_name']].with_context(context)._get_report_values(
+                    wizard.ids, data=action.get('data'))
+        return result
+
+    @api.model
+    def run_benchmarks(self, company, date_from, date_to, repeat=3, names=None):
+        """ Time every installed report entry point on the ledger of ``company``.
+
+            :param repeat: number of timed runs per entry point, after one warm-up run
+            :param names: optional list of entry point names to restrict the run
+            :return: machine readable result, see ``write_baseline``
+        """
+        cr = self.env.cr
+        cr.execute("SELECT COUNT(*) FROM account_move_line WHERE company_id = %s", (company.id,))
+        line_count = cr.fetchone()[0]
+        results = {}
+        for entry in self._get_entry_points(names):
+            timings, queries, error = [], [], None
+            for run in range(repeat + 1):
+                self.env.flush_all()
+                self.env.invalidate_all()
+                query_count = cr.sql_log_count
+                start = time.perf_counter()
+                try:
+                    with cr.savepoint():
+                        self._run_entry_point(entry, company, date_from, date_to)
+                        self.env.flush_all()
+                except Exception as e:
+                    error = repr(e)
+                    _logger.warning("Benchmark entry point %s failed: %s", entry['name'], error)
+                    break
+                if run:
+                    timings.append(time.perf_counter() - start)
+                    queries.append(cr.sql_log_count - query_count)
+            results[entry['name']] = {
+                'model': entry['model'],
+                'method': entry['method'],
+                'runs': len(timings),
+                'min': min(timings) if timings else None,
+                'median': statistics.median(timings) if timings else None,
+                'max': max(timings) if timings else None,
+                'queries': max(queries) if queries else None,
+                'error': error,
+            }
+            _logger.info("Benchmark %s: %s", entry['name'], results[entry['name']])
+        return {
+            'meta': {
+                'timestamp': fields.Datetime.to_string(fields.Datetime.now()),
+                'odoo_version': release.version,
+                'python_version': platform.python_version(),
+                'database': cr.dbname,
+                'company_id': company.id,
+                'move_lines': line_count,
+                'date_from': fields.Date.to_string(date_from),
+                'date_to': fields.Date.to_string(date_to),
+                'repeat': repeat,
+            },
+            'results': results,
+        }
+
+    @api.model
+    def write_baseline(self, result, path):
+        with open(path, 'w') as baseline_file:
+            json.dump(result, baseline_file, indent=2, sort_keys=True)
+
+    @api.model
+    def compare_baseline(self, result, baseline, tolerance=0.25):
+        """ Compare a benchmark result with a previous baseline.
+
+            :param baseline: a result dict or the path of a baseline written by ``write_baseline``
+            :param tolerance: allowed relative slowdown of the median time and query count
+            :return: list of (entry point name, metric, baseline value, current value) regressions
+        """
+        if isinstance(baseline, str):
+            with open(baseline) as baseline_file:
+                baseline = json.load(baseline_file)
+        regressions = []
+        for name, current in result['results'].items():
+            previous = baseline.get('results', {}).get(name)
+            if not previous:
+                continue
+            if current['error'] and not previous['error']:
+                regressions.append((name, 'error', previous['error'], current['error']))
+                continue
+            for metric in ('median', 'queries'):
+                if previous[metric] is None or current[metric] is None:
+                    continue
+                if current[metric] > previous[metric] * (1 + tolerance):
+                    regressions.append((name, metric, previous[metric], current[metric]))
+        return regressions
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+import os
+from datetime import date
+
+from odoo.tests import common, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestReportBenchmark(common.TransactionCase):
+    """ Small synthetic ledger by default. Set ``BENCHMARK_MOVES`` (and the
+        other ``BENCHMARK_*`` variables) to run on a realistic volume,
+        ``BENCHMARK_OUTPUT`` to write the timings as a JSON baseline and
+        ``BENCHMARK_BASELINE`` to fail on regressions against a previous one.
+    """
+
+    def _env_int(self, name, default):
+        return int(os.environ.get(name, default))
+
+    def test_00_generate_and_time_reports(self):
+        date_from = date(2023, 1, 1)
+        date_to = date(2023, 12, 31)
+        company = self.env['account.report.benchmark.generator'].generate(
+            accounts=self._env_int('BENCHMARK_ACCOUNTS', 20),
+            partners=self._env_int('BENCHMARK_PARTNERS', 50),
+            journals=self._env_int('BENCHMARK_JOURNALS', 5),
+            moves=self._env_int('BENCHMARK_MOVES', 300),
+            date_from=date_from, date_to=date_to)
+
+        # every move is balanced and reconciled lines keep a consistent residual
+        self.env.cr.execute("""
+            SELECT COUNT(*), SUM(debit) - SUM(credit)
+              FROM account_move_line WHERE company_id = %s
+        """, (company.id,))
+        line_count, unbalanced = self.env.cr.fetchone()
+        self.assertGreaterEqual(line_count, 2 * self._env_int('BENCHMARK_MOVES', 300))
+        self.assertAlmostEqual(unbalanced, 0.0)
+        self.env.cr.execute("""
+            SELECT COUNT(*) FROM account_partial_reconcile r
+              JOIN account_move_line d ON d.id = r.debit_move_id
+             WHERE r.company_id = %s AND d.amount_residual < 0
+        """, (company.id,))
+        self.assertEqual(self.env.cr.fetchone()[0], 0)
+
+        Benchmark = self.env['account.report.benchmark']
+        result = Benchmark.run_benchmarks(company, date_from, date_to,
+                                          repeat=self._env_int('BENCHMARK_REPEAT', 1))
+        self.assertEqual(result['meta']['move_lines'], line_count)
+        self.assertEqual(set(result['results']), {entry['name'] for entry in Benchmark._get_entry_points()})
+        for name, timing in result['results'].items():
+            self.assertFalse(timing['error'], "Report entry point %s failed" % name)
+
+        if os.environ.get('BENCHMARK_OUTPUT'):
+            Benchmark.write_baseline(result, os.environ['BENCHMARK_OUTPUT'])
+        if os.environ.get('BENCHMARK_BASELINE'):
+            regressions = Benchmark.compare_baseline(result, os.environ['BENCHMARK_BASELINE'])
+            self.assertFalse(regressions, "Report regressions against baseline: %s" % regressions)
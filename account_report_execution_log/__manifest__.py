@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+
+{
+    'name': 'Accounting Reports Execution Log',
+    'version': '16.0.1.0.2',
+    'category': 'Accounting',
+    'summary': 'Wall time, SQL and memory statistics of every accounting report run',
+    'description': 'Records wall time, query count and time, rows fetched and filters of the '
+                   'accounting report entry points, with an optional EXPLAIN ANALYZE of the slowest '
+                   'statements and an opt-in peak memory tracing',
+    'license': 'LGPL-3',
+    'depends': ['account'],
+    'demo': [],
+    'data': [
+        'security/ir.model.access.csv',
+        'data/ir_config_parameter.xml',
+        'views/report_execution_log_views.xml',
+    ],
+    'installable': True,
+    'application': False,
+    'auto_install': False,
+}
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+
+
+def migrate(cr, version):
+    """ The memory tracing parameter is created with noupdate: switch it off
+    on the databases still holding the former default, unless it was set by
+    an administrator since its creation """
+    cr.execute("""
+        UPDATE ir_config_parameter p
+           SET value = '0'
+          FROM ir_model_data d
+         WHERE d.module = 'account_report_execution_log'
+           AND d.name = 'param_report_execution_log_trace_memory'
+           AND d.model = 'ir.config_parameter'
+           AND d.res_id = p.id
+           AND p.value = '1'
+           AND p.write_date = p.create_date
+    """)
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+
+import heapq
+import json
+import logging
+import threading
+import time
+import tracemalloc
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+# report entry points wrapped by the instrumentation, on every model below
+INSTRUMENTED_METHODS = (
+    'process_data',
+    'process_detailed_data',
+    'build_detailed_move_lines',
+    'get_report_datas',
+    'get_report_values',
+    'action_xlsx',
+    '_get_report_values',
+    '_get_account_move_entry',
+    '_get_partner_move_lines',
+    '_get_accounts',
+)
+INSTRUMENTED_MODELS = (
+    'ins.general.ledger',
+    'ins.partner.ledger',
+    'ins.trial.balance',
+    'ins.partner.ageing',
+    'ins.financial.report',
+    'accounting.report.bi',
+)
+INSTRUMENTED_REPORT_PREFIXES = (
+    'report.account_dynamic_reports.',
+    'report.accounting_pdf_reports.',
+    'report.om_account_daily_reports.',
+    'report.bi_financial_pdf_reports.',
+)
+
+# stack of the instrumented calls running in the current thread
+_local = threading.local()
+
+
+class CursorStatistics(object):
+    """ Counts the statements run on a cursor while it is being observed, and
+        keeps the slowest SELECT statements for an EXPLAIN ANALYZE.
+    """
+
+    def __init__(self, cr, explain_limit=0):
+        self.cr = cr
+        self.explain_limit = explain_limit
+        self.count = 0
+        self.time = 0.0
+        self.rows = 0
+        self._slowest = []
+        self._sequence = 0
+        self._execute = None
+
+    def start(self):
+        self._execute = self.cr.execute
+        self.cr.execute = self.execute
+
+    def stop(self):
+        if self.cr.__dict__.get('execute') == self.execute:
+            del self.cr.execute
+
+    def execute(self, query, params=None, log_exceptions=True):
+        start = time.perf_counter()
+        res = self._execute(query, params, log_exceptions)
+        delay = time.perf_counter() - start
+        self.count += 1
+        self.time += delay
+        if self.cr.description is not None:
+            self.rows += max(self.cr.rowcount, 0)
+        if self.explain_limit and isinstance(query, str) and query.lstrip()[:6].upper() in ('SELECT', 'WITH'):
+            self._sequence += 1
+            item = (delay, self._sequence, query, params)
+            if len(self._slowest) < self.explain_limit:
+                heapq.heappush(self._slowest, item)
+            else:
+                heapq.heappushpop(self._slowest, item)
+        return res
+
+    def explain(self):
+        """ EXPLAIN ANALYZE the slowest statements, must be called after ``stop`` """
+        plans = []
+        for delay, dummy, query, params in sorted(self._slowest, reverse=True):
+            try:
+                with self.cr.savepoint(flush=False):
+                    self.cr.execute('EXPLAIN (ANALYZE, BUFFERS) ' + query, params)
+                    plan = '\n'.join(row[0] for row in self.cr.fetchall())
+            except Exception as e:
+                plan = repr(e)
+            plans.append('-- %.3f s\n%s\n%s' % (delay, self.cr.mogrify(query, params).decode(errors='replace')
+                                                 if params else query, plan))
+        return '\n\n'.join(plans)
+
+
+def _json_default(value):
+    if isinstance(value, models.BaseModel):
+        return value.ids
+    return str(value)
+
+
+def _instrument(method_name):
+    def instrumented(self, *args, **kwargs):
+        return self.env['report.execution.log']._run_instrumented(
+            self, method_name, instrumented.origin, args, kwargs)
+    return instrumented
+
+
+class ReportExecutionLog(models.Model):
+    _name = 'report.execution.log'
+    _description = 'Report Execution Log'
+    _order = 'id desc'
+
+    name = fields.Char(string='Report', required=True, readonly=True)
+    model = fields.Char(string='Model', readonly=True, index=True)
+    method = fields.Char(string='Method', readonly=True)
+    res_id = fields.Integer(string='Record', readonly=True)
+    parent_id = fields.Many2one('report.execution.log', string='Called From', readonly=True,
+                                index=True, ondelete='cascade')
+    child_ids = fields.One2many('report.execution.log', 'parent_id', string='Nested Calls', readonly=True)
+    user_id = fields.Many2one('res.users', string='User', readonly=True)
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+    date = fields.Datetime(string='Date', readonly=True, index=True)
+    duration = fields.Float(string='Wall Time (s)', readonly=True, digits=(16, 3), group_operator='max')
+    query_count = fields.Integer(string='Queries', readonly=True, group_operator='max')
+    query_time = fields.Float(string='SQL Time (s)', readonly=True, digits=(16, 3), group_operator='max')
+    rows_fetched = fields.Integer(string='Rows Fetched', readonly=True, group_operator='max')
+    peak_memory = fields.Float(
+        string='Peak Memory (MB)', readonly=True, digits=(16, 2), group_operator='max',
+        help="Only measured when the report_execution_log.trace_memory parameter is set. Memory "
+             "tracing is process wide: it slows down every thread of the worker while the report "
+             "runs and the peak includes the allocations of the other threads.")
+    filters = fields.Text(string='Filters', readonly=True)
+    explain = fields.Text(string='Slowest Statements', readonly=True)
+
+    def _register_hook(self):
+        """ Wrap the report entry points of the installed report modules.
+            The wrapped models are not dependencies of this module, so they
+            are patched on the registry instead of being inherited.
+        """
+        res = super()._register_hook()
+        for model_name in self.env.registry.models:
+            if model_name not in INSTRUMENTED_MODELS and not model_name.startswith(INSTRUMENTED_REPORT_PREFIXES):
+                continue
+            model = self.env[model_name]
+            for method_name in INSTRUMENTED_METHODS:
+                method = getattr(type(model), method_name, None)
+                if method is None or getattr(method, '_report_execution_log', False):
+                    continue
+                model._patch_method(method_name, _instrument(method_name))
+                getattr(type(model), method_name)._report_execution_log = True
+        return res
+
+    @api.model
+    def _get_config(self):
+        get_param = self.env['ir.config_parameter'].sudo().get_param
+        return {
+            'enabled': get_param('report_execution_log.enabled', '1') not in ('0', 'False', ''),
+            # opt-in diagnostic, tracemalloc slows down the whole worker process
+            'trace_memory': get_param('report_execution_log.trace_memory', '0') not in ('0', 'False', ''),
+            'explain_slowest': int(get_param('report_execution_log.explain_slowest', 0) or 0),
+        }
+
+    @api.model
+    def _get_call_filters(self, records, args, kwargs):
+        """ Parameters of the report run, as shown on the log """
+        data = kwargs.get('data') if 'data' in kwargs else (args[1] if len(args) > 1 else None)
+        if isinstance(data, dict):
+            values = data.get('form', data)
+        elif len(records) == 1 and records._transient:
+            fnames = [name for name, field in records._fields.items()
+                      if field.store and not field.automatic and field.type != 'binary']
+            values = records.read(fnames)[0]
+        else:
+            values = {'args': args, 'kwargs': kwargs}
+        try:
+            return json.dumps(values, default=_json_default, sort_keys=True)[:100000]
+        except (TypeError, ValueError):
+            return repr(values)[:100000]
+
+    @api.model
+    def _run_instrumented(self, records, method_name, origin, args, kwargs):
+        config = self._get_config()
+        if not config['enabled']:
+            return origin(records, *args, **kwargs)
+
+        stack = getattr(_local, 'stack', None)
+        outermost = not stack
+        if outermost:
+            stack = _local.stack = []
+            statistics = CursorStatistics(records.env.cr, config['explain_slowest'])
+            trace_memory = config['trace_memory'] and not tracemalloc.is_tracing()
+            if trace_memory:
+                tracemalloc.start()
+            statistics.start()
+        else:
+            statistics = stack[0]['statistics']
+
+        frame = {
+            'statistics': statistics,
+            'children': [],
+            'vals': {
+                'name': '%s.%s' % (records._name, method_name),
+                'model': records._name,
+                'method': method_name,
+                'res_id': records.id if len(records) == 1 else 0,
+                'user_id': records.env.uid,
+                'company_id': records.env.company.id,
+                'date': fields.Datetime.now(),
+                'filters': self._get_call_filters(records, args, kwargs),
+            },
+        }
+        count, query_time, rows = statistics.count, statistics.time, statistics.rows
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            result = origin(records, *args, **kwargs)
+        except BaseException:
+            if outermost:
+                statistics.stop()
+                if trace_memory:
+                    tracemalloc.stop()
+                _local.stack = None
+            else:
+                stack.pop()
+            raise
+
+        frame['vals'].update({
+            'duration': time.perf_counter() - start,
+            'query_count': statistics.count - count,
+            'query_time': statistics.time - query_time,
+            'rows_fetched': statistics.rows - rows,
+        })
+        stack.pop()
+        if not outermost:
+            stack[-1]['children'].append(frame)
+            return result
+
+        statistics.stop()
+        if trace_memory:
+            frame['vals']['peak_memory'] = tracemalloc.get_traced_memory()[1] / (1024.0 * 1024.0)
+            tracemalloc.stop()
+        _local.stack = None
+        if config['explain_slowest']:
+            frame['vals']['explain'] = statistics.explain()
+        self._create_from_frames([frame])
+        return result
+
+    @api.model
+    def _create_from_frames(self, frames, parent=None):
+        logs = self.sudo().create([dict(frame['vals'], parent_id=parent and parent.id) for frame in frames])
+        for log, frame in zip(logs, frames):
+            if frame['children']:
+                self._create_from_frames(frame['children'], log)
+        return logs
+
+    @api.autovacuum
+    def _gc_execution_logs(self):
+        days = int(self.env['ir.config_parameter'].sudo().get_param('report_execution_log.retention_days', 30) or 0)
+        if days > 0:
+            self.sudo().search([
+                ('parent_id', '=', False),
+                ('date', '<', fields.Datetime.now() - timedelta(days=days)),
+            ]).unlink()
@@ -3,7 +3,7 @@
 
 {
     'name': 'Odoo 16 Assets Management',
-    'version': '16.0.1.3.0',
+    'version': '16.0.1.13.5',
     'author': 'Odoo Mates, Odoo SA',
     'depends': ['account'],
     'description': """Manage assets owned by a company or a person. 
@@ -25,6 +25,7 @@
         'views/account_asset_templates.xml',
         'views/asset_category_views.xml',
         'views/product_views.xml',
+        'views/account_asset_depreciation_run_views.xml',
         'report/account_asset_report_views.xml',
     ],
     'assets': {
@@ -5,3 +5,5 @@ from . import account
 from . import account_asset
 from . import account_move
 from . import product
+from . import account_asset_depreciation_run
+from . import account_asset_forecast
@@ -2,7 +2,7 @@
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
 
 import calendar
-from datetime import date, datetime
+from datetime import date
 from dateutil.relativedelta import relativedelta
 
 from odoo import api, fields, models, _
@@ -145,7 +145,7 @@ class AccountAssetAsset(models.Model):
     method_end = fields.Date(string='Ending Date', readonly=True, states={'draft': [('readonly', False)]})
     method_progress_factor = fields.Float(string='Degressive Factor',
                                           readonly=True, default=0.3, states={'draft': [('readonly', False)]})
-    value_residual = fields.Monetary(compute='_amount_residual', string='Residual Value')
+    value_residual = fields.Monetary(compute='_amount_residual', string='Residual Value', store=True)
     method_time = fields.Selection([('number', 'Number of Entries'), ('end', 'Ending Date')],
                                    string='Time Method', required=True, readonly=True, default='number',
                                    states={'draft': [('readonly', False)]},
@@ -194,7 +194,7 @@ class AccountAssetAsset(models.Model):
 
     @api.model
     def _cron_generate_entries(self):
-        self.compute_generated_entries(datetime.today())
+        self.env['account.asset.depreciation.run']._cron_run(fields.Date.context_today(self))
 
     @api.model
     def compute_generated_entries(self, date, asset_type=None):
@@ -206,12 +206,22 @@ class AccountAssetAsset(models.Model):
 
         ungrouped_assets = self.env['account.asset.asset'].search(type_domain + [('state', '=', 'open'), ('category_id.group_entries', '=', False)])
         created_move_ids += ungrouped_assets._compute_entries(date, group_entries=False)
-
-        for grouped_category in self.env['account.asset.category'].search(type_domain + [('group_entries', '=', True)]):
-            assets = self.env['account.asset.asset'].search([('state', '=', 'open'), ('category_id', '=', grouped_category.id)])
-            created_move_ids += assets._compute_entries(date, group_entries=True)
+        created_move_ids += self._compute_grouped_entries(date, asset_type=asset_type)
         return created_move_ids
 
+    @api.model
+    def _compute_grouped_entries(self, date, asset_type=None):
+        """ One entry per grouped category for all its depreciation lines due at ``date`` """
+        domain = [
+            ('move_check', '=', False),
+            ('depreciation_date', '<=', date),
+            ('asset_id.state', '=', 'open'),
+            ('asset_id.category_id.group_entries', '=', True),
+        ]
+        if asset_type:
+            domain.append(('asset_id.category_id.type', '=', asset_type))
+        return self.env['account.asset.depreciation.line'].search(domain)._create_grouped_moves()
+
     def _compute_board_amount(self, sequence, residual_amount, amount_to_depr,
                               undone_dotation_number, posted_depreciation_line_ids,
                               total_days, depreciation_date):
@@ -259,74 +269,114 @@ class AccountAssetAsset(models.Model):
             undone_dotation_number += 1
         return undone_dotation_number
 
-    def compute_depreciation_board(self):
-        self.ensure_one()
-
-        posted_depreciation_line_ids = self.depreciation_line_ids.filtered(lambda x: x.move_check).sorted(key=lambda l: l.depreciation_date)
-        unposted_depreciation_line_ids = self.depreciation_line_ids.filtered(lambda x: not x.move_check)
+    def _get_depreciation_dates(self, first_date, count):
+        """ Dates of the next ``count`` depreciation lines starting at ``first_date``.
 
-        # Remove old unposted depreciation lines. We cannot use unlink() with One2many field
-        commands = [(2, line_id.id, False) for line_id in unposted_depreciation_line_ids]
-
-        if self.value_residual != 0.0:
-            amount_to_depr = residual_amount = self.value_residual
-
-            # if we already have some previous validated entries, starting date is last entry + method period
-            if posted_depreciation_line_ids and posted_depreciation_line_ids[-1].depreciation_date:
-                last_depreciation_date = fields.Date.from_string(posted_depreciation_line_ids[-1].depreciation_date)
-                depreciation_date = last_depreciation_date + relativedelta(months=+self.method_period)
+            Same dates as adding ``method_period`` months to the previous
+            date ``count`` times: the day of month sticks to the shortest month
+            reached so far, unless it is restored for manual dates or moved
+            to the end of the month for monthly 'last_day_period' boards.
+        """
+        self.ensure_one()
+        month_day = first_date.day
+        restore_day = month_day > 28 and self.date_first_depreciation == 'manual'
+        month_end = not self.prorata and self.method_period % 12 != 0 \
+            and self.date_first_depreciation == 'last_day_period'
+        first_month = first_date.year * 12 + first_date.month - 1
+        dates = [first_date] if count > 0 else []
+        day = month_day
+        for index in range(1, count):
+            year, month = divmod(first_month + index * self.method_period, 12)
+            max_day_in_month = calendar.monthrange(year, month + 1)[1]
+            if restore_day:
+                day = min(max_day_in_month, month_day)
+            elif month_end:
+                day = max_day_in_month
             else:
-                # depreciation_date computed from the purchase date
-                depreciation_date = self.date
-                if self.date_first_depreciation == 'last_day_period':
-                    # depreciation_date = the last day of the month
-                    depreciation_date = depreciation_date + relativedelta(day=31)
-                    # ... or fiscalyear depending the number of period
-                    if self.method_period == 12:
-                        depreciation_date = depreciation_date + relativedelta(month=int(self.company_id.fiscalyear_last_month))
-                        depreciation_date = depreciation_date + relativedelta(day=int(self.company_id.fiscalyear_last_day))
-                        if depreciation_date < self.date:
-                            depreciation_date = depreciation_date + relativedelta(years=1)
-                elif self.first_depreciation_manual_date and self.first_depreciation_manual_date != self.date:
-                    # depreciation_date set manually from the 'first_depreciation_manual_date' field
-                    depreciation_date = self.first_depreciation_manual_date
-            total_days = (depreciation_date.year % 4) and 365 or 366
-            month_day = depreciation_date.day
-            undone_dotation_number = self._compute_board_undone_dotation_nb(depreciation_date, total_days)
-
-            for x in range(len(posted_depreciation_line_ids), undone_dotation_number):
-                sequence = x + 1
-                amount = self._compute_board_amount(sequence, residual_amount, amount_to_depr,
-                                                    undone_dotation_number, posted_depreciation_line_ids,
-                                                    total_days, depreciation_date)
-                amount = self.currency_id.round(amount)
-                if float_is_zero(amount, precision_rounding=self.currency_id.rounding):
-                    continue
-                residual_amount -= amount
-                vals = {
-                    'amount': amount,
-                    'asset_id': self.id,
-                    'sequence': sequence,
-                    'name': (self.code or '') + '/' + str(sequence),
-                    'remaining_value': residual_amount,
-                    'depreciated_value': self.value - (self.salvage_value + residual_amount),
-                    'depreciation_date': depreciation_date,
-                }
-                commands.append((0, False, vals))
-
-                depreciation_date = depreciation_date + relativedelta(months=+self.method_period)
+                day = min(day, max_day_in_month)
+            dates.append(date(year, month + 1, day))
+        return dates
 
-                if month_day > 28 and self.date_first_depreciation == 'manual':
-                    max_day_in_month = calendar.monthrange(depreciation_date.year, depreciation_date.month)[1]
-                    depreciation_date = depreciation_date.replace(day=min(max_day_in_month, month_day))
+    def _get_fiscal_year_end(self):
+        """ End of the fiscal year of the company containing the asset date """
+        self.ensure_one()
+        # the fiscal years of om_fiscal_year, when installed
+        if 'account.fiscal.calendar' in self.env:
+            return self.company_id.compute_fiscalyear_dates(self.date)['date_to']
+        fiscal_year_end = self.date + relativedelta(
+            month=int(self.company_id.fiscalyear_last_month), day=int(self.company_id.fiscalyear_last_day))
+        if fiscal_year_end < self.date:
+            fiscal_year_end = fiscal_year_end + relativedelta(years=1)
+        return fiscal_year_end
+
+    def _get_depreciation_board_vals(self, posted_depreciation_line_ids):
+        """ Values of the unposted depreciation lines of the asset """
+        self.ensure_one()
+        if self.value_residual == 0.0:
+            return []
+        amount_to_depr = residual_amount = self.value_residual
 
-                # datetime doesn't take into account that the number of days is not the same for each month
-                if not self.prorata and self.method_period % 12 != 0 and self.date_first_depreciation == 'last_day_period':
-                    max_day_in_month = calendar.monthrange(depreciation_date.year, depreciation_date.month)[1]
-                    depreciation_date = depreciation_date.replace(day=max_day_in_month)
+        # if we already have some previous validated entries, starting date is last entry + method period
+        if posted_depreciation_line_ids and posted_depreciation_line_ids[-1].depreciation_date:
+            last_depreciation_date = fields.Date.from_string(posted_depreciation_line_ids[-1].depreciation_date)
+            depreciation_date = last_depreciation_date + relativedelta(months=+self.method_period)
+        else:
+            # depreciation_date computed from the purchase date
+            depreciation_date = self.date
+            if self.date_first_depreciation == 'last_day_period':
+                # depreciation_date = the last day of the month
+                depreciation_date = depreciation_date + relativedelta(day=31)
+                # ... or fiscalyear depending the number of period
+                if self.method_period == 12:
+                    depreciation_date = self._get_fiscal_year_end()
+            elif self.first_depreciation_manual_date and self.first_depreciation_manual_date != self.date:
+                # depreciation_date set manually from the 'first_depreciation_manual_date' field
+                depreciation_date = self.first_depreciation_manual_date
+        total_days = (depreciation_date.year % 4) and 365 or 366
+        undone_dotation_number = self._compute_board_undone_dotation_nb(depreciation_date, total_days)
+
+        # lines with a zero amount are skipped without consuming a date
+        dates = self._get_depreciation_dates(
+            depreciation_date, undone_dotation_number - len(posted_depreciation_line_ids))
+        vals_list = []
+        for x in range(len(posted_depreciation_line_ids), undone_dotation_number):
+            sequence = x + 1
+            depreciation_date = dates[len(vals_list)]
+            amount = self._compute_board_amount(sequence, residual_amount, amount_to_depr,
+                                                undone_dotation_number, posted_depreciation_line_ids,
+                                                total_days, depreciation_date)
+            amount = self.currency_id.round(amount)
+            if float_is_zero(amount, precision_rounding=self.currency_id.rounding):
+                continue
+            residual_amount -= amount
+            vals_list.append({
+                'amount': amount,
+                'asset_id': self.id,
+                'sequence': sequence,
+                'name': (self.code or '') + '/' + str(sequence),
+                'remaining_value': residual_amount,
+                'depreciated_value': self.value - (self.salvage_value + residual_amount),
+                'depreciation_date': depreciation_date,
+            })
+        return vals_list
 
-        self.write({'depreciation_line_ids': commands})
+    def compute_depreciation_board(self):
+        """ Recompute the unposted depreciation lines of the assets.
+
+            The boards of all the assets are computed from their prefetched
+            lines, then the unposted lines are replaced with a single unlink
+            and a single create for the whole recordset.
+        """
+        unposted_line_ids = []
+        vals_list = []
+        for asset in self:
+            posted_depreciation_line_ids = asset.depreciation_line_ids.filtered(lambda x: x.move_check).sorted(key=lambda l: l.depreciation_date)
+            unposted_line_ids += asset.depreciation_line_ids.filtered(lambda x: not x.move_check).ids
+            vals_list += asset._get_depreciation_board_vals(posted_depreciation_line_ids)
 
+        depreciation_lines = self.env['account.asset.depreciation.line']
+        depreciation_lines.browse(unposted_line_ids).unlink()
+        depreciation_lines.create(vals_list)
         return True
 
     def validate(self):
@@ -342,6 +392,7 @@ class AccountAssetAsset(models.Model):
             'invoice_id',
         ]
         ref_tracked_fields = self.env['account.asset.asset'].fields_get(fields)
+        tracking = {}
         for asset in self:
             tracked_fields = ref_tracked_fields.copy()
             if asset.method == 'linear':
@@ -350,8 +401,28 @@ class AccountAssetAsset(models.Model):
                 del(tracked_fields['method_end'])
             else:
                 del(tracked_fields['method_number'])
-            dummy, tracking_value_ids = asset._mail_track(tracked_fields, dict.fromkeys(fields))
-            asset.message_post(subject=_('Asset created'), tracking_value_ids=tracking_value_ids)
+            dummy, tracking[asset.id] = asset._mail_track(tracked_fields, dict.fromkeys(fields))
+        self._message_log_tracking(_('Asset created'), tracking)
+        self.env['asset.asset.report']._schedule_refresh()
+
+    def _message_log_tracking(self, subject, tracking, body=''):
+        """ Log the tracking values of many assets with one batch of notes
+            :param tracking: dict asset id -> tracking value commands
+        """
+        note = self.env['ir.model.data']._xmlid_to_res_id('mail.mt_note')
+        names = dict(self.browse(list(tracking)).name_get())
+        return self.env['mail.message'].sudo().create([{
+            'model': self._name,
+            'res_id': asset_id,
+            'record_name': names.get(asset_id),
+            'subject': subject,
+            'body': body,
+            'message_type': 'notification',
+            'subtype_id': note,
+            'author_id': self.env.user.partner_id.id,
+            'email_from': self.env.user.email_formatted,
+            'tracking_value_ids': tracking_value_ids,
+        } for asset_id, tracking_value_ids in tracking.items()])
 
     def _return_disposal_view(self, move_ids):
         name = _('Disposal Move')
@@ -401,7 +472,7 @@ class AccountAssetAsset(models.Model):
                 if changes:
                     asset.message_post(subject=_('Asset sold or disposed. Accounting entry awaiting for validation.'), tracking_value_ids=tracking_value_ids)
                 move_ids += asset.depreciation_line_ids[-1].create_move(post_move=False)
-
+        self.env['asset.asset.report']._schedule_refresh()
         return move_ids
 
     def set_to_close(self):
@@ -414,13 +485,33 @@ class AccountAssetAsset(models.Model):
     def set_to_draft(self):
         self.write({'state': 'draft'})
 
+    def _get_depreciation_line_totals(self, aggregate, where):
+        """ Aggregate of the depreciation lines of the saved assets, computed
+            with one grouped query for the whole recordset.
+
+            :return: dict asset id -> aggregated value
+        """
+        asset_ids = tuple(self.filtered('id').ids)
+        if not asset_ids:
+            return {}
+        self.env['account.asset.depreciation.line'].flush_model(['asset_id', 'amount', 'move_id', 'move_check'])
+        self.env.cr.execute("""
+            SELECT asset_id, {aggregate}
+              FROM account_asset_depreciation_line
+             WHERE asset_id IN %s AND {where}
+          GROUP BY asset_id
+        """.format(aggregate=aggregate, where=where), (asset_ids,))
+        return dict(self.env.cr.fetchall())
+
     @api.depends('value', 'salvage_value', 'depreciation_line_ids.move_check', 'depreciation_line_ids.amount')
     def _amount_residual(self):
+        posted_amounts = self._get_depreciation_line_totals('SUM(amount)', 'move_check')
         for rec in self:
-            total_amount = 0.0
-            for line in rec.depreciation_line_ids:
-                if line.move_check:
-                    total_amount += line.amount
+            if rec.id:
+                total_amount = posted_amounts.get(rec.id, 0.0)
+            else:
+                # unsaved asset of a form, its lines are only in the cache
+                total_amount = sum(line.amount for line in rec.depreciation_line_ids if line.move_check)
             rec.value_residual = rec.value - total_amount - rec.salvage_value
 
     @api.onchange('company_id')
@@ -435,9 +526,9 @@ class AccountAssetAsset(models.Model):
 
     @api.depends('depreciation_line_ids.move_id')
     def _entry_count(self):
+        entry_counts = self._get_depreciation_line_totals('COUNT(*)', 'move_id IS NOT NULL')
         for asset in self:
-            res = self.env['account.asset.depreciation.line'].search_count([('asset_id', '=', asset.id), ('move_id', '!=', False)])
-            asset.entry_count = res or 0
+            asset.entry_count = entry_counts.get(asset.id, 0)
 
     @api.constrains('prorata', 'method_time')
     def _check_prorata(self):
@@ -493,15 +584,13 @@ class AccountAssetAsset(models.Model):
     @api.model_create_multi
     def create(self, vals_list):
         assets = super(AccountAssetAsset, self.with_context(mail_create_nolog=True)).create(vals_list)
-        for asset in assets:
-            asset.sudo().compute_depreciation_board()
+        assets.sudo().compute_depreciation_board()
         return assets
 
     def write(self, vals):
         res = super(AccountAssetAsset, self).write(vals)
         if 'depreciation_line_ids' not in vals and 'state' not in vals:
-            for rec in self:
-                rec.compute_depreciation_board()
+            self.compute_depreciation_board()
         return res
 
     def open_entries(self):
@@ -547,6 +636,13 @@ class AccountAssetDepreciationLine(models.Model):
                                   related='asset_id.currency_id',
                                   readonly=True)
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        return super(AccountAssetDepreciationLine, self).create(vals_list)
+
+    def write(self, vals):
+        return super(AccountAssetDepreciationLine, self).write(vals)
+
     @api.depends('move_id')
     def _get_move_check(self):
         for line in self:
@@ -558,17 +654,15 @@ class AccountAssetDepreciationLine(models.Model):
             line.move_posted_check = True if line.move_id and line.move_id.state == 'posted' else False
 
     def create_move(self, post_move=True):
-        created_moves = self.env['account.move']
-        for line in self:
-            if line.move_id:
-                raise UserError(_('This depreciation is already linked to a journal entry. Please post or delete it.'))
-            move_vals = self._prepare_move(line)
-            move = self.env['account.move'].create(move_vals)
+        if any(line.move_id for line in self):
+            raise UserError(_('This depreciation is already linked to a journal entry. Please post or delete it.'))
+        created_moves = self.env['account.move'].create([self._prepare_move(line) for line in self])
+        for line, move in zip(self, created_moves):
             line.write({'move_id': move.id, 'move_check': True})
-            created_moves |= move
 
         if post_move and created_moves:
             created_moves.filtered(lambda m: any(m.asset_depreciation_ids.mapped('asset_id.category_id.open_asset'))).action_post()
+        self.env['asset.asset.report']._schedule_refresh()
         return [x.id for x in created_moves]
 
     def _prepare_move(self, line):
@@ -615,65 +709,92 @@ class AccountAssetDepreciationLine(models.Model):
         }
         return move_vals
 
-    def _prepare_move_grouped(self):
-        asset_id = self[0].asset_id
-        category_id = asset_id.category_id  # we can suppose that all lines have the same category
-        account_analytic_id = asset_id.account_analytic_id
-        # analytic_tag_ids = asset_id.analytic_tag_ids
-        analytic_distribution = asset_id.analytic_distribution
+    def _get_grouped_amounts(self):
+        """ Amounts of the lines summed in SQL by category, company, currency
+            and analytic distribution of their asset.
 
+            :return: list of (category id, company id, currency id, analytic distribution, amount, line ids)
+        """
+        if not self:
+            return []
+        self.env['account.asset.asset'].flush_model(['category_id', 'company_id', 'currency_id', 'analytic_distribution'])
+        self.flush_model(['asset_id', 'amount'])
+        self.env.cr.execute("""
+            SELECT a.category_id, a.company_id, a.currency_id, a.analytic_distribution,
+                   SUM(l.amount), ARRAY_AGG(l.id ORDER BY l.id)
+              FROM account_asset_depreciation_line l
+              JOIN account_asset_asset a ON a.id = l.asset_id
+             WHERE l.id IN %s
+          GROUP BY a.category_id, a.company_id, a.currency_id, a.analytic_distribution
+          ORDER BY a.category_id
+        """, (tuple(self.ids),))
+        return self.env.cr.fetchall()
+
+    def _prepare_grouped_moves(self):
+        """ Values of one entry per category of the lines, with a debit and a
+            credit line per analytic distribution.
+
+            :return: list of (entry values, depreciation lines of the entry)
+        """
         depreciation_date = self.env.context.get('depreciation_date') or fields.Date.context_today(self)
-        amount = 0.0
-        for line in self:
-            # Sum amount of all depreciation lines
-            company_currency = line.asset_id.company_id.currency_id
-            current_currency = line.asset_id.currency_id
-            company = line.asset_id.company_id
-            amount += current_currency._convert(line.amount, company_currency, company, fields.Date.today())
-
-        name = category_id.name + _(' (grouped)')
-        move_line_1 = {
-            'name': name,
-            'account_id': category_id.account_depreciation_id.id,
-            'debit': 0.0,
-            'credit': amount,
-            'journal_id': category_id.journal_id.id,
-            'analytic_account_id': account_analytic_id.id if category_id.type == 'sale' else False,
-            'analytic_distribution': analytic_distribution,
-            # 'analytic_tag_ids': [(6, 0, analytic_tag_ids.ids)] if category_id.type == 'sale' else False,
-        }
-        move_line_2 = {
-            'name': name,
-            'account_id': category_id.account_depreciation_expense_id.id,
-            'credit': 0.0,
-            'debit': amount,
-            'journal_id': category_id.journal_id.id,
-            'analytic_account_id': account_analytic_id.id if category_id.type == 'purchase' else False,
-            'analytic_distribution': analytic_distribution,
-            # 'analytic_tag_ids': [(6, 0, analytic_tag_ids.ids)] if category_id.type == 'purchase' else False,
-        }
-        move_vals = {
-            'ref': category_id.name,
-            'date': depreciation_date or False,
-            'journal_id': category_id.journal_id.id,
-            'line_ids': [(0, 0, move_line_1), (0, 0, move_line_2)],
-        }
-
-        return move_vals
+        groups = {}
+        for category_id, company_id, currency_id, distribution, amount, line_ids in self._get_grouped_amounts():
+            company = self.env['res.company'].browse(company_id)
+            # grouped entries are converted at the rate of the day
+            amount = self.env['res.currency'].browse(currency_id)._convert(
+                amount, company.currency_id, company, fields.Date.today())
+            amounts, group_line_ids = groups.setdefault(category_id, ({}, []))
+            key = tuple(sorted((distribution or {}).items()))
+            amounts[key] = amounts.get(key, 0.0) + amount
+            group_line_ids += line_ids
+
+        result = []
+        for category_id, (amounts, line_ids) in groups.items():
+            category = self.env['account.asset.category'].browse(category_id)
+            name = category.name + _(' (grouped)')
+            move_lines = []
+            for distribution, amount in amounts.items():
+                move_lines += [(0, 0, {
+                    'name': name,
+                    'account_id': category.account_depreciation_id.id,
+                    'debit': 0.0,
+                    'credit': amount,
+                    'analytic_distribution': dict(distribution) or False,
+                }), (0, 0, {
+                    'name': name,
+                    'account_id': category.account_depreciation_expense_id.id,
+                    'credit': 0.0,
+                    'debit': amount,
+                    'analytic_distribution': dict(distribution) or False,
+                })]
+            move_vals = {
+                'ref': category.name,
+                'date': depreciation_date or False,
+                'journal_id': category.journal_id.id,
+                'line_ids': move_lines,
+            }
+            result.append((move_vals, self.browse(line_ids)))
+        return result
 
-    def create_grouped_move(self, post_move=True):
-        if not self.exists():
+    def _create_grouped_moves(self, post_move=True):
+        """ Create the entries of the lines, one per category, in one batch """
+        moves_vals = self._prepare_grouped_moves()
+        if not moves_vals:
             return []
-
-        created_moves = self.env['account.move']
-        move = self.env['account.move'].create(self._prepare_move_grouped())
-        self.write({'move_id': move.id, 'move_check': True})
-        created_moves |= move
+        created_moves = self.env['account.move'].create([move_vals for move_vals, lines in moves_vals])
+        for move, (move_vals, lines) in zip(created_moves, moves_vals):
+            lines.write({'move_id': move.id, 'move_check': True})
 
         if post_move and created_moves:
             created_moves.action_post()
+        self.env['asset.asset.report']._schedule_refresh()
         return [x.id for x in created_moves]
 
+    def create_grouped_move(self, post_move=True):
+        if not self.exists():
+            return []
+        return self.exists()._create_grouped_moves(post_move=post_move)
+
     def post_lines_and_close_asset(self):
         # we re-evaluate the assets to determine whether we can close them
         for line in self:
@@ -682,6 +803,7 @@ class AccountAssetDepreciationLine(models.Model):
             if asset.currency_id.is_zero(asset.value_residual):
                 asset.message_post(body=_("Document closed."))
                 asset.write({'state': 'close'})
+        self.env['asset.asset.report']._schedule_refresh()
 
     def log_message_when_posted(self):
         def _format_message(message_description, tracked_values):
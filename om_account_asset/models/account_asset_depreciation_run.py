@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+import logging
+import threading
+import time
+
+from odoo import api, fields, models, _
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+# number of times the scheduler resumes a failed or interrupted run
+MAX_RETRIES = 3
+
+
+class AccountAssetDepreciationRun(models.Model):
+    """ Posting of the depreciation lines due at a date, in chunks committed
+        one by one. The progress is saved with every chunk so that a run
+        interrupted by a timeout or a crash resumes after its last chunk.
+        The lines of a failing chunk are posted one by one, the failing lines
+        are recorded on the run and retried when it is resumed.
+    """
+    _name = 'account.asset.depreciation.run'
+    _description = 'Depreciation Posting Run'
+    _order = 'id desc'
+
+    name = fields.Char(string='Name', required=True, readonly=True)
+    date = fields.Date(string='Date', required=True, readonly=True,
+                       help="Depreciation lines due on or before this date are posted.")
+    state = fields.Selection([('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')],
+                             string='Status', required=True, default='running', readonly=True)
+    line_count = fields.Integer(string='Lines to Post', readonly=True)
+    processed_count = fields.Integer(string='Lines Posted', readonly=True)
+    move_count = fields.Integer(string='Entries Created', readonly=True)
+    chunk_count = fields.Integer(string='Chunks', readonly=True)
+    last_line_id = fields.Integer(string='Last Line', readonly=True,
+                                  help="Last depreciation line processed, the run resumes after it.")
+    retry_count = fields.Integer(string='Automatic Retries', readonly=True,
+                                 help="Number of times the scheduler resumed the run after a failure "
+                                      "or an interruption.")
+    failed_line_ids = fields.Many2many('account.asset.depreciation.line',
+                                       'account_asset_depreciation_run_failed_line_rel', 'run_id', 'line_id',
+                                       string='Failed Lines', readonly=True,
+                                       help="Depreciation lines whose entry could not be created, they are "
+                                            "retried when the run is resumed.")
+    resume_requested = fields.Boolean(string='Resume Requested', readonly=True)
+    grouped_done = fields.Boolean(string='Grouped Entries Done', readonly=True)
+    date_start = fields.Datetime(string='Started', readonly=True)
+    date_end = fields.Datetime(string='Ended', readonly=True)
+    duration = fields.Float(string='Duration (s)', readonly=True, digits=(16, 2))
+    throughput = fields.Float(string='Entries per Second', compute='_compute_throughput', digits=(16, 2))
+    error = fields.Text(string='Error', readonly=True)
+
+    @api.depends('move_count', 'duration')
+    def _compute_throughput(self):
+        for run in self:
+            run.throughput = run.move_count / run.duration if run.duration else 0.0
+
+    @api.model
+    def _get_chunk_size(self):
+        return int(self.env['ir.config_parameter'].sudo().get_param(
+            'om_account_asset.depreciation_chunk_size', DEFAULT_CHUNK_SIZE) or DEFAULT_CHUNK_SIZE)
+
+    @api.model
+    def _cron_run(self, date):
+        # resume the runs interrupted by a crash or a failed chunk a few times,
+        # a chunk failing again is left to action_resume and does not block
+        # the posting of the other lines
+        for run in self.search([('state', 'in', ('running', 'failed')), ('retry_count', '<', MAX_RETRIES)],
+                               order='id'):
+            run.retry_count += 1
+            run._process()
+        run = self.create({
+            'name': _('Depreciation entries up to %s') % fields.Date.to_string(date),
+            'date': date,
+        })
+        run._process()
+        return run
+
+    def _get_pending_line_domain(self):
+        return [
+            ('move_check', '=', False),
+            ('depreciation_date', '<=', self.date),
+            ('asset_id.state', '=', 'open'),
+            ('asset_id.category_id.group_entries', '=', False),
+        ]
+
+    def action_resume(self):
+        """ Resume the runs in the scheduler rather than in the request """
+        self.filtered(lambda r: r.state != 'done').write({'resume_requested': True})
+        self.env.ref('om_account_asset.depreciation_run_resume_cron').sudo()._trigger()
+
+    @api.model
+    def _cron_resume(self):
+        for run in self.search([('resume_requested', '=', True)], order='id'):
+            run.resume_requested = False
+            if run.state != 'done':
+                run._process()
+
+    def _process(self, auto_commit=None):
+        """ Create and post the entries of the pending depreciation lines of
+            the run, one chunk per transaction.
+        """
+        self.ensure_one()
+        if auto_commit is None:
+            auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        # the assets analysis is refreshed once at the end of the run, not after every chunk
+        self = self.with_context(asset_report_no_refresh=True)
+        DepreciationLine = self.env['account.asset.depreciation.line']
+        chunk_size = self._get_chunk_size()
+        self.write({'state': 'running', 'error': False, 'date_start': self.date_start or fields.Datetime.now()})
+        if not self.line_count:
+            self.line_count = DepreciationLine.search_count(self._get_pending_line_domain())
+        self._commit(auto_commit)
+
+        # the lines failing in a previous attempt are retried first
+        retry_lines = self.failed_line_ids.filtered_domain(self._get_pending_line_domain())
+        if self.failed_line_ids:
+            self.failed_line_ids = [(5, 0, 0)]
+            self._commit(auto_commit)
+        if retry_lines:
+            self._process_lines(retry_lines, auto_commit)
+
+        while True:
+            lines = DepreciationLine.search(
+                self._get_pending_line_domain() + [('id', '>', self.last_line_id)], order='id', limit=chunk_size)
+            if not lines:
+                break
+            self._process_lines(lines, auto_commit, last_line_id=lines[-1].id)
+
+        if not self.grouped_done:
+            assets = self.env['account.asset.asset']
+            error = self._process_chunk(0, lambda: assets._compute_grouped_entries(self.date), auto_commit,
+                                        grouped_done=True)
+            if error:
+                self.write({'state': 'failed', 'error': '\n'.join(filter(None, [self.error, str(error)])),
+                            'date_end': fields.Datetime.now()})
+                self._commit(auto_commit)
+                return False
+
+        if self.failed_line_ids:
+            self.write({'state': 'failed', 'date_end': fields.Datetime.now()})
+            self._commit(auto_commit)
+            _logger.warning("Depreciation run %s: %s lines could not be posted",
+                            self.id, len(self.failed_line_ids))
+            return False
+
+        self.write({'state': 'done', 'date_end': fields.Datetime.now()})
+        self.env['asset.asset.report'].with_context(asset_report_no_refresh=False)._schedule_refresh()
+        self._commit(auto_commit)
+        _logger.info("Depreciation run %s done: %s entries for %s lines in %.2fs (%.2f entries/s)",
+                     self.id, self.move_count, self.processed_count, self.duration, self.throughput)
+        return True
+
+    def _process_lines(self, lines, auto_commit, **progress):
+        """ Create the entries of a chunk of depreciation lines. When the chunk
+            fails, its lines are posted one by one and the failing lines are
+            recorded on the run instead of stopping it.
+        """
+        if not self._process_chunk(len(lines), lines.create_move, auto_commit, **progress):
+            return
+        _logger.warning("Depreciation run %s: posting the lines of the failed chunk one by one", self.id)
+        errors = []
+        failed_lines = self.env['account.asset.depreciation.line']
+        for line in lines:
+            error = self._process_chunk(1, line.create_move, auto_commit)
+            if error:
+                failed_lines |= line
+                errors.append(_('%s (line %s): %s') % (line.asset_id.name, line.id, error))
+        self.write(dict(
+            progress,
+            failed_line_ids=[(4, line_id) for line_id in failed_lines.ids],
+            error='\n'.join(filter(None, [self.error] + errors)),
+        ))
+        self._commit(auto_commit)
+
+    def _process_chunk(self, line_count, create_moves, auto_commit, **progress):
+        """ Create the entries of a chunk and save the progress of the run in
+            the same transaction. A failing chunk is rolled back.
+
+            :return: the exception raised by the chunk, None if it succeeded
+        """
+        start = time.perf_counter()
+        try:
+            with self.env.cr.savepoint():
+                move_ids = create_moves()
+                self.write(dict(
+                    progress,
+                    processed_count=self.processed_count + line_count,
+                    move_count=self.move_count + len(move_ids),
+                    chunk_count=self.chunk_count + 1,
+                    duration=self.duration + time.perf_counter() - start,
+                ))
+        except Exception as e:
+            _logger.warning("Depreciation run %s: chunk after line %s failed: %s", self.id, self.last_line_id, e)
+            return e
+        self._commit(auto_commit)
+        _logger.info("Depreciation run %s: %s/%s lines, %.2f entries/s",
+                     self.id, self.processed_count, self.line_count, self.throughput)
+        return None
+
+    def _commit(self, auto_commit):
+        if auto_commit:
+            self.env.cr.commit()
+            # keep the cache of a long run from growing with every chunk
+            self.env.invalidate_all()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+
+# asset fields that can be overridden in a forecast
+FORECAST_FIELDS = (
+    'method',
+    'method_number',
+    'method_period',
+    'method_progress_factor',
+    'method_time',
+    'method_end',
+    'prorata',
+    'date_first_depreciation',
+    'first_depreciation_manual_date',
+)
+PERIODS = ('month', 'quarter', 'year')
+
+
+class AccountAssetForecast(models.AbstractModel):
+    """ Read-only projection of the depreciations of the asset register.
+
+        The boards of the assets are already stored as unposted depreciation
+        lines, they are aggregated in SQL. The assets whose parameters are
+        overridden for a what-if projection get their board computed in
+        memory on new records, nothing is written.
+    """
+    _name = 'account.asset.forecast'
+    _description = 'Asset Depreciation Forecast'
+
+    @api.model
+    def forecast(self, domain=None, date_from=None, date_to=None, period='month', overrides=None):
+        """ Depreciation amounts by period, category and expense account.
+
+            :param domain: domain of the running and draft assets to project
+            :param date_from: first date of the projection, today by default
+            :param date_to: last date of the projection, five years after date_from by default
+            :param period: 'month', 'quarter' or 'year'
+            :param overrides: dict category id -> {asset field: value} applied to
+                the assets of the category, e.g. ``{3: {'method_number': 10}}``
+            :return: list of dicts with the keys period (first date of the period),
+                category_id, account_id, currency_id, amount and count, sorted by
+                period and category
+        """
+        if period not in PERIODS:
+            raise UserError(_('The forecast period must be one of %s.') % ', '.join(PERIODS))
+        overrides = {int(category_id): values for category_id, values in (overrides or {}).items()}
+        invalid_fields = {fname for values in overrides.values() for fname in values} - set(FORECAST_FIELDS)
+        if invalid_fields:
+            raise UserError(_('These asset fields cannot be changed in a forecast: %s') % ', '.join(sorted(invalid_fields)))
+        date_from = fields.Date.to_date(date_from) or fields.Date.context_today(self)
+        date_to = fields.Date.to_date(date_to) or date_from + relativedelta(years=5)
+
+        assets = self.env['account.asset.asset'].search(
+            (domain or []) + [('state', 'in', ('draft', 'open'))])
+        overridden = assets.filtered(lambda asset: asset.category_id.id in overrides)
+        totals = self._get_stored_board_totals(assets - overridden, date_from, date_to, period)
+        self._add_forecast_board_totals(totals, overridden, overrides, date_from, date_to, period)
+        return [
+            dict(zip(('period', 'category_id', 'account_id', 'currency_id'), key), amount=amount, count=count)
+            for key, (amount, count) in sorted(totals.items())
+        ]
+
+    @api.model
+    def _get_stored_board_totals(self, assets, date_from, date_to, period):
+        """ :return: dict (period, category id, account id, currency id) -> [amount, count] """
+        if not assets:
+            return {}
+        self.env['account.asset.depreciation.line'].flush_model(
+            ['asset_id', 'amount', 'depreciation_date', 'move_check'])
+        self.env['account.asset.asset'].flush_model(['category_id', 'currency_id'])
+        self.env.cr.execute("""
+            SELECT date_trunc(%s, l.depreciation_date)::date, a.category_id,
+                   c.account_depreciation_expense_id, a.currency_id, SUM(l.amount), COUNT(*)
+              FROM account_asset_depreciation_line l
+              JOIN account_asset_asset a ON a.id = l.asset_id
+              JOIN account_asset_category c ON c.id = a.category_id
+             WHERE l.asset_id IN %s
+               AND l.move_check IS NOT TRUE
+               AND l.depreciation_date BETWEEN %s AND %s
+          GROUP BY 1, 2, 3, 4
+        """, (period, tuple(assets.ids), date_from, date_to))
+        return {tuple(row[:4]): [row[4], row[5]] for row in self.env.cr.fetchall()}
+
+    @api.model
+    def _add_forecast_board_totals(self, totals, assets, overrides, date_from, date_to, period):
+        """ Compute the boards of ``assets`` with the overridden parameters of
+            their category in memory and add them to ``totals``
+        """
+        Asset = self.env['account.asset.asset']
+        for asset in assets:
+            posted_depreciation_line_ids = asset.depreciation_line_ids.filtered(lambda x: x.move_check).sorted(key=lambda l: l.depreciation_date)
+            virtual_asset = Asset.new(dict(
+                overrides[asset.category_id.id], value_residual=asset.value_residual), origin=asset)
+            for vals in virtual_asset._get_depreciation_board_vals(posted_depreciation_line_ids):
+                if not date_from <= vals['depreciation_date'] <= date_to:
+                    continue
+                key = (self._get_period_start(vals['depreciation_date'], period), asset.category_id.id,
+                       asset.category_id.account_depreciation_expense_id.id, asset.currency_id.id)
+                total = totals.setdefault(key, [0.0, 0])
+                total[0] += vals['amount']
+                total[1] += 1
+
+    @api.model
+    def _get_period_start(self, day, period):
+        if period == 'year':
+            return day.replace(month=1, day=1)
+        if period == 'quarter':
+            return day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1)
+        return day.replace(day=1)
@@ -46,11 +46,9 @@ class AccountMove(models.Model):
 
     def action_post(self):
         result = super(AccountMove, self).action_post()
-        for inv in self:
-            context = dict(self.env.context)
-            context.pop('default_type', None)
-            for mv_line in inv.invoice_line_ids:
-                mv_line.with_context(context).asset_create()
+        context = dict(self.env.context)
+        context.pop('default_type', None)
+        self.invoice_line_ids.with_context(context).asset_create()
         return result
 
 
@@ -78,57 +76,69 @@ class AccountMoveLine(models.Model):
 
     @api.depends('asset_category_id', 'move_id.invoice_date')
     def _get_asset_date(self):
-        for rec in self:
-            rec.asset_mrr = 0
-            rec.asset_start_date = False
-            rec.asset_end_date = False
+        lines = self.filtered('asset_category_id')
+        (self - lines).update({'asset_mrr': 0, 'asset_start_date': False, 'asset_end_date': False})
+        if lines.asset_category_id.filtered(lambda cat: cat.method_number == 0 or cat.method_period == 0):
+            raise UserError(_('The number of depreciations or the period length of '
+                              'your asset category cannot be 0.'))
+        rates = lines.filtered(
+            lambda line: line.move_id.move_type in ['out_invoice', 'out_refund'])._get_company_currency_rates()
+        for rec in lines:
             cat = rec.asset_category_id
-            if cat:
-                if cat.method_number == 0 or cat.method_period == 0:
-                    raise UserError(_('The number of depreciations or the period length of '
-                                      'your asset category cannot be 0.'))
-                months = cat.method_number * cat.method_period
-                if rec.move_id.move_type in ['out_invoice', 'out_refund']:
-                    price_subtotal = self.currency_id._convert(
-                        self.price_subtotal,
-                        self.company_currency_id,
-                        self.company_id,
-                        self.move_id.invoice_date or fields.Date.context_today(
-                            self))
-
-                    rec.asset_mrr = price_subtotal / months
-                if rec.move_id.invoice_date:
-                    start_date = rec.move_id.invoice_date.replace(day=1)
-                    end_date = (start_date + relativedelta(months=months, days=-1))
-                    rec.asset_start_date = start_date
-                    rec.asset_end_date = end_date
+            months = cat.method_number * cat.method_period
+            rec.asset_mrr = 0
+            if rec in rates:
+                rec.asset_mrr = rec.company_currency_id.round(rec.price_subtotal * rates[rec]) / months
+            start_date = rec.move_id.invoice_date and rec.move_id.invoice_date.replace(day=1)
+            rec.asset_start_date = start_date
+            rec.asset_end_date = start_date and start_date + relativedelta(months=months, days=-1)
+
+    def _get_company_currency_rates(self):
+        """ Rates from the currency of the lines to their company currency at
+            the invoice date, looked up once per currency, company and date
+            :return: dict line -> rate
+        """
+        rates = {}
+        line_rates = {}
+        for line in self:
+            key = (line.currency_id, line.company_currency_id, line.company_id,
+                   line.move_id.invoice_date or fields.Date.context_today(line))
+            if key not in rates:
+                rates[key] = 1.0 if key[0] == key[1] else self.env['res.currency']._get_conversion_rate(*key)
+            line_rates[line] = rates[key]
+        return line_rates
 
     def asset_create(self):
-        if self.asset_category_id:
-            price_subtotal = self.currency_id._convert(
-                self.price_subtotal,
-                self.company_currency_id,
-                self.company_id,
-                self.move_id.invoice_date or fields.Date.context_today(
-                    self))
-            vals = {
-                'name': self.name,
-                'code': self.name or False,
-                'category_id': self.asset_category_id.id,
-                'value': price_subtotal,
-                'partner_id': self.move_id.partner_id.id,
-                'company_id': self.move_id.company_id.id,
-                'currency_id': self.move_id.company_currency_id.id,
-                'date': self.move_id.invoice_date or self.move_id.date,
-                'invoice_id': self.move_id.id,
-            }
-            changed_vals = self.env['account.asset.asset'].onchange_category_id_values(vals['category_id'])
-            vals.update(changed_vals['value'])
-            asset = self.env['account.asset.asset'].create(vals)
-            if self.asset_category_id.open_asset:
-                if asset.date_first_depreciation == 'manual':
-                    asset.first_depreciation_manual_date = asset.date
-                asset.validate()
+        """ Create the assets of all the lines with an asset category at once,
+            their depreciation boards are computed in one batch.
+        """
+        lines = self.filtered('asset_category_id')
+        if not lines:
+            return True
+        Asset = self.env['account.asset.asset']
+        category_values = {}
+        rates = lines._get_company_currency_rates()
+        vals_list = []
+        for line in lines:
+            category = line.asset_category_id
+            if category.id not in category_values:
+                category_values[category.id] = Asset.onchange_category_id_values(category.id)['value']
+            vals = dict(category_values[category.id], **{
+                'name': line.name,
+                'code': line.name or False,
+                'category_id': category.id,
+                'value': line.company_currency_id.round(line.price_subtotal * rates[line]),
+                'partner_id': line.move_id.partner_id.id,
+                'company_id': line.move_id.company_id.id,
+                'currency_id': line.move_id.company_currency_id.id,
+                'date': line.move_id.invoice_date or line.move_id.date,
+                'invoice_id': line.move_id.id,
+            })
+            if category.open_asset and vals['date_first_depreciation'] == 'manual':
+                vals['first_depreciation_manual_date'] = vals['date']
+            vals_list.append(vals)
+        assets = Asset.create(vals_list)
+        assets.filtered(lambda asset: asset.category_id.open_asset).validate()
         return True
 
     @api.onchange('asset_category_id', 'product_uom_id')
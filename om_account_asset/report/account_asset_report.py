@@ -5,6 +5,11 @@ from odoo import api, fields, models, tools
 
 
 class AssetAssetReport(models.Model):
+    """ Materialized view of the depreciation lines, refreshed concurrently
+        by the scheduler, which the transactions validating, depreciating or
+        disposing assets trigger. The other changes, like the edition of
+        draft assets, are picked up by its daily run.
+    """
     _name = "asset.asset.report"
     _description = "Assets Analysis"
     _auto = False
@@ -27,9 +32,12 @@ class AssetAssetReport(models.Model):
     company_id = fields.Many2one('res.company', string='Company', readonly=True)
 
     def init(self):
-        tools.drop_view_if_exists(self._cr, 'asset_asset_report')
+        if tools.table_kind(self._cr, 'asset_asset_report') == 'm':
+            self._cr.execute("DROP MATERIALIZED VIEW asset_asset_report")
+        else:
+            tools.drop_view_if_exists(self._cr, 'asset_asset_report')
         self._cr.execute("""
-            create or replace view asset_asset_report as (
+            create materialized view asset_asset_report as (
                 select
                     min(dl.id) as id,
                     dl.name as name,
@@ -66,3 +74,28 @@ class AssetAssetReport(models.Model):
                     a.date, dl.move_check, a.state, a.category_id, a.partner_id, a.company_id,
                     a.value, a.id, a.salvage_value, dlmin.id
         )""")
+        # the unique index is required by the concurrent refresh
+        self._cr.execute("""
+            CREATE UNIQUE INDEX asset_asset_report_id_index ON asset_asset_report (id);
+            CREATE INDEX asset_asset_report_company_id_depreciation_date_index
+                ON asset_asset_report (company_id, depreciation_date);
+            CREATE INDEX asset_asset_report_asset_category_id_index ON asset_asset_report (asset_category_id);
+        """)
+
+    @api.model
+    def _refresh(self):
+        self.env.cr.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY asset_asset_report")
+
+    @api.model
+    def _schedule_refresh(self):
+        """ Have the scheduler refresh the report once the current transaction
+            is committed, the request does not wait for the refresh. The
+            scheduler is triggered at most once per transaction.
+        """
+        if self.env.context.get('asset_report_no_refresh'):
+            return
+        data = self.env.cr.precommit.data
+        if data.get('asset.asset.report.refresh'):
+            return
+        data['asset.asset.report.refresh'] = True
+        self.env.ref('om_account_asset.asset_report_refresh_cron').sudo()._trigger()
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+from datetime import date
+from unittest.mock import patch
+
+from odoo.exceptions import UserError
+from odoo.tests import common
+
+from odoo.addons.om_account_asset.models.account_asset_depreciation_run import MAX_RETRIES
+
+# boards of the assets of _asset_vals() computed by the original per-asset algorithm:
+# (depreciation date, amount, remaining value, depreciated value) by sequence
+EXPECTED_BOARDS = {
+    'Linear': [
+        (date(2023, 3, 15), 1428.57, 8571.43, 1428.57),
+        (date(2024, 3, 15), 1428.57, 7142.86, 2857.14),
+        (date(2025, 3, 15), 1428.57, 5714.29, 4285.71),
+        (date(2026, 3, 15), 1428.57, 4285.72, 5714.28),
+        (date(2027, 3, 15), 1428.57, 2857.15, 7142.85),
+        (date(2028, 3, 15), 1428.57, 1428.58, 8571.42),
+        (date(2029, 3, 15), 1428.58, 0.0, 10000.0),
+    ],
+    'Linear prorata': [
+        (date(2023, 3, 15), 1142.86, 8857.14, 1142.86),
+        (date(2024, 3, 15), 1428.57, 7428.57, 2571.43),
+        (date(2025, 3, 15), 1428.57, 6000.0, 4000.0),
+        (date(2026, 3, 15), 1428.57, 4571.43, 5428.57),
+        (date(2027, 3, 15), 1428.57, 3142.86, 6857.14),
+        (date(2028, 3, 15), 1428.57, 1714.29, 8285.71),
+        (date(2029, 3, 15), 1428.57, 285.72, 9714.28),
+        (date(2030, 3, 15), 285.72, 0.0, 10000.0),
+    ],
+    'Monthly prorata': [
+        (date(2023, 1, 31), 43.78, 9456.22, 43.78),
+        (date(2023, 2, 28), 1357.14, 8099.08, 1400.92),
+        (date(2023, 3, 31), 1357.14, 6741.94, 2758.06),
+        (date(2023, 4, 30), 1357.14, 5384.8, 4115.2),
+        (date(2023, 5, 31), 1357.14, 4027.66, 5472.34),
+        (date(2023, 6, 30), 1357.14, 2670.52, 6829.48),
+        (date(2023, 7, 31), 1357.14, 1313.38, 8186.62),
+        (date(2023, 8, 31), 1313.38, 0.0, 9500.0),
+    ],
+    'Degressive': [
+        (date(2023, 8, 31), 4000.0, 6000.0, 4000.0),
+        (date(2024, 2, 29), 2400.0, 3600.0, 6400.0),
+        (date(2024, 8, 31), 1440.0, 2160.0, 7840.0),
+        (date(2025, 2, 28), 864.0, 1296.0, 8704.0),
+        (date(2025, 8, 31), 518.4, 777.6, 9222.4),
+        (date(2026, 2, 28), 311.04, 466.56, 9533.44),
+        (date(2026, 8, 31), 466.56, 0.0, 10000.0),
+    ],
+    'Degressive prorata': [
+        (date(2024, 2, 29), 103.45, 9896.55, 103.45),
+        (date(2024, 3, 29), 2968.97, 6927.58, 3072.42),
+        (date(2024, 4, 29), 2078.27, 4849.31, 5150.69),
+        (date(2024, 5, 29), 1454.79, 3394.52, 6605.48),
+        (date(2024, 6, 29), 1018.36, 2376.16, 7623.84),
+        (date(2024, 7, 29), 712.85, 1663.31, 8336.69),
+        (date(2024, 8, 29), 498.99, 1164.32, 8835.68),
+        (date(2024, 9, 29), 1164.32, 0.0, 10000.0),
+    ],
+    'Ending date': [
+        (date(2023, 1, 31), 1000.0, 9000.0, 1000.0),
+        (date(2023, 4, 30), 1000.0, 8000.0, 2000.0),
+        (date(2023, 7, 31), 1000.0, 7000.0, 3000.0),
+        (date(2023, 10, 31), 1000.0, 6000.0, 4000.0),
+        (date(2024, 1, 31), 1000.0, 5000.0, 5000.0),
+        (date(2024, 4, 30), 1000.0, 4000.0, 6000.0),
+        (date(2024, 7, 31), 1000.0, 3000.0, 7000.0),
+        (date(2024, 10, 31), 1000.0, 2000.0, 8000.0),
+        (date(2025, 1, 31), 1000.0, 1000.0, 9000.0),
+        (date(2025, 4, 30), 1000.0, 0.0, 10000.0),
+    ],
+}
+
+
+class TestAssetDepreciationBoard(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        account = cls.env['account.account']
+        cls.category = cls.env['account.asset.category'].create({
+            'name': 'Board Test',
+            'account_asset_id': account.create({
+                'code': '151000', 'name': 'Board Test Assets', 'account_type': 'asset_fixed'}).id,
+            'account_depreciation_id': account.create({
+                'code': '151900', 'name': 'Board Test Depreciation', 'account_type': 'asset_fixed'}).id,
+            'account_depreciation_expense_id': account.create({
+                'code': '611000', 'name': 'Board Test Expense', 'account_type': 'expense_depreciation'}).id,
+            'journal_id': cls.env['account.journal'].create({
+                'name': 'Board Test', 'code': 'BRDT', 'type': 'general'}).id,
+        })
+
+    def _asset_vals(self):
+        base = {'category_id': self.category.id, 'value': 10000.0, 'method_number': 7}
+        return [
+            dict(base, name='Linear', method='linear', method_period=12, date=date(2023, 3, 15)),
+            dict(base, name='Linear prorata', method='linear', method_period=12, prorata=True,
+                 date=date(2023, 3, 15)),
+            dict(base, name='Monthly prorata', method='linear', method_period=1, prorata=True,
+                 date=date(2023, 1, 31), salvage_value=500.0),
+            dict(base, name='Degressive', method='degressive', method_period=6, method_progress_factor=0.4,
+                 date=date(2023, 8, 31), first_depreciation_manual_date=date(2023, 8, 31)),
+            dict(base, name='Degressive prorata', method='degressive', method_period=1, prorata=True,
+                 date=date(2024, 2, 29), date_first_depreciation='last_day_period'),
+            dict(base, name='Ending date', method='linear', method_period=3, method_time='end',
+                 method_end=date(2025, 5, 31), date=date(2023, 1, 31), date_first_depreciation='last_day_period'),
+        ]
+
+    def _board(self, asset):
+        return [(line.sequence, line.depreciation_date, line.amount, line.remaining_value, line.depreciated_value)
+                for line in asset.depreciation_line_ids.sorted('sequence')]
+
+    def test_batch_board_matches_single_asset_boards(self):
+        Asset = self.env['account.asset.asset']
+        batch = Asset.create(self._asset_vals())
+        for vals, asset in zip(self._asset_vals(), batch):
+            single = Asset.create(vals)
+            self.assertTrue(single.depreciation_line_ids)
+            self.assertEqual(self._board(asset), self._board(single), asset.name)
+
+        # recomputing the boards of the whole recordset keeps them unchanged
+        boards = [self._board(asset) for asset in batch]
+        batch.compute_depreciation_board()
+        self.assertEqual([self._board(asset) for asset in batch], boards)
+
+    def test_boards_match_per_asset_algorithm(self):
+        assets = self.env['account.asset.asset'].create(self._asset_vals())
+        for asset in assets:
+            expected = EXPECTED_BOARDS[asset.name]
+            board = self._board(asset)
+            self.assertEqual([(line[0], line[1]) for line in board],
+                             [(sequence, values[0]) for sequence, values in enumerate(expected, 1)], asset.name)
+            for line, values in zip(board, expected):
+                for value, expected_value in zip(line[2:], values[1:]):
+                    self.assertAlmostEqual(value, expected_value, places=2, msg=asset.name)
+
+    def test_yearly_board_follows_fiscal_year_end(self):
+        self.env.company.write({'fiscalyear_last_month': '3', 'fiscalyear_last_day': 31})
+        base = {'category_id': self.category.id, 'value': 9000.0, 'method_number': 3, 'method_period': 12,
+                'date_first_depreciation': 'last_day_period'}
+        after_year_end, before_year_end = self.env['account.asset.asset'].create([
+            dict(base, name='After year end', date=date(2023, 5, 10)),
+            dict(base, name='Before year end', date=date(2023, 2, 10)),
+        ])
+        self.assertEqual(self._board(after_year_end), [
+            (1, date(2024, 3, 31), 3000.0, 6000.0, 3000.0),
+            (2, date(2025, 3, 31), 3000.0, 3000.0, 6000.0),
+            (3, date(2026, 3, 31), 3000.0, 0.0, 9000.0),
+        ])
+        self.assertEqual([line[1] for line in self._board(before_year_end)],
+                         [date(2023, 3, 31), date(2024, 3, 31), date(2025, 3, 31)])
+
+    def test_board_dates_keep_shortest_month_day(self):
+        asset = self.env['account.asset.asset'].create(dict(
+            self._asset_vals()[2], date_first_depreciation='last_day_period'))
+        dates = asset.depreciation_line_ids.sorted('sequence').mapped('depreciation_date')
+        self.assertEqual(dates[:4], [date(2023, 1, 31), date(2023, 2, 28), date(2023, 3, 28), date(2023, 4, 28)])
+
+    def test_depreciation_run_posts_due_lines_in_chunks(self):
+        assets = self.env['account.asset.asset'].create(self._asset_vals()[:3])
+        assets.validate()
+        due_lines = assets.depreciation_line_ids.filtered(lambda l: l.depreciation_date <= date(2024, 12, 31))
+        self.env['ir.config_parameter'].sudo().set_param('om_account_asset.depreciation_chunk_size', 2)
+
+        run = self.env['account.asset.depreciation.run']._cron_run(date(2024, 12, 31))
+        self.assertEqual(run.state, 'done')
+        self.assertEqual(run.line_count, len(due_lines))
+        self.assertEqual(run.processed_count, len(due_lines))
+        self.assertEqual(run.move_count, len(due_lines))
+        self.assertEqual(run.chunk_count, (len(due_lines) + 1) // 2 + 1)
+        self.assertTrue(all(due_lines.mapped('move_check')))
+        self.assertFalse(any((assets.depreciation_line_ids - due_lines).mapped('move_check')))
+
+    def test_failed_run_does_not_block_new_runs(self):
+        assets = self.env['account.asset.asset'].create(self._asset_vals()[:2])
+        assets.validate()
+        Run = self.env['account.asset.depreciation.run']
+        failed = Run.create({'name': 'Failed', 'date': date(2023, 1, 1), 'state': 'failed'})
+        exhausted = Run.create({'name': 'Exhausted', 'date': date(2023, 1, 1), 'state': 'failed',
+                                'retry_count': MAX_RETRIES})
+
+        run = Run._cron_run(date(2024, 12, 31))
+        self.assertNotIn(run, failed | exhausted)
+        self.assertEqual(run.state, 'done')
+        self.assertEqual((failed.state, failed.retry_count), ('done', 1))
+        self.assertEqual((exhausted.state, exhausted.retry_count), ('failed', MAX_RETRIES))
+
+    def test_failing_line_does_not_stop_the_run(self):
+        assets = self.env['account.asset.asset'].create(self._asset_vals()[:3])
+        assets.validate()
+        due_lines = assets.depreciation_line_ids.filtered(lambda l: l.depreciation_date <= date(2024, 12, 31))
+        failing = due_lines.sorted('id')[1]
+        self.env['ir.config_parameter'].sudo().set_param('om_account_asset.depreciation_chunk_size', 2)
+        DepreciationLine = type(self.env['account.asset.depreciation.line'])
+        create_move = DepreciationLine.create_move
+
+        def create_move_in_locked_period(lines, post_move=True):
+            if failing in lines:
+                raise UserError('Locked period')
+            return create_move(lines, post_move=post_move)
+
+        Run = self.env['account.asset.depreciation.run']
+        with patch.object(DepreciationLine, 'create_move', create_move_in_locked_period):
+            run = Run._cron_run(date(2024, 12, 31))
+        self.assertEqual(run.state, 'failed')
+        self.assertEqual(run.failed_line_ids, failing)
+        self.assertIn('Locked period', run.error)
+        self.assertEqual(run.processed_count, len(due_lines) - 1)
+        self.assertTrue(all((due_lines - failing).mapped('move_check')))
+        self.assertFalse(failing.move_check)
+
+        # resuming the run once the line can be posted goes through the scheduler
+        run.action_resume()
+        self.assertTrue(run.resume_requested)
+        Run._cron_resume()
+        self.assertEqual(run.state, 'done')
+        self.assertFalse(run.failed_line_ids)
+        self.assertFalse(run.resume_requested)
+        self.assertTrue(failing.move_check)
+
+    def test_grouped_category_entries(self):
+        self.category.group_entries = True
+        assets = self.env['account.asset.asset'].create(self._asset_vals()[:2])
+        assets.validate()
+        due_lines = assets.depreciation_line_ids.filtered(lambda l: l.depreciation_date <= date(2024, 12, 31))
+
+        move_ids = self.env['account.asset.asset'].compute_generated_entries(date(2024, 12, 31))
+        move = self.env['account.move'].browse(move_ids).filtered(lambda m: m.journal_id == self.category.journal_id)
+        self.assertEqual(len(move), 1)
+        self.assertEqual(due_lines.move_id, move)
+        self.assertAlmostEqual(move.amount_total, sum(due_lines.mapped('amount')))
+
+    def test_mass_modify_recomputes_boards(self):
+        assets = self.env['account.asset.asset'].create(self._asset_vals()[:3])
+        assets.validate()
+        wizard = self.env['asset.modify'].with_context(
+            active_model='account.asset.asset', active_ids=assets.ids, active_id=assets[0].id,
+        ).create({'name': 'Longer lifetime', 'method_number': 10, 'method_period': 12})
+        self.assertTrue(wizard.asset_domain)
+        wizard.modify()
+        self.assertEqual(assets.mapped('method_number'), [10] * len(assets))
+        self.assertEqual(assets.mapped('method_period'), [12] * len(assets))
+        for asset in assets:
+            self.assertAlmostEqual(sum(asset.depreciation_line_ids.mapped('amount')),
+                                   asset.value - asset.salvage_value)
+            self.assertTrue(asset.message_ids.tracking_value_ids)
+
+    def test_forecast_does_not_write_lines(self):
+        assets = self.env['account.asset.asset'].create(self._asset_vals())
+        line_count = len(assets.depreciation_line_ids)
+        Forecast = self.env['account.asset.forecast']
+        domain = [('id', 'in', assets.ids)]
+
+        forecast = Forecast.forecast(domain, date(2023, 1, 1), date(2040, 12, 31), period='year')
+        self.assertAlmostEqual(sum(row['amount'] for row in forecast),
+                               sum(assets.depreciation_line_ids.mapped('amount')))
+        self.assertEqual(sum(row['count'] for row in forecast), line_count)
+
+        what_if = Forecast.forecast(domain, date(2023, 1, 1), date(2040, 12, 31), period='year',
+                                    overrides={self.category.id: {'method_number': 10, 'method_time': 'number'}})
+        self.assertAlmostEqual(sum(row['amount'] for row in what_if), sum(row['amount'] for row in forecast))
+        self.assertGreater(sum(row['count'] for row in what_if), line_count)
+        self.assertEqual(len(assets.depreciation_line_ids), line_count)
+        self.assertEqual(assets.mapped('method_number'), [7] * len(assets))
@@ -3,6 +3,7 @@
 
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError
+from odoo.tools.safe_eval import safe_eval
 
 
 class AssetModify(models.TransientModel):
@@ -14,9 +15,12 @@ class AssetModify(models.TransientModel):
     method_period = fields.Integer(string='Period Length')
     method_end = fields.Date(string='Ending date')
     asset_method_time = fields.Char(compute='_get_asset_method_time', string='Asset Method Time', readonly=True)
+    asset_domain = fields.Char(string='Assets to Modify',
+                               help="Running assets modified at once. Leave empty to modify the current asset only.")
 
     def _get_asset_method_time(self):
-        if self.env.context.get('active_id'):
+        self.asset_method_time = False
+        if self.env.context.get('active_id') and not self.asset_domain:
             asset = self.env['account.asset.asset'].browse(self.env.context.get('active_id'))
             self.asset_method_time = asset.method_time
 
@@ -36,12 +40,22 @@ class AssetModify(models.TransientModel):
         if self.env.context.get('active_id'):
             active_asset = self.env['account.asset.asset'].browse(self.env.context.get('active_id'))
             res['asset_method_time'] = active_asset.method_time
+        active_ids = self.env.context.get('active_ids') or []
+        if 'asset_domain' in fields and self.env.context.get('active_model') == 'account.asset.asset' \
+                and (len(active_ids) > 1 or self.env.context.get('asset_mass_modify')):
+            res['asset_domain'] = str([('id', 'in', active_ids)]) if active_ids else '[]'
+            res['asset_method_time'] = False
         return res
 
     def modify(self):
         """ Modifies the duration of asset for calculating depreciation
         and maintains the history of old values, in the chatter.
         """
+        if self.asset_domain:
+            assets = self.env['account.asset.asset'].search(
+                safe_eval(self.asset_domain) + [('state', '=', 'open')])
+            self._modify_assets(assets)
+            return {'type': 'ir.actions.act_window_close'}
         asset_id = self.env.context.get('active_id', False)
         asset = self.env['account.asset.asset'].browse(asset_id)
         old_values = {
@@ -64,3 +78,34 @@ class AssetModify(models.TransientModel):
         if changes:
             asset.message_post(subject=_('Depreciation board modified'), body=self.name, tracking_value_ids=tracking_value_ids)
         return {'type': 'ir.actions.act_window_close'}
+
+    def _modify_assets(self, assets):
+        """ Modify many assets at once: one write per time method, which
+            recomputes all their boards in batch, and the tracking messages
+            created together.
+        """
+        tracked_fnames = ['method_number', 'method_period', 'method_end']
+        number_assets = assets.filtered(lambda a: a.method_time == 'number')
+        invalid_assets = number_assets.filtered(lambda a: self.method_number <= a.entry_count)
+        if invalid_assets:
+            raise UserError(_('The number of depreciations must be greater than the number of posted or draft entries '
+                              'to allow for complete depreciation of the asset.\n%s')
+                            % ', '.join(invalid_assets[:20].mapped('name')))
+        if not self.method_end and assets - number_assets:
+            raise UserError(_('Set an ending date to modify the assets depreciated until an ending date.'))
+        old_values = {vals.pop('id'): vals for vals in assets.read(tracked_fnames, load=False)}
+
+        if number_assets:
+            number_assets.write({'method_number': self.method_number, 'method_period': self.method_period})
+        end_assets = assets - number_assets
+        if end_assets:
+            end_assets.write({'method_end': self.method_end, 'method_period': self.method_period})
+
+        tracked_fields = self.env['account.asset.asset'].fields_get(tracked_fnames)
+        tracking = {}
+        for asset in assets:
+            changes, tracking_value_ids = asset._mail_track(tracked_fields, old_values[asset.id])
+            if changes:
+                tracking[asset.id] = tracking_value_ids
+        assets._message_log_tracking(_('Depreciation board modified'), tracking, body=self.name)
+        return assets
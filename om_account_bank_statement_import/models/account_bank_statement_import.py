@@ -9,6 +9,7 @@ import io
 import logging
 import tempfile
 import binascii
+from collections import defaultdict
 from datetime import datetime
 
 _logger = logging.getLogger(__name__)
@@ -43,112 +44,139 @@ class AccountBankStatementImport(models.TransientModel):
                                       help='Get you bank statements in electronic format from your bank and'
                                            ' select them here.')
 
-    def get_partner(self, value):
-        partner = self.env['res.partner'].search([('name', '=', value)])
-        return partner.id if partner else False
-
-    def get_currency(self, value):
-        currency = self.env['res.currency'].search([('name', '=', value)])
-        return currency.id if currency else False
-
     def create_statement(self, values):
         statement = self.env['account.bank.statement'].create(values)
         return statement
 
+    def _get_ids_by_name(self, model_name, names):
+        """ Resolve the names of the rows of a file with one query.
+
+        :return: dict name -> list of the ids of the records with this name,
+                 several ids when the name is ambiguous """
+        names = [name for name in set(names) if name]
+        if not names:
+            return {}
+        groups = self.env[model_name].read_group(
+            [('name', 'in', names)], ['ids:array_agg(id)'], ['name'], lazy=False)
+        return {group['name']: sorted(group['ids']) for group in groups}
+
+    def _read_csv_rows(self, data_file):
+        try:
+            csv_data = base64.b64decode(data_file.datas)
+            csv_reader = csv.reader(io.StringIO(csv_data.decode("utf-8")), delimiter=',')
+            return [list(map(str, row)) for row in csv_reader]
+        except Exception:
+            raise UserError(_("Invalid file!"))
+
+    def _read_xlsx_rows(self, data_file):
+        try:
+            fp = tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx")
+            fp.write(binascii.a2b_base64(data_file.datas))
+            fp.seek(0)
+            workbook = xlrd.open_workbook(fp.name)
+            sheet = workbook.sheet_by_index(0)
+        except Exception:
+            raise UserError(_("Invalid file!"))
+        return [list(map(
+            lambda row: isinstance(row.value, bytes) and row.value.encode('utf-8') or str(row.value),
+            sheet.row(row_no))) for row_no in range(sheet.nrows)]
+
+    def _prepare_statement_lines(self, rows):
+        """ Values of the statement lines of the rows of a file, with the
+        partners and currencies of all the rows resolved at once.
+
+        The lines whose partner is unknown or ambiguous are imported without
+        partner, an unknown currency stops the import.
+
+        :param rows: list of (row number, [date, payment reference, reference,
+                     partner, amount, currency])
+        :return: (list of line commands, list of warnings) """
+        partner_ids = self._get_ids_by_name('res.partner', [line[3] for row_no, line in rows])
+        currency_ids = self._get_ids_by_name('res.currency', [line[5] for row_no, line in rows])
+        unknown_partners = defaultdict(list)
+        ambiguous_partners = defaultdict(list)
+        unknown_currencies = defaultdict(list)
+        vals_list = []
+        for row_no, line in rows:
+            partner = partner_ids.get(line[3], [])
+            if len(partner) > 1:
+                ambiguous_partners[line[3]].append(row_no)
+            elif line[3] and not partner:
+                unknown_partners[line[3]].append(row_no)
+            currency = currency_ids.get(line[5], [])
+            if line[5] and not currency:
+                unknown_currencies[line[5]].append(row_no)
+            vals_list.append((0, 0, {
+                'date': line[0],
+                'payment_ref': line[1],
+                'ref': line[2],
+                'partner_id': partner[0] if len(partner) == 1 else False,
+                'amount': line[4],
+                'currency_id': currency[0] if currency else False,
+            }))
+        if unknown_currencies:
+            raise UserError(_("These currencies do not exist:\n%s") % '\n'.join(
+                _("%s (rows %s)") % (code, ', '.join(map(str, row_nos)))
+                for code, row_nos in unknown_currencies.items()))
+        warnings = [
+            _("No partner named %s, rows %s imported without partner.") % (name, ', '.join(map(str, row_nos)))
+            for name, row_nos in unknown_partners.items()
+        ] + [
+            _("%s partners named %s, rows %s imported without partner.") % (
+                len(partner_ids[name]), name, ', '.join(map(str, row_nos)))
+            for name, row_nos in ambiguous_partners.items()
+        ]
+        return vals_list, warnings
+
+    def _get_statement_action(self, statement, warnings):
+        action = {
+            'type': 'ir.actions.act_window',
+            'res_model': 'account.bank.statement',
+            'view_mode': 'form',
+            'res_id': statement.id,
+            'views': [(False, 'form')],
+        }
+        if not warnings:
+            return action
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Some statement lines have no partner'),
+                'message': '\n'.join(warnings),
+                'type': 'warning',
+                'sticky': True,
+                'next': action,
+            },
+        }
+
     def import_file(self):
         for data_file in self.attachment_ids:
-            file_name = data_file.name.lower()
+            file_name = data_file.name.lower().strip()
             try:
-                if file_name.strip().endswith('.csv') or file_name.strip().endswith('.xlsx'):
-                    statement = False
-                    if file_name.strip().endswith('.csv'):
-                        keys = ['date', 'payment_ref', 'partner_id', 'amount', 'currency_id']
-                        try:
-                            csv_data = base64.b64decode(data_file.datas)
-                            data_file = io.StringIO(csv_data.decode("utf-8"))
-                            data_file.seek(0)
-                            file_reader = []
-                            values = {}
-                            csv_reader = csv.reader(data_file, delimiter=',')
-                            file_reader.extend(csv_reader)
-                        except:
-                            raise UserError(_("Invalid file!"))
-                        vals_list = []
-                        date = False
-                        for i in range(len(file_reader)):
-                            field = list(map(str, file_reader[i]))
-                            values = dict(zip(keys, field))
-                            if values:
-                                if i == 0:
-                                    continue
-                                else:
-                                    if not date:
-                                        date = field[0]
-                                    values.update({
-                                        'date': field[0],
-                                        'payment_ref': field[1],
-                                        'ref': field[2],
-                                        'partner_id': self.get_partner(field[3]),
-                                        'amount': field[4],
-                                        'currency_id':  self.get_currency(field[5])
-                                    })
-                                    vals_list.append((0, 0, values))
-                        statement_vals = {
-                            'name': 'Statement Of ' + str(datetime.today().date()),
-                            'journal_id': self.env.context.get('active_id'),
-                            'line_ids': vals_list
-                        }
-                        if len(vals_list) != 0:
-                            statement = self.create_statement(statement_vals)
-                    elif file_name.strip().endswith('.xlsx'):
-                        try:
-                            fp = tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx")
-                            fp.write(binascii.a2b_base64(data_file.datas))
-                            fp.seek(0)
-                            values = {}
-                            workbook = xlrd.open_workbook(fp.name)
-                            sheet = workbook.sheet_by_index(0)
-                        except:
-                            raise UserError(_("Invalid file!"))
-                        vals_list = []
-                        for row_no in range(sheet.nrows):
-                            val = {}
-                            values = {}
-                            if row_no <= 0:
-                                fields = map(lambda row: row.value.encode('utf-8'), sheet.row(row_no))
-                            else:
-                                line = list(map(
-                                    lambda row: isinstance(row.value, bytes) and row.value.encode('utf-8') or str(
-                                        row.value), sheet.row(row_no)))
-                                values.update({
-                                    'date': line[0],
-                                    'payment_ref': line[1],
-                                    'ref': line[2],
-                                    'partner_id': self.get_partner(line[3]),
-                                    'amount': line[4],
-                                    'currency_id': self.get_currency(line[5])
-                                })
-                                vals_list.append((0, 0, values))
-                        statement_vals = {
-                            'name': 'Statement Of ' + str(datetime.today().date()),
-                            'journal_id': self.env.context.get('active_id'),
-                            'line_ids': vals_list
-                        }
-                        if len(vals_list) != 0:
-                            statement = self.create_statement(statement_vals)
-                    if statement:
-                        return {
-                            'type': 'ir.actions.act_window',
-                            'res_model': 'account.bank.statement',
-                            'view_mode': 'form',
-                            'res_id': statement.id,
-                            'views': [(False, 'form')],
-                        }
+                if file_name.endswith('.csv'):
+                    file_rows = self._read_csv_rows(data_file)
+                elif file_name.endswith('.xlsx'):
+                    file_rows = self._read_xlsx_rows(data_file)
                 else:
                     raise ValidationError(_("Unsupported File Type"))
+                # skip the header and the empty rows, rows are numbered as in the file
+                rows = [(row_no + 1, line) for row_no, line in enumerate(file_rows) if row_no and line]
+                vals_list, warnings = self._prepare_statement_lines(rows)
+                statement = False
+                if vals_list:
+                    statement = self.create_statement({
+                        'name': 'Statement Of ' + str(datetime.today().date()),
+                        'journal_id': self.env.context.get('active_id'),
+                        'line_ids': vals_list
+                    })
+            except UserError:
+                raise
             except Exception as e:
                 raise ValidationError(_("Please upload in specified format ! \n"
                                         "date, payment reference, reference, partner, amount, currency !"))
+            if statement:
+                return self._get_statement_action(statement, warnings)
 
     # def import_file(self):
     #     """ Process the file chosen in the wizard, create bank statement(s) and go to reconciliation. """
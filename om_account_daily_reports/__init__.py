@@ -1,4 +1,11 @@
 # -*- coding: utf-8 -*-
 
+from . import models
 from . import wizard
 from . import report
+from .models.account_book_balance import drop_line_triggers
+
+
+def uninstall_hook(cr, registry):
+    ''' The monthly balance triggers write into a table dropped with the module '''
+    drop_line_triggers(cr)
@@ -3,7 +3,7 @@
 
 {
     'name': 'Cash Book, Day Book, Bank Book Financial Reports',
-    'version': '16.0.1.0.1',
+    'version': '16.0.1.0.3',
     'category': 'Invoicing Management',
     'summary': 'Cash Book, Day Book and Bank Book Report For Odoo 16',
     'description': 'Cash Book, Day Book and Bank Book Report For Odoo 16',
@@ -29,6 +29,7 @@
         'report/report_bankbook.xml',
     ],
     'installable': True,
+    'uninstall_hook': 'uninstall_hook',
     'application': False,
     'auto_install': False,
     'live_test_url': 'https://www.youtube.com/watch?v=PEh-an8iCO0',
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+from . import account_journal
+from . import account_book_balance
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+
+from odoo import api, fields, models
+
+
+# columns of the move lines the balances depend on
+BOOK_LINE_COLUMNS = ('account_id', 'journal_id', 'company_id', 'parent_state', 'date', 'debit', 'credit')
+
+# signed amounts and line count of the lines of a transition table
+LINE_CHANGES_QUERY = """
+                SELECT {rows}.account_id, {rows}.journal_id, {rows}.company_id, {rows}.parent_state,
+                       date_trunc('month', {rows}.date)::date,
+                       {sign} {rows}.debit, {sign} {rows}.credit, {sign} 1
+                  FROM {rows} {join}
+                 WHERE {rows}.account_id IS NOT NULL
+                   AND {rows}.journal_id IS NOT NULL
+                   AND {rows}.company_id IS NOT NULL
+                   AND {rows}.parent_state IS NOT NULL
+                   AND {rows}.date IS NOT NULL {changed}"""
+
+# statement level triggers on account_move_line and their transition tables
+LINE_TRIGGERS = (
+    ('om_account_book_balance_line_insert', 'INSERT', 'NEW TABLE AS book_new_rows'),
+    ('om_account_book_balance_line_update', 'UPDATE', 'OLD TABLE AS book_old_rows NEW TABLE AS book_new_rows'),
+    ('om_account_book_balance_line_delete', 'DELETE', 'OLD TABLE AS book_old_rows'),
+)
+
+
+def _line_changes_query(rows, sign, other_rows=None):
+    """ Changes brought by the lines of the transition table ``rows``. For an
+    update, the lines are joined to the transition table ``other_rows`` and
+    only kept when a column of the balances changed. """
+    join = changed = ''
+    if other_rows:
+        join = 'JOIN %s ON %s.id = %s.id' % (other_rows, other_rows, rows)
+        changed = 'AND (%s) IS DISTINCT FROM (%s)' % (
+            ', '.join('%s.%s' % (rows, column) for column in BOOK_LINE_COLUMNS),
+            ', '.join('%s.%s' % (other_rows, column) for column in BOOK_LINE_COLUMNS))
+    return LINE_CHANGES_QUERY.format(rows=rows, sign=sign, join=join, changed=changed)
+
+
+def drop_line_triggers(cr):
+    """ Drop the triggers and functions maintaining the balances """
+    for trigger, dummy, dummy in LINE_TRIGGERS:
+        cr.execute('DROP TRIGGER IF EXISTS %s ON account_move_line' % trigger)
+    cr.execute("""
+        DROP FUNCTION IF EXISTS om_account_book_balance_line_changed();
+        DROP FUNCTION IF EXISTS om_account_book_balance_apply(INTEGER[], INTEGER[], INTEGER[], VARCHAR[], DATE[],
+                                                              NUMERIC[], NUMERIC[], INTEGER[]);
+    """)
+
+
+class AccountBookBalance(models.Model):
+    """ Debit and credit of the move lines per account, journal, company,
+        state and month.
+
+        Statement level triggers on the move lines apply the deltas of the
+        changed lines, the opening balance of the books is read from the
+        months preceding the start date instead of all the previous lines.
+    """
+    _name = 'account.book.balance'
+    _description = 'Cash/Bank Book Monthly Balance'
+    _auto = False
+    _log_access = False
+
+    account_id = fields.Many2one('account.account', string='Account', readonly=True)
+    journal_id = fields.Many2one('account.journal', string='Journal', readonly=True)
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+    parent_state = fields.Char(string='Status', readonly=True)
+    period = fields.Date(string='Month', readonly=True)
+    debit = fields.Float(string='Debit', readonly=True)
+    credit = fields.Float(string='Credit', readonly=True)
+    line_count = fields.Integer(string='Lines', readonly=True)
+
+    def init(self):
+        cr = self.env.cr
+        cr.execute("""
+            CREATE TABLE IF NOT EXISTS account_book_balance (
+                id SERIAL PRIMARY KEY,
+                account_id INTEGER NOT NULL,
+                journal_id INTEGER NOT NULL,
+                company_id INTEGER NOT NULL,
+                parent_state VARCHAR NOT NULL,
+                period DATE NOT NULL,
+                debit NUMERIC NOT NULL DEFAULT 0,
+                credit NUMERIC NOT NULL DEFAULT 0,
+                line_count INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS account_book_balance_key_index
+                ON account_book_balance (account_id, journal_id, company_id, parent_state, period);
+
+            CREATE OR REPLACE FUNCTION om_account_book_balance_apply(account_ids INTEGER[], journal_ids INTEGER[],
+                                                                     company_ids INTEGER[], states VARCHAR[],
+                                                                     periods DATE[], debits NUMERIC[],
+                                                                     credits NUMERIC[], line_counts INTEGER[])
+            RETURNS void AS $$
+            BEGIN
+                IF account_ids IS NULL THEN
+                    RETURN;
+                END IF;
+                -- the rows are changed in a stable order to avoid deadlocks between transactions
+                INSERT INTO account_book_balance (account_id, journal_id, company_id, parent_state, period,
+                                                  debit, credit, line_count)
+                     SELECT c.account_id, c.journal_id, c.company_id, c.parent_state, c.period,
+                            SUM(c.debit), SUM(c.credit), SUM(c.line_count)
+                       FROM unnest(account_ids, journal_ids, company_ids, states, periods, debits, credits, line_counts)
+                            AS c(account_id, journal_id, company_id, parent_state, period, debit, credit, line_count)
+                   GROUP BY c.account_id, c.journal_id, c.company_id, c.parent_state, c.period
+                     HAVING SUM(c.debit) != 0 OR SUM(c.credit) != 0 OR SUM(c.line_count) != 0
+                   ORDER BY c.account_id, c.journal_id, c.company_id, c.parent_state, c.period
+                ON CONFLICT (account_id, journal_id, company_id, parent_state, period) DO UPDATE
+                        SET debit = account_book_balance.debit + EXCLUDED.debit,
+                            credit = account_book_balance.credit + EXCLUDED.credit,
+                            line_count = account_book_balance.line_count + EXCLUDED.line_count;
+                DELETE FROM account_book_balance b
+                 USING unnest(account_ids, journal_ids, company_ids, states, periods)
+                       AS c(account_id, journal_id, company_id, parent_state, period)
+                 WHERE b.account_id = c.account_id
+                   AND b.journal_id = c.journal_id
+                   AND b.company_id = c.company_id
+                   AND b.parent_state = c.parent_state
+                   AND b.period = c.period
+                   AND b.line_count <= 0;
+            END
+            $$ LANGUAGE plpgsql;
+
+            CREATE OR REPLACE FUNCTION om_account_book_balance_line_changed() RETURNS trigger AS $$
+            DECLARE
+                account_ids INTEGER[];
+                journal_ids INTEGER[];
+                company_ids INTEGER[];
+                states VARCHAR[];
+                periods DATE[];
+                debits NUMERIC[];
+                credits NUMERIC[];
+                line_counts INTEGER[];
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    SELECT array_agg(c.account_id), array_agg(c.journal_id), array_agg(c.company_id),
+                           array_agg(c.parent_state), array_agg(c.period), array_agg(c.debit),
+                           array_agg(c.credit), array_agg(c.line_count)
+                      INTO account_ids, journal_ids, company_ids, states, periods, debits, credits, line_counts
+                      FROM ({inserted})
+                           AS c(account_id, journal_id, company_id, parent_state, period, debit, credit, line_count);
+                ELSIF TG_OP = 'UPDATE' THEN
+                    SELECT array_agg(c.account_id), array_agg(c.journal_id), array_agg(c.company_id),
+                           array_agg(c.parent_state), array_agg(c.period), array_agg(c.debit),
+                           array_agg(c.credit), array_agg(c.line_count)
+                      INTO account_ids, journal_ids, company_ids, states, periods, debits, credits, line_counts
+                      FROM ({updated_old} UNION ALL {updated_new})
+                           AS c(account_id, journal_id, company_id, parent_state, period, debit, credit, line_count);
+                ELSE
+                    SELECT array_agg(c.account_id), array_agg(c.journal_id), array_agg(c.company_id),
+                           array_agg(c.parent_state), array_agg(c.period), array_agg(c.debit),
+                           array_agg(c.credit), array_agg(c.line_count)
+                      INTO account_ids, journal_ids, company_ids, states, periods, debits, credits, line_counts
+                      FROM ({deleted})
+                           AS c(account_id, journal_id, company_id, parent_state, period, debit, credit, line_count);
+                END IF;
+                PERFORM om_account_book_balance_apply(account_ids, journal_ids, company_ids, states, periods,
+                                                      debits, credits, line_counts);
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql;
+        """.replace('{inserted}', _line_changes_query('book_new_rows', '+'))
+           .replace('{deleted}', _line_changes_query('book_old_rows', '-'))
+           .replace('{updated_old}', _line_changes_query('book_old_rows', '-', 'book_new_rows'))
+           .replace('{updated_new}', _line_changes_query('book_new_rows', '+', 'book_old_rows')))
+        for trigger, operation, transitions in LINE_TRIGGERS:
+            cr.execute("""
+                DROP TRIGGER IF EXISTS {trigger} ON account_move_line;
+                CREATE TRIGGER {trigger} AFTER {operation} ON account_move_line
+                    REFERENCING {transitions}
+                    FOR EACH STATEMENT EXECUTE FUNCTION om_account_book_balance_line_changed();
+            """.format(trigger=trigger, operation=operation, transitions=transitions))
+        self._rebuild()
+
+    @api.model
+    def _rebuild(self):
+        """ Recompute the balances of all the months """
+        self.env.cr.execute("""
+            TRUNCATE account_book_balance;
+            INSERT INTO account_book_balance (account_id, journal_id, company_id, parent_state, period,
+                                              debit, credit, line_count)
+                 SELECT l.account_id, l.journal_id, l.company_id, l.parent_state, date_trunc('month', l.date)::date,
+                        SUM(l.debit), SUM(l.credit), COUNT(*)
+                   FROM account_move_line l
+                  WHERE l.account_id IS NOT NULL
+                    AND l.journal_id IS NOT NULL
+                    AND l.company_id IS NOT NULL
+                    AND l.parent_state IS NOT NULL
+                    AND l.date IS NOT NULL
+               GROUP BY l.account_id, l.journal_id, l.company_id, l.parent_state, date_trunc('month', l.date);
+        """)
+
+    @api.model
+    def _get_balances(self, account_ids, date_before, company_ids, journal_ids=None, state=None):
+        """ Debit and credit of the accounts over the months preceding the
+            month of ``date_before``, for the given companies, journals and
+            move state ('all' or no state for all the moves but the cancelled)
+            :return: {account_id: (debit, credit)}
+        """
+        self.env['account.move.line'].flush_model(BOOK_LINE_COLUMNS)
+        query = """
+            SELECT account_id, SUM(debit), SUM(credit)
+              FROM account_book_balance
+             WHERE account_id IN %s
+               AND company_id IN %s
+               AND period < date_trunc('month', %s::date)
+               AND parent_state != 'cancel'
+        """
+        params = [tuple(account_ids), tuple(company_ids), date_before]
+        if journal_ids:
+            query += " AND journal_id IN %s"
+            params.append(tuple(journal_ids))
+        if state and state.lower() != 'all':
+            query += " AND parent_state = %s"
+            params.append(state)
+        self.env.cr.execute(query + " GROUP BY account_id", params)
+        return {account_id: (debit, credit) for account_id, debit, credit in self.env.cr.fetchall()}
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+from odoo import api, models
+
+
+class AccountJournal(models.Model):
+    _inherit = 'account.journal'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        res = super().create(vals_list)
+        self.env['report.om_account_daily_reports.book_common'].clear_caches()
+        return res
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {'type', 'company_id', 'inbound_payment_method_line_ids', 'outbound_payment_method_line_ids'} & set(vals):
+            self.env['report.om_account_daily_reports.book_common'].clear_caches()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env['report.om_account_daily_reports.book_common'].clear_caches()
+        return res
+
+
+class AccountPaymentMethodLine(models.Model):
+    _inherit = 'account.payment.method.line'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        res = super().create(vals_list)
+        self.env['report.om_account_daily_reports.book_common'].clear_caches()
+        return res
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {'journal_id', 'payment_account_id', 'payment_type'} & set(vals):
+            self.env['report.om_account_daily_reports.book_common'].clear_caches()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env['report.om_account_daily_reports.book_common'].clear_caches()
+        return res
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+from . import report_book_common
 from . import report_daybook
 from . import report_cashbook
 from . import report_bankbook
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+
+import time
+from odoo import api, fields, models, tools, _
+from odoo.exceptions import UserError
+
+
+class ReportBookCommon(models.AbstractModel):
+    _name = 'report.om_account_daily_reports.book_common'
+    _description = 'Cash/Bank Book Common'
+
+    # journal type whose payment accounts make up the book, set by the
+    # concrete cash/bank book reports
+    _book_journal_type = None
+
+    # rows fetched from the cursor per batch while streaming the book lines
+    _book_fetch_size = 2000
+
+    @api.model
+    @tools.ormcache('journal_type', 'company_id')
+    def _get_book_company_account_ids(self, journal_type, company_id):
+        """ Payment accounts of the journals of the given type for one company.
+            Cached per company, the cache is cleared whenever journals or their
+            payment method lines change.
+        """
+        journals = self.env['account.journal'].sudo().search([
+            ('type', '=', journal_type), ('company_id', '=', company_id)])
+        method_lines = journals.outbound_payment_method_line_ids | journals.inbound_payment_method_line_ids
+        return tuple(sorted(set(method_lines.payment_account_id.ids)))
+
+    @api.model
+    def _get_book_accounts(self):
+        account_ids = set()
+        for company_id in self.env.companies.ids:
+            account_ids.update(self._get_book_company_account_ids(self._book_journal_type, company_id))
+        return self.env['account.account'].search([('id', 'in', list(account_ids))])
+
+    def _get_initial_balances(self, accounts):
+        """ Opening balance of every account: the months preceding the start
+            date are read from the maintained monthly balances, only the lines
+            of the month of the start date are aggregated.
+        """
+        context = self.env.context
+        date_from = fields.Date.to_date(context.get('date_from'))
+        MoveLine = self.env['account.move.line']
+        domain = []
+        balances = {}
+        if date_from:
+            period_start = date_from.replace(day=1)
+            domain = [('date', '>=', period_start)]
+            company_ids = [context['company_id']] if context.get('company_id') else self.env.companies.ids
+            balances = self.env['account.book.balance']._get_balances(
+                accounts.ids, period_start, company_ids,
+                journal_ids=context.get('journal_ids'), state=context.get('state'))
+        init_tables, init_where_clause, init_where_params = MoveLine.with_context(
+            date_from=date_from, date_to=False, initial_bal=True)._query_get(domain=domain)
+        init_wheres = [""]
+        if init_where_clause.strip():
+            init_wheres.append(init_where_clause.strip())
+        init_filters = " AND ".join(init_wheres)
+        filters = init_filters.replace('account_move_line__move_id', 'm').replace('account_move_line', 'l')
+        sql = ("""
+                SELECT l.account_id AS account_id,
+                COALESCE(SUM(l.debit),0.0) AS debit, COALESCE(SUM(l.credit),0.0) AS credit
+                FROM account_move_line l
+                LEFT JOIN account_move m ON (l.move_id = m.id)
+                JOIN account_journal j ON (l.journal_id = j.id)
+                JOIN account_account acc ON (l.account_id = acc.id)
+                WHERE l.account_id IN %s""" + filters + ' GROUP BY l.account_id')
+        params = (tuple(accounts.ids),) + tuple(init_where_params)
+        self.env.cr.execute(sql, params)
+        for account_id, debit, credit in self.env.cr.fetchall():
+            previous_debit, previous_credit = balances.get(account_id, (0.0, 0.0))
+            balances[account_id] = (previous_debit + debit, previous_credit + credit)
+        return {account_id: {
+            'lid': 0, 'ldate': '', 'lcode': '', 'amount_currency': 0.0, 'lref': '', 'lname': 'Initial Balance',
+            'credit': credit, 'debit': debit, 'balance': debit - credit,
+            'lpartner_id': '', 'move_name': '', 'currency_code': '', 'currency_id': None, 'partner_name': '',
+            'mmove_id': '', 'invoice_id': '', 'invoice_type': '', 'invoice_number': '',
+        } for account_id, (debit, credit) in balances.items()}
+
+    def _get_account_move_entry(self, accounts, init_balance, sortby, display_account):
+        """
+               :param:
+                       accounts: the recordset of accounts
+                       init_balance: boolean value of initial_balance
+                       sortby: sorting by date or partner and journal
+                       display_account: type of account(receivable, payable and both)
+
+               Returns a dictionary of accounts with following key and value {
+                       'code': account code,
+                       'name': account name,
+                       'debit': sum of total debit amount,
+                       'credit': sum of total credit amount,
+                       'balance': total balance,
+                       'amount_currency': sum of amount_currency,
+                       'move_lines': list of move line
+               }
+               """
+        cr = self.env.cr
+        MoveLine = self.env['account.move.line']
+        if not accounts:
+            accounts = self._get_book_accounts()
+        if not accounts:
+            return []
+        move_lines = {x: [] for x in accounts.ids}
+        totals = {x: {'debit': 0.0, 'credit': 0.0, 'balance': 0.0} for x in accounts.ids}
+
+        if init_balance:
+            for account_id, row in self._get_initial_balances(accounts).items():
+                move_lines[account_id].append(row)
+                totals[account_id].update(debit=row['debit'], credit=row['credit'], balance=row['balance'])
+
+        sql_sort = 'l.date, l.move_id'
+        if sortby == 'sort_journal_partner':
+            sql_sort = 'j.code, p.name, l.move_id'
+
+        # Prepare sql query base on selected parameters from wizard
+        tables, where_clause, where_params = MoveLine._query_get()
+        wheres = [""]
+        if where_clause.strip():
+            wheres.append(where_clause.strip())
+        filters = " AND ".join(wheres)
+        filters = filters.replace('account_move_line__move_id', 'm').replace('account_move_line', 'l')
+
+        sql = ('''SELECT l.id AS lid, l.account_id AS account_id, l.date AS ldate, j.code AS lcode, l.currency_id, l.amount_currency, l.ref AS lref, l.name AS lname,
+                        COALESCE(l.debit,0) AS debit, COALESCE(l.credit,0) AS credit, COALESCE(l.debit,0) - COALESCE(l.credit,0) AS balance,
+                        m.name AS move_name, c.symbol AS currency_code, p.name AS partner_name
+                        FROM account_move_line l
+                        JOIN account_move m ON (l.move_id=m.id)
+                        LEFT JOIN res_currency c ON (l.currency_id=c.id)
+                        LEFT JOIN res_partner p ON (l.partner_id=p.id)
+                        JOIN account_journal j ON (l.journal_id=j.id)
+                        JOIN account_account acc ON (l.account_id = acc.id)
+                        WHERE l.account_id IN %s ''' + filters + ''' ORDER BY ''' + sql_sort + ', l.id')
+        params = (tuple(accounts.ids),) + tuple(where_params)
+        cr.execute(sql, params)
+
+        # stream the lines and carry a running balance per account instead of
+        # re-summing every previous line of the account for each new one
+        rows = cr.dictfetchmany(self._book_fetch_size)
+        while rows:
+            for row in rows:
+                total = totals[row['account_id']]
+                total['debit'] += row['debit']
+                total['credit'] += row['credit']
+                total['balance'] += row['balance']
+                row['balance'] = total['balance']
+                move_lines[row.pop('account_id')].append(row)
+            rows = cr.dictfetchmany(self._book_fetch_size)
+
+        # Calculate the debit, credit and balance for Accounts
+        account_res = []
+        for account in accounts:
+            currency = account.currency_id and account.currency_id or account.company_id.currency_id
+            res = dict(totals[account.id])
+            res['code'] = account.code
+            res['name'] = account.name
+            res['move_lines'] = move_lines[account.id]
+            if display_account == 'all':
+                account_res.append(res)
+            if display_account == 'movement' and res.get('move_lines'):
+                account_res.append(res)
+            if display_account == 'not_zero' and not currency.is_zero(res['balance']):
+                account_res.append(res)
+        return account_res
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        if not data.get('form') or not self.env.context.get('active_model'):
+            raise UserError(_("Form content is missing, this report cannot be printed."))
+        model = self.env.context.get('active_model')
+        docs = self.env[model].browse(self.env.context.get('active_ids', []))
+        init_balance = data['form'].get('initial_balance', True)
+        display_account = data['form'].get('display_account')
+
+        sortby = data['form'].get('sortby', 'sort_date')
+        codes = []
+
+        if data['form'].get('journal_ids', False):
+            codes = [journal.code for journal in
+                     self.env['account.journal'].search([('id', 'in', data['form']['journal_ids'])])]
+        account_ids = data['form']['account_ids']
+        accounts = self.env['account.account'].search([('id', 'in', account_ids)])
+        if not accounts:
+            accounts = self._get_book_accounts()
+        record = self.with_context(data['form'].get('comparison_context', {}))._get_account_move_entry(accounts, init_balance, sortby, display_account)
+        return {
+            'doc_ids': docids,
+            'doc_model': model,
+            'data': data['form'],
+            'docs': docs,
+            'time': time,
+            'Accounts': record,
+            'print_journal': codes,
+        }
@@ -3,3 +3,9 @@
 from . import wizard
 from . import models
 from . import report
+from .models.followup_receivable import drop_triggers
+
+
+def uninstall_hook(cr, registry):
+    ''' The follow-up triggers write into tables and columns dropped with the module '''
+    drop_triggers(cr)
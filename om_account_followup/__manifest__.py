@@ -2,7 +2,7 @@
 
 {
     'name': 'Customer Follow Up Management',
-    'version': '16.0.1.0.1',
+    'version': '16.0.1.9.7',
     'category': 'Accounting',
     'description': """Customer FollowUp Management""",
     'summary': """Customer FollowUp Management""",
@@ -14,6 +14,7 @@
         'security/security.xml',
         'security/ir.model.access.csv',
         'data/data.xml',
+        'data/followup_mailing_data.xml',
         'wizard/followup_print_view.xml',
         'wizard/followup_results_view.xml',
         'views/followup_view.xml',
@@ -22,10 +23,12 @@
         'views/report_followup.xml',
         'views/reports.xml',
         'views/followup_partner_view.xml',
+        'views/followup_mailing_views.xml',
         'report/followup_report.xml',
     ],
     'demo': ['demo/demo.xml'],
     'images': ['static/description/banner.png'],
     'installable': True,
+    'uninstall_hook': 'uninstall_hook',
     'auto_install': False,
 }
@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 
+from . import account_account
 from . import account_move
 from . import followup
+from . import followup_mailing
 from . import followup_partner
+from . import followup_receivable
 from . import partner
 from . import settings
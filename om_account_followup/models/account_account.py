@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models
+
+
+class AccountAccount(models.Model):
+    _inherit = 'account.account'
+
+    # the lines of an account becoming receivable, or not receivable anymore,
+    # keep their write date: the next processing evaluates all the lines
+    def write(self, vals):
+        if 'account_type' in vals:
+            receivable = vals['account_type'] == 'asset_receivable'
+            changed = self.filtered(lambda account: (account.account_type == 'asset_receivable') != receivable)
+            if changed:
+                self.env['followup.followup'].sudo().search(
+                    [('company_id', 'in', changed.company_id.ids)])._reset_last_run()
+        return super().write(vals)
@@ -12,10 +12,20 @@ class FollowupFollowup(models.Model):
     name = fields.Char(string="Name", related='company_id.name', readonly=True)
     followup_line = fields.One2many('followup.line', 'followup_id', 'Follow-up', copy=True)
     company_id = fields.Many2one('res.company', 'Company', required=True, default=lambda self: self.env.company)
+    last_run_date = fields.Date(
+        'Last Sending Date', readonly=True, copy=False,
+        help="Sending date of the last processing of the follow-ups. The next "
+             "incremental processing only evaluates the lines reaching a new "
+             "level after this date and the lines changed since then.")
+    last_run_time = fields.Datetime('Last Processing', readonly=True, copy=False)
 
     _sql_constraints = [('company_uniq', 'unique(company_id)',
                          'Only one follow-up per company is allowed')]
 
+    def _reset_last_run(self):
+        """ The next processing evaluates all the open receivable lines """
+        self.filtered('last_run_date').write({'last_run_date': False, 'last_run_time': False})
+
 
 class FollowupLine(models.Model):
     _name = 'followup.line'
@@ -75,6 +85,26 @@ Best Regards,
     _sql_constraints = [('days_uniq', 'unique(followup_id, delay)',
                          'Days of the follow-up levels must be different')]
 
+    # the levels reached by the lines since the last processing depend on the
+    # delays, changing them forces a full processing
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        lines.followup_id._reset_last_run()
+        return lines
+
+    def write(self, vals):
+        if 'delay' in vals or 'followup_id' in vals:
+            self.followup_id._reset_last_run()
+        res = super().write(vals)
+        if 'followup_id' in vals:
+            self.followup_id._reset_last_run()
+        return res
+
+    def unlink(self):
+        self.followup_id._reset_last_run()
+        return super().unlink()
+
     @api.constrains('description')
     def _check_description(self):
         for line in self:
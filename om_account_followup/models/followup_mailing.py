@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import threading
+
+from odoo import api, fields, models, _
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 200
+
+
+class FollowupMailing(models.Model):
+    """ Follow-up emails of a run, rendered and queued in batches by a cron
+        instead of during the run. Every batch is committed with the progress
+        of the mailing, an interrupted mailing resumes after its last batch.
+    """
+    _name = 'followup.mailing'
+    _description = 'Follow-up Mailing'
+    _order = 'id desc'
+
+    name = fields.Char(string='Name', required=True, readonly=True)
+    company_id = fields.Many2one('res.company', string='Company', required=True, readonly=True,
+                                 default=lambda self: self.env.company)
+    user_id = fields.Many2one('res.users', string='Sent By', required=True, readonly=True,
+                              default=lambda self: self.env.user)
+    partner_ids = fields.Many2many('res.partner', 'followup_mailing_partner_rel', 'mailing_id', 'partner_id',
+                                   string='Partners', readonly=True)
+    state = fields.Selection([('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')],
+                             string='Status', required=True, default='queued', readonly=True)
+    partner_count = fields.Integer(string='Partners to Email', readonly=True)
+    processed_count = fields.Integer(string='Partners Processed', readonly=True)
+    mail_count = fields.Integer(string='Emails Queued', readonly=True)
+    unknown_mail_count = fields.Integer(string='Partners without Email', readonly=True)
+    progress = fields.Float(string='Progress', compute='_compute_progress')
+    error = fields.Text(string='Error', readonly=True)
+
+    @api.depends('processed_count', 'partner_count')
+    def _compute_progress(self):
+        for mailing in self:
+            mailing.progress = 100.0 * mailing.processed_count / mailing.partner_count \
+                if mailing.partner_count else 100.0
+
+    @api.model
+    def _get_batch_size(self):
+        return int(self.env['ir.config_parameter'].sudo().get_param(
+            'om_account_followup.mailing_batch_size', DEFAULT_BATCH_SIZE) or DEFAULT_BATCH_SIZE)
+
+    @api.model
+    def _queue(self, partners):
+        mailing = self.create({
+            'name': _('Follow-ups of %s') % fields.Date.to_string(fields.Date.context_today(self)),
+            'partner_ids': [(6, 0, partners.ids)],
+            'partner_count': len(partners),
+        })
+        self.env.ref('om_account_followup.ir_cron_followup_mailing')._trigger()
+        return mailing
+
+    @api.model
+    def _cron_process(self):
+        # the failed mailings are only resumed on demand, a batch failing
+        # again would otherwise be retried by every call of the cron
+        for mailing in self.search([('state', 'in', ('queued', 'running'))], order='id'):
+            mailing._process()
+
+    def action_resume(self):
+        """ Queue the mailings again and let the cron resume them, instead of
+            rendering the emails in the request """
+        self.filtered(lambda m: m.state == 'failed').write({'state': 'queued'})
+        self.env.ref('om_account_followup.ir_cron_followup_mailing')._trigger()
+
+    def _process(self, auto_commit=None):
+        """ Render and queue the emails of the remaining partners, one batch
+            per transaction, as the user who sent the follow-ups.
+        """
+        self.ensure_one()
+        if auto_commit is None:
+            auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        self.write({'state': 'running', 'error': False})
+        self._commit(auto_commit)
+        partners = self.partner_ids.sorted('id')
+        batch_size = self._get_batch_size()
+        while self.processed_count < len(partners):
+            batch = partners[self.processed_count:self.processed_count + batch_size]
+            try:
+                with self.env.cr.savepoint():
+                    mail_count, unknown_mail_count = batch.with_user(self.user_id).with_company(
+                        self.company_id)._send_followup_mails()
+                    self.write({
+                        'processed_count': self.processed_count + len(batch),
+                        'mail_count': self.mail_count + mail_count,
+                        'unknown_mail_count': self.unknown_mail_count + unknown_mail_count,
+                    })
+            except Exception as e:
+                _logger.exception("Follow-up mailing %s failed after %s partners", self.id, self.processed_count)
+                self.write({'state': 'failed', 'error': str(e)})
+                self._commit(auto_commit)
+                return False
+            self._commit(auto_commit)
+        self.state = 'done'
+        self._commit(auto_commit)
+        return True
+
+    def _commit(self, auto_commit):
+        if auto_commit:
+            self.env.cr.commit()
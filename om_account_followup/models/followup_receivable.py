@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+
+from odoo import api, fields, models
+
+
+# columns of the move lines the summary and the statistics depend on
+FOLLOWUP_LINE_COLUMNS = ('partner_id', 'company_id', 'account_id', 'date', 'date_maturity', 'debit', 'credit',
+                         'full_reconcile_id', 'followup_line_id', 'followup_date', 'blocked')
+
+# open receivable line of a transition table
+OPEN_RECEIVABLE_CLAUSE = """{rows}.partner_id IS NOT NULL
+                   AND {rows}.full_reconcile_id IS NULL
+                   AND EXISTS (SELECT 1 FROM account_account a
+                                WHERE a.id = {rows}.account_id AND a.account_type = 'asset_receivable')"""
+
+# signed balance and line count of the open receivable lines of a transition table
+LINE_CHANGES_QUERY = """
+                SELECT {rows}.partner_id, {rows}.company_id, COALESCE({rows}.date_maturity, {rows}.date),
+                       {sign} ({rows}.debit - {rows}.credit), {sign} 1
+                  FROM {rows} {join}
+                 WHERE {open_receivable} {changed}"""
+
+
+def _line_changes_query(rows, sign, other_rows=None):
+    """ Changes brought by the open receivable lines of the transition table
+    ``rows``. For an update, the lines are joined to the transition table
+    ``other_rows`` and only kept when a column of the follow-up changed. """
+    join = changed = ''
+    if other_rows:
+        join = 'JOIN %s ON %s.id = %s.id' % (other_rows, other_rows, rows)
+        changed = 'AND (%s) IS DISTINCT FROM (%s)' % (
+            ', '.join('%s.%s' % (rows, column) for column in FOLLOWUP_LINE_COLUMNS),
+            ', '.join('%s.%s' % (other_rows, column) for column in FOLLOWUP_LINE_COLUMNS))
+    return LINE_CHANGES_QUERY.format(rows=rows, sign=sign, join=join, changed=changed,
+                                     open_receivable=OPEN_RECEIVABLE_CLAUSE.format(rows=rows))
+
+
+def create_line_triggers(cr, prefix, function):
+    """ (Re)create the statement level triggers calling ``function`` after
+    the statements on account_move_line, the transition tables of the
+    statement are followup_old_rows and followup_new_rows """
+    for operation, transitions in (('INSERT', 'NEW TABLE AS followup_new_rows'),
+                                   ('UPDATE', 'OLD TABLE AS followup_old_rows NEW TABLE AS followup_new_rows'),
+                                   ('DELETE', 'OLD TABLE AS followup_old_rows')):
+        trigger = '%s_%s' % (prefix, operation.lower())
+        cr.execute("""
+            DROP TRIGGER IF EXISTS {trigger} ON account_move_line;
+            CREATE TRIGGER {trigger} AFTER {operation} ON account_move_line
+                REFERENCING {transitions}
+                FOR EACH STATEMENT EXECUTE FUNCTION {function}();
+        """.format(trigger=trigger, operation=operation, transitions=transitions, function=function))
+
+
+def drop_triggers(cr):
+    """ Drop the triggers keeping the follow-up tables up to date and their
+    functions, including the statistics refresh of followup.stat """
+    for operation in ('insert', 'update', 'delete'):
+        cr.execute('DROP TRIGGER IF EXISTS followup_receivable_line_%s ON account_move_line' % operation)
+    cr.execute("""
+        DROP TRIGGER IF EXISTS followup_receivable_account_update ON account_account;
+        DROP FUNCTION IF EXISTS followup_receivable_line_changed();
+        DROP FUNCTION IF EXISTS followup_receivable_account_changed();
+        DROP FUNCTION IF EXISTS followup_receivable_apply(INTEGER[], INTEGER[], DATE[], NUMERIC[], INTEGER[]);
+        DROP FUNCTION IF EXISTS followup_receivable_refresh(INTEGER[], INTEGER[]);
+        DROP FUNCTION IF EXISTS followup_stat_refresh(INTEGER[], INTEGER[]);
+    """)
+
+
+class FollowupReceivableSummary(models.Model):
+    """ Open receivable balance of the partners per company and due date.
+
+        One set of statement level triggers on the move lines keeps the
+        follow-up tables up to date: the statements not touching an open
+        receivable line, or only columns the follow-up does not depend on,
+        are ignored. The balance and line count of the summary rows are
+        changed by the deltas of the lines, the statistics of the follow-up
+        (followup.stat, created after this model) are recomputed for the
+        partners and companies of the changed lines.
+    """
+    _name = 'followup.receivable.summary'
+    _description = 'Follow-up Receivable Summary'
+    _auto = False
+    _log_access = False
+
+    partner_id = fields.Many2one('res.partner', string='Partner', readonly=True)
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+    date_due = fields.Date(string='Due Date', readonly=True)
+    balance = fields.Float(string='Balance', readonly=True)
+    line_count = fields.Integer(string='Lines', readonly=True)
+
+    def init(self):
+        cr = self.env.cr
+        cr.execute("""
+            CREATE TABLE IF NOT EXISTS followup_receivable_summary (
+                id SERIAL PRIMARY KEY,
+                partner_id INTEGER NOT NULL,
+                company_id INTEGER NOT NULL,
+                date_due DATE NOT NULL,
+                balance NUMERIC NOT NULL
+            );
+            ALTER TABLE followup_receivable_summary ADD COLUMN IF NOT EXISTS line_count INTEGER NOT NULL DEFAULT 0;
+            CREATE UNIQUE INDEX IF NOT EXISTS followup_receivable_summary_key_index
+                ON followup_receivable_summary (partner_id, company_id, date_due);
+            CREATE INDEX IF NOT EXISTS followup_receivable_summary_company_date_index
+                ON followup_receivable_summary (company_id, date_due, partner_id);
+
+            DROP FUNCTION IF EXISTS followup_receivable_refresh(INTEGER[]);
+            CREATE OR REPLACE FUNCTION followup_receivable_refresh(partner_ids INTEGER[], company_ids INTEGER[])
+            RETURNS void AS $$
+            BEGIN
+                DELETE FROM followup_receivable_summary s
+                 USING unnest(partner_ids, company_ids) AS k(partner_id, company_id)
+                 WHERE s.partner_id = k.partner_id AND s.company_id = k.company_id;
+                INSERT INTO followup_receivable_summary (partner_id, company_id, date_due, balance, line_count)
+                     SELECT l.partner_id, l.company_id, COALESCE(l.date_maturity, l.date),
+                            SUM(l.debit - l.credit), COUNT(*)
+                       FROM account_move_line l
+                       JOIN account_account a ON a.id = l.account_id
+                       JOIN (SELECT DISTINCT k.partner_id, k.company_id
+                               FROM unnest(partner_ids, company_ids) AS k(partner_id, company_id)) AS k
+                         ON k.partner_id = l.partner_id AND k.company_id = l.company_id
+                      WHERE l.full_reconcile_id IS NULL
+                        AND a.account_type = 'asset_receivable'
+                   GROUP BY l.partner_id, l.company_id, COALESCE(l.date_maturity, l.date)
+                ON CONFLICT (partner_id, company_id, date_due) DO UPDATE
+                        SET balance = EXCLUDED.balance, line_count = EXCLUDED.line_count;
+            END
+            $$ LANGUAGE plpgsql;
+
+            CREATE OR REPLACE FUNCTION followup_receivable_apply(partner_ids INTEGER[], company_ids INTEGER[],
+                                                                 dates_due DATE[], balances NUMERIC[],
+                                                                 line_counts INTEGER[])
+            RETURNS void AS $$
+            BEGIN
+                IF partner_ids IS NULL THEN
+                    RETURN;
+                END IF;
+                -- the rows are changed in a stable order to avoid deadlocks between transactions
+                INSERT INTO followup_receivable_summary (partner_id, company_id, date_due, balance, line_count)
+                     SELECT c.partner_id, c.company_id, c.date_due, SUM(c.balance), SUM(c.line_count)
+                       FROM unnest(partner_ids, company_ids, dates_due, balances, line_counts)
+                            AS c(partner_id, company_id, date_due, balance, line_count)
+                   GROUP BY c.partner_id, c.company_id, c.date_due
+                     HAVING SUM(c.balance) != 0 OR SUM(c.line_count) != 0
+                   ORDER BY c.partner_id, c.company_id, c.date_due
+                ON CONFLICT (partner_id, company_id, date_due) DO UPDATE
+                        SET balance = followup_receivable_summary.balance + EXCLUDED.balance,
+                            line_count = followup_receivable_summary.line_count + EXCLUDED.line_count;
+                DELETE FROM followup_receivable_summary s
+                 USING unnest(partner_ids, company_ids, dates_due) AS c(partner_id, company_id, date_due)
+                 WHERE s.partner_id = c.partner_id
+                   AND s.company_id = c.company_id
+                   AND s.date_due = c.date_due
+                   AND s.line_count <= 0;
+                PERFORM followup_stat_refresh(partner_ids, company_ids);
+            END
+            $$ LANGUAGE plpgsql;
+
+            CREATE OR REPLACE FUNCTION followup_receivable_line_changed() RETURNS trigger AS $$
+            DECLARE
+                partner_ids INTEGER[];
+                company_ids INTEGER[];
+                dates_due DATE[];
+                balances NUMERIC[];
+                line_counts INTEGER[];
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    SELECT array_agg(c.partner_id), array_agg(c.company_id), array_agg(c.date_due),
+                           array_agg(c.balance), array_agg(c.line_count)
+                      INTO partner_ids, company_ids, dates_due, balances, line_counts
+                      FROM ({inserted}) AS c(partner_id, company_id, date_due, balance, line_count);
+                ELSIF TG_OP = 'UPDATE' THEN
+                    SELECT array_agg(c.partner_id), array_agg(c.company_id), array_agg(c.date_due),
+                           array_agg(c.balance), array_agg(c.line_count)
+                      INTO partner_ids, company_ids, dates_due, balances, line_counts
+                      FROM ({updated_old} UNION ALL {updated_new}) AS c(partner_id, company_id, date_due, balance, line_count);
+                ELSE
+                    SELECT array_agg(c.partner_id), array_agg(c.company_id), array_agg(c.date_due),
+                           array_agg(c.balance), array_agg(c.line_count)
+                      INTO partner_ids, company_ids, dates_due, balances, line_counts
+                      FROM ({deleted}) AS c(partner_id, company_id, date_due, balance, line_count);
+                END IF;
+                PERFORM followup_receivable_apply(partner_ids, company_ids, dates_due, balances, line_counts);
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql;
+
+            CREATE OR REPLACE FUNCTION followup_receivable_account_changed() RETURNS trigger AS $$
+            DECLARE
+                partner_ids INTEGER[];
+                company_ids INTEGER[];
+            BEGIN
+                SELECT array_agg(k.partner_id), array_agg(k.company_id)
+                  INTO partner_ids, company_ids
+                  FROM (SELECT DISTINCT l.partner_id, l.company_id
+                          FROM account_move_line l
+                          JOIN followup_old_rows o ON o.id = l.account_id
+                          JOIN followup_new_rows n ON n.id = o.id
+                         WHERE l.partner_id IS NOT NULL
+                           AND o.account_type IS DISTINCT FROM n.account_type
+                           AND 'asset_receivable' IN (o.account_type, n.account_type)) AS k;
+                IF partner_ids IS NOT NULL THEN
+                    PERFORM followup_receivable_refresh(partner_ids, company_ids);
+                    PERFORM followup_stat_refresh(partner_ids, company_ids);
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql;
+        """.replace('{inserted}', _line_changes_query('followup_new_rows', '+'))
+           .replace('{deleted}', _line_changes_query('followup_old_rows', '-'))
+           .replace('{updated_old}', _line_changes_query('followup_old_rows', '-', 'followup_new_rows'))
+           .replace('{updated_new}', _line_changes_query('followup_new_rows', '+', 'followup_old_rows')))
+        create_line_triggers(cr, 'followup_receivable_line', 'followup_receivable_line_changed')
+        cr.execute("""
+            DROP TRIGGER IF EXISTS followup_receivable_account_update ON account_account;
+            CREATE TRIGGER followup_receivable_account_update AFTER UPDATE ON account_account
+                REFERENCING OLD TABLE AS followup_old_rows NEW TABLE AS followup_new_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION followup_receivable_account_changed();
+        """)
+        self._rebuild()
+
+    @api.model
+    def _rebuild(self):
+        """ Recompute the summary of all the partners """
+        self.env.cr.execute("""
+            TRUNCATE followup_receivable_summary;
+            INSERT INTO followup_receivable_summary (partner_id, company_id, date_due, balance, line_count)
+                 SELECT l.partner_id, l.company_id, COALESCE(l.date_maturity, l.date),
+                        SUM(l.debit - l.credit), COUNT(*)
+                   FROM account_move_line l
+                   JOIN account_account a ON a.id = l.account_id
+                  WHERE l.partner_id IS NOT NULL
+                    AND l.full_reconcile_id IS NULL
+                    AND a.account_type = 'asset_receivable'
+               GROUP BY l.partner_id, l.company_id, COALESCE(l.date_maturity, l.date);
+        """)
+
+    @api.model
+    def _search_partners(self, aggregate, operator, operand, company_id, date_due=None, negate=False):
+        """ Partners whose aggregate of the summary rows of ``company_id``
+            (due on or before ``date_due`` if given) satisfies the condition,
+            or does not satisfy it if ``negate``
+            :return: list of partner ids
+        """
+        self.env['account.move.line'].flush_model()
+        query = """
+            SELECT partner_id
+              FROM followup_receivable_summary
+             WHERE company_id = %%s %s
+          GROUP BY partner_id
+            HAVING %s (%s %s %%s)
+        """ % (date_due and 'AND date_due <= %s' or '', negate and 'NOT' or '', aggregate, operator)
+        params = [company_id] + ([date_due] if date_due else []) + [operand]
+        self.env.cr.execute(query, params)
+        return [row[0] for row in self.env.cr.fetchall()]
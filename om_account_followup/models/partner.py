@@ -1,11 +1,22 @@
 # -*- coding: utf-8 -*-
 
+from collections import defaultdict
 from functools import reduce
 from lxml import etree
-from odoo import api, fields, models, _
-from odoo.exceptions import ValidationError
+from odoo import api, fields, models, Command, _
+from odoo.exceptions import UserError, ValidationError
 from odoo.tools.misc import formatLang
 
+# comparison operators supported by the searches on the follow-up amounts
+SEARCH_OPERATORS = {
+    '=': lambda value, operand: value == operand,
+    '!=': lambda value, operand: value != operand,
+    '<': lambda value, operand: value < operand,
+    '<=': lambda value, operand: value <= operand,
+    '>': lambda value, operand: value > operand,
+    '>=': lambda value, operand: value >= operand,
+}
+
 
 class ResPartner(models.Model):
     _inherit = "res.partner"
@@ -24,32 +35,46 @@ class ResPartner(models.Model):
         return res
 
     def _get_latest(self):
-        company = self.env.user.company_id
+        aggregates = self._get_receivable_line_aggregates('''
+            MAX(l.followup_date),
+            (ARRAY_AGG(fl.id ORDER BY fl.delay DESC)
+                FILTER (WHERE fl.id IS NOT NULL))[1],
+            (ARRAY_AGG(fl.id ORDER BY fl.delay DESC)
+                FILTER (WHERE fl.id IS NOT NULL AND l.blocked IS NOT TRUE))[1]''')
         for partner in self:
-            amls = partner.unreconciled_aml_ids
-            latest_date = False
-            latest_level = False
-            latest_days = False
-            latest_level_without_lit = False
-            latest_days_without_lit = False
-            for aml in amls:
-                aml_followup = aml.followup_line_id
-                if (aml.company_id == company) and aml_followup and \
-                        (not latest_days or latest_days < aml_followup.delay):
-                    latest_days = aml_followup.delay
-                    latest_level = aml_followup.id
-                if (aml.company_id == company) and aml.followup_date and (
-                        not latest_date or latest_date < aml.followup_date):
-                    latest_date = aml.followup_date
-                if (aml.company_id == company) and not aml.blocked and \
-                        (aml_followup and (not latest_days_without_lit or
-                         latest_days_without_lit < aml_followup.delay)):
-                    latest_days_without_lit = aml_followup.delay
-                    latest_level_without_lit = aml_followup.id
+            latest_date, latest_level, latest_level_without_lit = \
+                aggregates.get(partner._origin.id, (False, False, False))
             partner.latest_followup_date = latest_date
             partner.latest_followup_level_id = latest_level
             partner.latest_followup_level_id_without_lit = latest_level_without_lit
 
+    def _get_receivable_line_aggregates(self, aggregates, params=()):
+        """ Aggregates of the open receivable lines of the partners in the
+        company of the user, computed for all of them with one grouped query
+        :param aggregates: SQL aggregate expressions over the lines ``l`` and
+            their follow-up level ``fl``
+        :return: dict partner id -> tuple of the aggregates """
+        partner_ids = tuple(self._origin.ids)
+        if not partner_ids:
+            return {}
+        self.env['account.move.line'].flush_model(
+            ['partner_id', 'company_id', 'account_id', 'full_reconcile_id',
+             'debit', 'credit', 'date', 'date_maturity', 'blocked',
+             'followup_line_id', 'followup_date'])
+        self.env['followup.line'].flush_model(['delay'])
+        self._cr.execute('''
+            SELECT l.partner_id, %s
+              FROM account_move_line l
+              JOIN account_account a ON a.id = l.account_id
+         LEFT JOIN followup_line fl ON fl.id = l.followup_line_id
+             WHERE l.partner_id IN %%s
+               AND l.company_id = %%s
+               AND l.full_reconcile_id IS NULL
+               AND a.account_type = 'asset_receivable'
+          GROUP BY l.partner_id''' % aggregates,
+            tuple(params) + (partner_ids, self.env.user.company_id.id))
+        return {row[0]: row[1:] for row in self._cr.fetchall()}
+
     def do_partner_manual_action_dermanord(self, followup_line):
         action_text = followup_line.manual_action_note or ''
 
@@ -100,61 +125,127 @@ class ResPartner(models.Model):
             self, data=datas)
 
     def do_partner_mail(self):
-        ctx = self.env.context.copy()
-        ctx['followup'] = True
-        template = 'om_account_followup.email_template_om_account_followup_default'
-        unknown_mails = 0
+        return self._send_followup_mails()[1]
+
+    def _get_followup_recipients(self):
+        """ :return: dict partner -> contacts receiving its follow-up emails,
+        its invoice addresses or itself """
+        recipients = {}
         for partner in self:
-            partners_to_email = [child for child in partner.child_ids if
-                                 child.type == 'invoice' and child.email]
+            partners_to_email = partner.child_ids.filtered(
+                lambda child: child.type == 'invoice' and child.email)
             if not partners_to_email and partner.email:
-                partners_to_email = [partner]
-            if partners_to_email:
-                level = partner.latest_followup_level_id_without_lit
-                for partner_to_email in partners_to_email:
-                    if level and level.send_email and \
-                            level.email_template_id and \
-                            level.email_template_id.id:
-                        level.email_template_id.with_context(ctx).send_mail(
-                            partner_to_email.id)
-                    else:
-                        mail_template_id = self.env.ref(template)
-                        mail_template_id.with_context(ctx).send_mail(
-                            partner_to_email.id)
-                if partner not in partners_to_email:
-                    partner.message_post(body=_(
-                        'Overdue email sent to %s' % ', '.join(
-                            ['%s <%s>' % (partner.name, partner.email) for
-                             partner in partners_to_email])))
+                partners_to_email = partner
+            recipients[partner] = partners_to_email
+        return recipients
+
+    def _send_followup_mails(self):
+        """ Queue the follow-up emails of the partners. The overdue lines of
+        all the partners are fetched at once and each template is rendered
+        for all its recipients in one batch, the emails are sent by the mail
+        queue.
+        :return: (number of emails, number of partners without email address)
+        """
+        template = 'om_account_followup.email_template_om_account_followup_default'
+        default_template = self.env.ref(template)
+        report = self.env['report.om_account_followup.report_followup']
+        followup_lines = {
+            partner.id: lines for partner, lines in
+            report._lines_get_with_partners(
+                self.commercial_partner_id, self.env.company.id).items()}
+        recipient_ids_per_template = defaultdict(list)
+        sent_to = {}
+        unknown_mails = self.browse()
+        for partner, partners_to_email in \
+                self._get_followup_recipients().items():
+            if not partners_to_email:
+                unknown_mails |= partner
+                continue
+            level = partner.latest_followup_level_id_without_lit
+            if level and level.send_email and level.email_template_id:
+                mail_template = level.email_template_id
+            else:
+                mail_template = default_template
+            recipient_ids_per_template[mail_template] += partners_to_email.ids
+            if partner not in partners_to_email:
+                sent_to[partner.id] = _('Overdue email sent to %s') % ', '.join(
+                    ['%s <%s>' % (partner_to_email.name,
+                                  partner_to_email.email) for
+                     partner_to_email in partners_to_email])
+        mails = self.env['mail.mail']
+        for mail_template, res_ids in recipient_ids_per_template.items():
+            mails |= self.browse(res_ids)._create_followup_mails(
+                mail_template.with_context(followup=True,
+                                           followup_lines=followup_lines))
+        if sent_to:
+            self.browse(list(sent_to))._message_log_batch(sent_to)
+        unknown_mails._set_followup_unknown_mail_action()
+        return len(mails), len(unknown_mails)
+
+    def _create_followup_mails(self, template):
+        """ Render ``template`` for all the partners at once and create their
+        emails in one batch, as send_mail() does for one partner """
+        values_per_partner = template.generate_email(
+            self.ids, ['subject', 'body_html', 'email_from', 'email_cc',
+                       'email_to', 'partner_to', 'reply_to', 'auto_delete',
+                       'scheduled_date'])
+        vals_list = []
+        attachments_list = []
+        for partner in self:
+            values = values_per_partner[partner.id]
+            values['recipient_ids'] = [
+                Command.link(pid) for pid in values.get('partner_ids', [])]
+            values['attachment_ids'] = [
+                Command.link(aid) for aid in values.get('attachment_ids', [])]
+            attachments_list.append(values.pop('attachments', []))
+            if 'email_from' in values and not values.get('email_from'):
+                values.pop('email_from')
+            vals_list.append(values)
+        mails = self.env['mail.mail'].sudo().create(vals_list)
+        for mail, attachments in zip(mails, attachments_list):
+            if attachments:
+                mail.write({'attachment_ids': [Command.create({
+                    'name': name,
+                    'datas': datas,
+                    'type': 'binary',
+                    'res_model': 'mail.message',
+                    'res_id': mail.mail_message_id.id,
+                }) for name, datas in attachments]})
+        return mails
+
+    def _set_followup_unknown_mail_action(self):
+        action_text = _("Email not sent because of email address "
+                        "of partner not filled in")
+        for partner in self:
+            if partner.payment_next_action_date:
+                payment_action_date = min(
+                    fields.Date.today(),
+                    partner.payment_next_action_date)
             else:
-                unknown_mails = unknown_mails + 1
-                action_text = _("Email not sent because of email address "
-                                "of partner not filled in")
-                if partner.payment_next_action_date:
-                    payment_action_date = min(
-                        fields.Date.today(),
-                        partner.payment_next_action_date)
-                else:
-                    payment_action_date = fields.Date.today()
-                if partner.payment_next_action:
-                    payment_next_action = \
-                        partner.payment_next_action + " \n " + action_text
-                else:
-                    payment_next_action = action_text
-                partner.with_context(ctx).write(
-                    {'payment_next_action_date': payment_action_date,
-                     'payment_next_action': payment_next_action})
-        return unknown_mails
+                payment_action_date = fields.Date.today()
+            if partner.payment_next_action:
+                payment_next_action = \
+                    partner.payment_next_action + " \n " + action_text
+            else:
+                payment_next_action = action_text
+            partner.with_context(followup=True).write(
+                {'payment_next_action_date': payment_action_date,
+                 'payment_next_action': payment_next_action})
 
     def get_followup_table_html(self):
         self.ensure_one()
         partner = self.commercial_partner_id
         followup_table = ''
-        if partner.unreconciled_aml_ids:
-            company = self.env.user.company_id
+        # lines prefetched for all the partners of a batch of emails
+        followup_lines = self.env.context.get('followup_lines')
+        if followup_lines is not None or partner.unreconciled_aml_ids:
+            company = self.env.company
             current_date = fields.Date.today()
-            report = self.env['report.om_account_followup.report_followup']
-            final_res = report._lines_get_with_partner(partner, company.id)
+            if followup_lines is not None:
+                final_res = followup_lines.get(partner.id, [])
+            else:
+                report = self.env['report.om_account_followup.report_followup']
+                final_res = report._lines_get_with_partner(partner, company.id)
 
             for currency_dict in final_res:
                 currency = currency_dict.get('line', [
@@ -252,83 +343,46 @@ class ResPartner(models.Model):
         return self.do_partner_print(wizard_partner_ids, data)
 
     def _get_amounts_and_date(self):
-        company = self.env.user.company_id
-        current_date = fields.Date.today()
+        aggregates = self._get_receivable_line_aggregates('''
+            SUM(l.debit - l.credit),
+            SUM(l.debit - l.credit)
+                FILTER (WHERE COALESCE(l.date_maturity, l.date) <= %s),
+            MIN(COALESCE(l.date_maturity, l.date))''', (fields.Date.today(),))
         for partner in self:
-            worst_due_date = False
-            amount_due = amount_overdue = 0.0
-            for aml in partner.unreconciled_aml_ids:
-                if (aml.company_id == company):
-                    date_maturity = aml.date_maturity or aml.date
-                    if not worst_due_date or date_maturity < worst_due_date:
-                        worst_due_date = date_maturity
-                    amount_due += aml.result
-                    if (date_maturity <= current_date):
-                        amount_overdue += aml.result
+            amount_due, amount_overdue, worst_due_date = aggregates.get(
+                partner._origin.id, (0.0, 0.0, False))
             partner.payment_amount_due = amount_due
-            partner.payment_amount_overdue = amount_overdue
+            partner.payment_amount_overdue = amount_overdue or 0.0
             partner.payment_earliest_due_date = worst_due_date
 
-    def _get_followup_overdue_query(self, args, overdue_only=False):
+    def _search_receivable_amount(self, operator, operand,
+                                  overdue_only=False):
+        if operator not in SEARCH_OPERATORS:
+            raise UserError(_('Operation not supported'))
+        summary = self.env['followup.receivable.summary']
         company_id = self.env.user.company_id.id
-        having_where_clause = ' AND '.join(
-            map(lambda x: '(SUM(bal2) %s %%s)' % (x[1]), args))
-        having_values = [x[2] for x in args]
-        having_where_clause = having_where_clause % (having_values[0])
-        overdue_only_str = overdue_only and 'AND date_maturity <= NOW()' or ''
-        return ('''SELECT pid AS partner_id, SUM(bal2) FROM
-                                    (SELECT CASE WHEN bal IS NOT NULL THEN bal
-                                    ELSE 0.0 END AS bal2, p.id as pid FROM
-                                    (SELECT (debit-credit) AS bal, partner_id
-                                    FROM account_move_line l
-                                    LEFT JOIN account_account a ON a.id = l.account_id
-                                    WHERE a.account_type = 'asset_receivable'
-                                    %s AND full_reconcile_id IS NULL
-                                    AND l.company_id = %s) AS l
-                                    RIGHT JOIN res_partner p
-                                    ON p.id = partner_id ) AS pl
-                                    GROUP BY pid HAVING %s''') % (
-            overdue_only_str, company_id, having_where_clause)
+        date_due = overdue_only and fields.Date.today() or None
+        # partners without open receivable have an amount of 0
+        if SEARCH_OPERATORS[operator](0.0, operand):
+            return [('id', 'not in', summary._search_partners(
+                'SUM(balance)', operator, operand, company_id, date_due,
+                negate=True))]
+        return [('id', 'in', summary._search_partners(
+            'SUM(balance)', operator, operand, company_id, date_due))]
 
     def _payment_overdue_search(self, operator, operand):
-        args = [('payment_amount_overdue', operator, operand)]
-        query = self._get_followup_overdue_query(args, overdue_only=True)
-        self._cr.execute(query)
-        res = self._cr.fetchall()
-        if not res:
-            return [('id', '=', '0')]
-        return [('id', 'in', [x[0] for x in res])]
+        return self._search_receivable_amount(operator, operand,
+                                              overdue_only=True)
 
     def _payment_earliest_date_search(self, operator, operand):
-        args = [('payment_earliest_due_date', operator, operand)]
-        company_id = self.env.user.company_id.id
-        having_where_clause = ' AND '.join(
-            map(lambda x: "(MIN(l.date_maturity) %s '%%s')" % (x[1]), args))
-        having_values = [x[2] for x in args]
-        having_where_clause = having_where_clause % (having_values[0])
-        query = """SELECT partner_id FROM account_move_line l
-                LEFT JOIN account_account a ON a.id = l.account_id
-                WHERE a.account_type = 'asset_receivable' 
-                AND l.company_id = %s 
-                AND l.full_reconcile_id IS NULL 
-                AND partner_id IS NOT NULL GROUP BY partner_id"""
-        query = query % (company_id)
-        if having_where_clause:
-            query += ' HAVING %s ' % (having_where_clause)
-        self._cr.execute(query)
-        res = self._cr.fetchall()
-        if not res:
-            return [('id', '=', '0')]
-        return [('id', 'in', [x[0] for x in res])]
+        if operator not in SEARCH_OPERATORS:
+            raise UserError(_('Operation not supported'))
+        return [('id', 'in', self.env['followup.receivable.summary']._search_partners(
+            'MIN(date_due)', operator, fields.Date.to_date(operand),
+            self.env.user.company_id.id))]
 
     def _payment_due_search(self, operator, operand):
-        args = [('payment_amount_due', operator, operand)]
-        query = self._get_followup_overdue_query(args, overdue_only=False)
-        self._cr.execute(query)
-        res = self._cr.fetchall()
-        if not res:
-            return [('id', '=', '0')]
-        return [('id', 'in', [x[0] for x in res])]
+        return self._search_receivable_amount(operator, operand)
 
     def _get_partners(self):
         partners = set()
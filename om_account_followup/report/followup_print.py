@@ -16,38 +16,76 @@ class ReportFollowup(models.AbstractModel):
         model = self.env['followup.sending.results']
         ids = self.env.context.get('active_ids') or False
         docs = model.browse(ids)
+        form = data and data['form'] or {}
+        # the lines and texts of all the letters are fetched at once
+        stat_lines = self.env['followup.stat.by.partner'].browse(
+            list(dict.fromkeys(form.get('partner_ids') or [])))
+        lines = self._lines_get_for_stats(stat_lines)
+        texts = {}
+        if stat_lines and form.get('followup_id'):
+            texts = self._get_texts(stat_lines, form['followup_id'])
+
+        def get_lines(stat_line):
+            return lines.get(stat_line.id, [])
+
+        def get_text(stat_line, followup_id, context=None):
+            if followup_id == form.get('followup_id') and stat_line.id in texts:
+                return texts[stat_line.id]
+            return self._get_text(stat_line, followup_id)
+
         return {
             'docs': docs,
             'doc_ids': docids,
             'doc_model': model,
             'time': time,
             'ids_to_objects': self._ids_to_objects,
-            'getLines': self._lines_get,
-            'get_text': self._get_text,
-            'data': data and data['form'] or {}}
+            'getLines': get_lines,
+            'get_text': get_text,
+            'data': form}
 
     def _ids_to_objects(self, ids):
-        all_lines = []
-        for line in self.env['followup.stat.by.partner'].browse(ids):
-            if line not in all_lines:
-                all_lines.append(line)
-        return all_lines
+        return list(self.env['followup.stat.by.partner'].browse(
+            list(dict.fromkeys(ids))))
 
     def _lines_get(self, stat_by_partner_line):
-        return self._lines_get_with_partner(stat_by_partner_line.partner_id,
-                                            stat_by_partner_line.company_id.id)
+        return self._lines_get_for_stats(stat_by_partner_line).get(
+            stat_by_partner_line.id, [])
+
+    def _lines_get_for_stats(self, stat_lines):
+        """ :return: dict statistic id -> lines of its partner grouped by
+        currency, fetched with one search per company """
+        stat_lines_per_company = defaultdict(list)
+        for stat_line in stat_lines:
+            stat_lines_per_company[stat_line.company_id].append(stat_line)
+        lines = {}
+        for company, company_stat_lines in stat_lines_per_company.items():
+            partners = self.env['res.partner'].browse(
+                [stat_line.partner_id.id for stat_line in company_stat_lines])
+            lines_per_partner = self._lines_get_with_partners(
+                partners, company.id)
+            for stat_line in company_stat_lines:
+                lines[stat_line.id] = lines_per_partner.get(
+                    stat_line.partner_id, [])
+        return lines
 
     def _lines_get_with_partner(self, partner, company_id):
+        return self._lines_get_with_partners(partner, company_id).get(
+            partner, [])
+
+    def _lines_get_with_partners(self, partners, company_id):
+        """ Overdue receivable lines of several partners, fetched with one
+        search
+        :return: dict partner -> lines of the partner grouped by currency """
         moveline_obj = self.env['account.move.line']
         moveline_ids = moveline_obj.search(
-            [('partner_id', '=', partner.id),
+            [('partner_id', 'in', partners.ids),
              ('account_id.account_type', '=', 'asset_receivable'),
              ('full_reconcile_id', '=', False),
              ('company_id', '=', company_id),
              '|', ('date_maturity', '=', False),
              ('date_maturity', '<=', fields.Date.today())])
-        lines_per_currency = defaultdict(list)
-        total = 0
+        lines_per_partner = defaultdict(lambda: defaultdict(list))
+        totals = defaultdict(float)
         for line in moveline_ids:
             currency = line.currency_id or line.company_id.currency_id
             balance = line.debit - line.credit
@@ -62,14 +100,22 @@ class ReportFollowup(models.AbstractModel):
                 'blocked': line.blocked,
                 'currency_id': currency,
             }
-            total = total + line_data['balance']
-            lines_per_currency[currency].append(line_data)
+            totals[line.partner_id] += line_data['balance']
+            lines_per_partner[line.partner_id][currency].append(line_data)
 
-        return [{'total': total, 'line': lines, 'currency': currency} for
-                currency, lines in
-                lines_per_currency.items()]
+        return {partner: [{'total': totals[partner], 'line': lines,
+                           'currency': currency} for
+                          currency, lines in lines_per_currency.items()]
+                for partner, lines_per_currency in lines_per_partner.items()}
 
     def _get_text(self, stat_line, followup_id, context=None):
+        return self._get_texts(stat_line, followup_id)[stat_line.id]
+
+    def _get_texts(self, stat_lines, followup_id):
+        """ Printed messages of the letters: the message of the level with
+        the highest delay of the partner, or the first message of the plan.
+        The levels of all the partners are fetched with one query.
+        :return: dict statistic id -> text """
         fp_obj = self.env['followup.followup']
         fp_line = fp_obj.browse(followup_id).followup_line
         if not fp_line:
@@ -77,38 +123,52 @@ class ReportFollowup(models.AbstractModel):
                 _("The followup plan defined for the current company does not "
                   "have any followup action."))
         default_text = ''
-        li_delay = []
         for line in fp_line:
             if not default_text and line.description:
                 default_text = line.description
-            li_delay.append(line.delay)
-        li_delay.sort(reverse=True)
-        partner_line_ids = self.env['account.move.line'].search(
-            [('partner_id', '=', stat_line.partner_id.id),
-             ('full_reconcile_id', '=', False),
-             ('company_id', '=', stat_line.company_id.id),
-             ('blocked', '=', False),
-             ('debit', '!=', False),
-             ('account_id.account_type', '=', 'asset_receivable'),
-             ('followup_line_id', '!=', False)])
-
-        partner_max_delay = 0
-        partner_max_text = ''
-        for i in partner_line_ids:
-            if i.followup_line_id.delay > partner_max_delay and \
-                    i.followup_line_id.description:
-                partner_max_delay = i.followup_line_id.delay
-                partner_max_text = i.followup_line_id.description
-        text = partner_max_delay and partner_max_text or default_text
-        if text:
-            lang_obj = self.env['res.lang']
-            lang_ids = lang_obj.search(
-                [('code', '=', stat_line.partner_id.lang)], limit=1)
-            date_format = lang_ids and lang_ids.date_format or '%Y-%m-%d'
-            text = text % {
-                'partner_name': stat_line.partner_id.name,
-                'date': time.strftime(date_format),
-                'company_name': stat_line.company_id.name,
-                'user_signature': self.env.user.signature or '',
-            }
-        return text
+
+        self.env['account.move.line'].flush_model(
+            ['partner_id', 'company_id', 'account_id', 'full_reconcile_id',
+             'blocked', 'debit', 'followup_line_id'])
+        self._cr.execute('''
+            SELECT l.partner_id, l.company_id, ARRAY_AGG(DISTINCT l.followup_line_id)
+              FROM account_move_line l
+              JOIN account_account a ON a.id = l.account_id
+             WHERE l.partner_id IN %s
+               AND l.company_id IN %s
+               AND l.full_reconcile_id IS NULL
+               AND l.blocked IS NOT TRUE
+               AND l.debit != 0
+               AND a.account_type = 'asset_receivable'
+               AND l.followup_line_id IS NOT NULL
+          GROUP BY l.partner_id, l.company_id''', (
+            tuple(stat_lines.partner_id.ids), tuple(stat_lines.company_id.ids)))
+        level_ids = {(partner_id, company_id): ids for partner_id, company_id, ids
+                     in self._cr.fetchall()}
+        levels = {level.id: level for level in self.env['followup.line'].browse(
+            {level_id for ids in level_ids.values() for level_id in ids})}
+        date_formats = {lang.code: lang.date_format
+                        for lang in self.env['res.lang'].search([])}
+
+        texts = {}
+        for stat_line in stat_lines:
+            partner_max_delay = 0
+            partner_max_text = ''
+            for level_id in level_ids.get(
+                    (stat_line.partner_id.id, stat_line.company_id.id), []):
+                level = levels[level_id]
+                if level.delay > partner_max_delay and level.description:
+                    partner_max_delay = level.delay
+                    partner_max_text = level.description
+            text = partner_max_delay and partner_max_text or default_text
+            if text:
+                date_format = date_formats.get(stat_line.partner_id.lang) \
+                    or '%Y-%m-%d'
+                text = text % {
+                    'partner_name': stat_line.partner_id.name,
+                    'date': time.strftime(date_format),
+                    'company_name': stat_line.company_id.name,
+                    'user_signature': self.env.user.signature or '',
+                }
+            texts[stat_line.id] = text
+        return texts
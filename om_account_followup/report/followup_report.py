@@ -5,11 +5,15 @@ from odoo import tools
 
 
 class AccountFollowupStat(models.Model):
+    """ Open receivables of the partners per company for the follow-up
+    dashboards, recomputed for the partners and companies of the changed open
+    receivable lines by the triggers of followup.receivable.summary """
     _name = "followup.stat"
     _description = "Follow-up Statistics"
     _rec_name = 'partner_id'
     _order = 'date_move'
     _auto = False
+    _log_access = False
 
     partner_id = fields.Many2one('res.partner', 'Partner', readonly=True)
     date_move = fields.Date('First move', readonly=True)
@@ -22,30 +26,131 @@ class AccountFollowupStat(models.Model):
     company_id = fields.Many2one('res.company', 'Company', readonly=True)
     blocked = fields.Boolean('Blocked', readonly=True)
 
-    @api.model
     def init(self):
-        tools.drop_view_if_exists(self._cr, 'followup_stat')
+        cr = self._cr
+        tools.drop_view_if_exists(cr, 'followup_stat')
+        cr.execute("""
+            CREATE TABLE IF NOT EXISTS followup_stat (
+                id SERIAL PRIMARY KEY,
+                partner_id INTEGER NOT NULL,
+                company_id INTEGER NOT NULL,
+                date_move DATE,
+                date_move_last DATE,
+                date_followup DATE,
+                followup_id INTEGER,
+                debit NUMERIC,
+                credit NUMERIC,
+                balance NUMERIC,
+                blocked BOOLEAN
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS followup_stat_partner_company_index
+                ON followup_stat (partner_id, company_id);
+            CREATE INDEX IF NOT EXISTS followup_stat_company_followup_index
+                ON followup_stat (company_id, followup_id);
+            CREATE INDEX IF NOT EXISTS followup_stat_company_date_move_index
+                ON followup_stat (company_id, date_move);
+
+            DROP TRIGGER IF EXISTS followup_stat_line_insert ON account_move_line;
+            DROP TRIGGER IF EXISTS followup_stat_line_update ON account_move_line;
+            DROP TRIGGER IF EXISTS followup_stat_line_delete ON account_move_line;
+            DROP FUNCTION IF EXISTS followup_stat_line_changed();
+            DROP FUNCTION IF EXISTS followup_stat_refresh(INTEGER[]);
+
+            CREATE OR REPLACE FUNCTION followup_stat_refresh(partner_ids INTEGER[], company_ids INTEGER[])
+            RETURNS void AS $$
+            BEGIN
+                -- the rows are updated in place, only the new pairs are inserted and
+                -- the pairs without open receivable anymore deleted: the ids of the
+                -- statistics stay the same
+                WITH stats AS (
+                     SELECT l.partner_id,
+                            l.company_id,
+                            MIN(l.date) AS date_move,
+                            MAX(l.date) AS date_move_last,
+                            MAX(l.followup_date) AS date_followup,
+                            (ARRAY_AGG(fl.id ORDER BY fl.delay DESC) FILTER (WHERE fl.id IS NOT NULL))[1] AS followup_id,
+                            SUM(l.debit) AS debit,
+                            SUM(l.credit) AS credit,
+                            SUM(l.debit - l.credit) AS balance,
+                            BOOL_OR(COALESCE(l.blocked, FALSE)) AS blocked
+                       FROM account_move_line l
+                       JOIN account_account a ON a.id = l.account_id
+                       JOIN (SELECT DISTINCT k.partner_id, k.company_id
+                               FROM unnest(partner_ids, company_ids) AS k(partner_id, company_id)) AS k
+                         ON k.partner_id = l.partner_id AND k.company_id = l.company_id
+                  LEFT JOIN followup_line fl ON fl.id = l.followup_line_id
+                      WHERE l.full_reconcile_id IS NULL
+                        AND a.account_type = 'asset_receivable'
+                   GROUP BY l.partner_id, l.company_id
+                ), updated AS (
+                     UPDATE followup_stat s
+                        SET date_move = c.date_move,
+                            date_move_last = c.date_move_last,
+                            date_followup = c.date_followup,
+                            followup_id = c.followup_id,
+                            debit = c.debit,
+                            credit = c.credit,
+                            balance = c.balance,
+                            blocked = c.blocked
+                       FROM stats c
+                      WHERE s.partner_id = c.partner_id
+                        AND s.company_id = c.company_id
+                        AND (s.date_move, s.date_move_last, s.date_followup, s.followup_id,
+                             s.debit, s.credit, s.balance, s.blocked)
+                            IS DISTINCT FROM (c.date_move, c.date_move_last, c.date_followup, c.followup_id,
+                                              c.debit, c.credit, c.balance, c.blocked)
+                )
+                INSERT INTO followup_stat (partner_id, company_id, date_move, date_move_last, date_followup,
+                                           followup_id, debit, credit, balance, blocked)
+                     SELECT c.partner_id, c.company_id, c.date_move, c.date_move_last, c.date_followup,
+                            c.followup_id, c.debit, c.credit, c.balance, c.blocked
+                       FROM stats c
+                      WHERE NOT EXISTS (SELECT 1 FROM followup_stat s
+                                         WHERE s.partner_id = c.partner_id AND s.company_id = c.company_id)
+                   ORDER BY c.partner_id, c.company_id
+                -- a pair inserted by a concurrent transaction
+                ON CONFLICT (partner_id, company_id) DO UPDATE
+                        SET date_move = EXCLUDED.date_move,
+                            date_move_last = EXCLUDED.date_move_last,
+                            date_followup = EXCLUDED.date_followup,
+                            followup_id = EXCLUDED.followup_id,
+                            debit = EXCLUDED.debit,
+                            credit = EXCLUDED.credit,
+                            balance = EXCLUDED.balance,
+                            blocked = EXCLUDED.blocked;
+                DELETE FROM followup_stat s
+                 USING unnest(partner_ids, company_ids) AS k(partner_id, company_id)
+                 WHERE s.partner_id = k.partner_id
+                   AND s.company_id = k.company_id
+                   AND NOT EXISTS (SELECT 1
+                                     FROM account_move_line l
+                                     JOIN account_account a ON a.id = l.account_id
+                                    WHERE l.partner_id = s.partner_id
+                                      AND l.company_id = s.company_id
+                                      AND l.full_reconcile_id IS NULL
+                                      AND a.account_type = 'asset_receivable');
+            END
+            $$ LANGUAGE plpgsql;
+        """)
+        self._rebuild()
+
+    @api.model
+    def _flush_search(self, domain, fields=None, order=None, seen=None):
+        # the statistics are updated by the triggers when the lines are flushed
+        self.env['account.move.line'].flush_model()
+        return super(AccountFollowupStat, self)._flush_search(
+            domain, fields=fields, order=order, seen=seen)
+
+    @api.model
+    def _rebuild(self):
+        """ Recompute the statistics of all the partners """
         self._cr.execute("""
-            create or replace view followup_stat as (
-                SELECT
-                    l.id as id,
-                    l.partner_id AS partner_id,
-                    min(l.date) AS date_move,
-                    max(l.date) AS date_move_last,
-                    max(l.followup_date) AS date_followup,
-                    max(l.followup_line_id) AS followup_id,
-                    sum(l.debit) AS debit,
-                    sum(l.credit) AS credit,
-                    sum(l.debit - l.credit) AS balance,
-                    l.company_id AS company_id,
-                    l.blocked as blocked
-                FROM
-                    account_move_line l
-                    LEFT JOIN account_account a ON (l.account_id = a.id)
-                WHERE
-                    a.account_type =  'asset_receivable' AND
-                    l.full_reconcile_id is NULL AND
-                    l.partner_id IS NOT NULL
-                GROUP BY
-                    l.id, l.partner_id, l.company_id, l.blocked
-            )""")
+            TRUNCATE followup_stat;
+            SELECT followup_stat_refresh(array_agg(k.partner_id), array_agg(k.company_id))
+              FROM (SELECT DISTINCT l.partner_id, l.company_id
+                      FROM account_move_line l
+                      JOIN account_account a ON a.id = l.account_id
+                     WHERE l.partner_id IS NOT NULL
+                       AND l.full_reconcile_id IS NULL
+                       AND a.account_type = 'asset_receivable') AS k;
+        """)
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+from . import test_followup_incremental
+from . import test_followup_stat
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+from datetime import date, timedelta
+
+from odoo.tests import tagged
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+
+@tagged('post_install', '-at_install')
+class TestFollowupIncremental(AccountTestInvoicingCommon):
+
+    @classmethod
+    def setUpClass(cls, chart_template_ref=None):
+        super().setUpClass(chart_template_ref=chart_template_ref)
+        cls.followup = cls.env['followup.followup'].create({
+            'company_id': cls.company_data['company'].id,
+            'followup_line': [
+                (0, 0, {'name': 'First reminder', 'delay': 10,
+                        'send_email': False, 'send_letter': False}),
+                (0, 0, {'name': 'Second reminder', 'delay': 30,
+                        'send_email': False, 'send_letter': False}),
+            ],
+        })
+        cls.first_level, cls.second_level = cls.followup.followup_line.sorted('delay')
+        cls.partner_a, cls.partner_b, cls.partner_c = cls.env['res.partner'].create([
+            {'name': 'Follow-up A'}, {'name': 'Follow-up B'}, {'name': 'Follow-up C'},
+        ])
+        cls.invoice_a = cls.init_invoice('out_invoice', cls.partner_a, '2026-01-01',
+                                         post=True, amounts=[100.0])
+        cls.invoice_b = cls.init_invoice('out_invoice', cls.partner_b, '2026-01-15',
+                                         post=True, amounts=[200.0])
+
+    def _receivable_line(self, invoice):
+        return invoice.line_ids.filtered(
+            lambda line: line.account_id.account_type == 'asset_receivable')
+
+    def _get_wizard(self, sending_date, full_run=False):
+        stats = self.env['followup.stat.by.partner'].search([
+            ('partner_id', 'in', (self.partner_a | self.partner_b | self.partner_c).ids),
+        ])
+        return self.env['followup.print'].create({
+            'followup_id': self.followup.id,
+            'date': sending_date,
+            'partner_ids': [(6, 0, stats.ids)],
+            'full_run': full_run,
+        })
+
+    def _set_write_date(self, lines, write_date):
+        self.env['account.move.line'].flush_model()
+        self.env.cr.execute('UPDATE account_move_line SET write_date = %s WHERE id IN %s',
+                            (write_date, tuple(lines.ids)))
+        lines.invalidate_recordset(['write_date'])
+
+    def test_incremental_run_matches_full_run(self):
+        line_a = self._receivable_line(self.invoice_a)
+        line_b = self._receivable_line(self.invoice_b)
+
+        self._get_wizard(date(2026, 1, 20)).do_process()
+        self.assertEqual(self.followup.last_run_date, date(2026, 1, 20))
+        self.assertLessEqual(self.followup.last_run_time, self.env.cr.now())
+        self.assertEqual(line_a.followup_line_id, self.first_level)
+        self.assertFalse(line_b.followup_line_id)
+
+        # the lines were read by the last processing two days ago
+        last_run_time = self.env.cr.now() - timedelta(days=2)
+        self.followup.last_run_time = last_run_time
+        self._set_write_date(self.env['account.move.line'].search([]),
+                             last_run_time - timedelta(days=1))
+        # a transaction started before the last processing and committed after
+        # it reset the level of a line already overdue at the last sending date
+        self.env['account.move.line'].flush_model()
+        self.env.cr.execute('UPDATE account_move_line SET followup_line_id = NULL WHERE id = %s',
+                            (line_a.id,))
+        self._set_write_date(line_a, last_run_time - timedelta(minutes=10))
+        # a line created since then, already overdue at the last sending date
+        invoice_c = self.init_invoice('out_invoice', self.partner_c, '2025-12-01',
+                                      post=True, amounts=[300.0])
+        line_c = self._receivable_line(invoice_c)
+
+        incremental = self._get_wizard(date(2026, 1, 28))._get_partners_followp()
+        full = self._get_wizard(date(2026, 1, 28), full_run=True)._get_partners_followp()
+        self.assertEqual(incremental['to_update'], full['to_update'])
+        self.assertEqual(sorted(incremental['partner_ids']), sorted(full['partner_ids']))
+        self.assertEqual(full['to_update'], {
+            str(line_a.id): {'level': self.first_level.id,
+                             'partner_id': self.partner_a.id * 10000 + line_a.company_id.id},
+            str(line_b.id): {'level': self.first_level.id,
+                             'partner_id': self.partner_b.id * 10000 + line_b.company_id.id},
+            str(line_c.id): {'level': self.first_level.id,
+                             'partner_id': self.partner_c.id * 10000 + line_c.company_id.id},
+        })
+
+    def test_receivable_account_change_forces_full_run(self):
+        self._get_wizard(date(2026, 1, 20)).do_process()
+        self.assertTrue(self.followup.last_run_date)
+
+        account = self.env['account.account'].create({
+            'code': '411900', 'name': 'Follow-up Other Receivable', 'account_type': 'asset_current',
+            'company_id': self.company_data['company'].id})
+        account.name = 'Follow-up Other Receivable (renamed)'
+        self.assertTrue(self.followup.last_run_date)
+
+        account.account_type = 'asset_receivable'
+        self.assertFalse(self.followup.last_run_date)
+        self.assertFalse(self.followup.last_run_time)
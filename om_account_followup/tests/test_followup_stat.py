@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests import tagged
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+
+@tagged('post_install', '-at_install')
+class TestFollowupStat(AccountTestInvoicingCommon):
+
+    def _get_stat(self, partner):
+        return self.env['followup.stat'].search([
+            ('partner_id', '=', partner.id), ('company_id', '=', self.company_data['company'].id)])
+
+    def test_stat_updated_in_place(self):
+        partner = self.env['res.partner'].create({'name': 'Follow-up Stat'})
+        first = self.init_invoice('out_invoice', partner, '2026-01-01', post=True, amounts=[100.0])
+        stat = self._get_stat(partner)
+        self.assertEqual(len(stat), 1)
+        self.assertAlmostEqual(stat.balance, first.amount_total)
+
+        second = self.init_invoice('out_invoice', partner, '2026-02-01', post=True, amounts=[50.0])
+        stat.invalidate_recordset()
+        self.assertEqual(self._get_stat(partner), stat)
+        self.assertAlmostEqual(stat.balance, first.amount_total + second.amount_total)
+        self.assertEqual(stat.date_move_last.isoformat(), '2026-02-01')
+
+        # the statistics of a partner without open receivable are removed
+        self.env['account.payment.register'].with_context(
+            active_model='account.move', active_ids=(first | second).ids,
+        ).create({'payment_date': '2026-02-10'})._create_payments()
+        self.assertEqual((first | second).mapped('payment_state'), ['paid', 'paid'])
+        self.assertFalse(self._get_stat(partner))
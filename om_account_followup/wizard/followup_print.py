@@ -1,8 +1,17 @@
 # -*- coding: utf-8 -*-
 
-import datetime
 import time
+from collections import defaultdict
+from datetime import timedelta
+
 from odoo import api, fields, models, _
+from odoo.tools import split_every
+
+# number of move lines updated by one statement
+UPDATE_CHUNK_SIZE = 10000
+# lines written this long before the start of the last processing are
+# evaluated again, for the transactions committed after it read the lines
+INCREMENTAL_MARGIN = timedelta(hours=1)
 
 
 class FollowupPrint(models.TransientModel):
@@ -42,6 +51,12 @@ class FollowupPrint(models.TransientModel):
     test_print = fields.Boolean(
         'Test Print', help='Check if you want to print follow-ups without '
                            'changing follow-up level.')
+    last_run_date = fields.Date(related='followup_id.last_run_date')
+    full_run = fields.Boolean(
+        'Full Recomputation',
+        help='Evaluate all the open receivable lines instead of only the '
+             'lines reaching a new level after the last sending date and the '
+             'lines changed since the last processing.')
 
     def process_partners(self, partner_ids, data):
         partner_obj = self.env['res.partner']
@@ -51,6 +66,7 @@ class FollowupPrint(models.TransientModel):
         nbmails = 0
         nbunknownmails = 0
         nbprints = 0
+        mail_partner_ids = []
         resulttext = " "
         for partner in self.env['followup.stat.by.partner'].browse(
                 partner_ids):
@@ -64,7 +80,7 @@ class FollowupPrint(models.TransientModel):
                 else:
                     manuals[key] = manuals[key] + 1
             if partner.max_followup_id.send_email:
-                nbunknownmails += partner.partner_id.do_partner_mail()
+                mail_partner_ids.append(partner.partner_id.id)
                 nbmails += 1
             if partner.max_followup_id.send_letter:
                 partner_ids_to_print.append(partner.id)
@@ -75,11 +91,20 @@ class FollowupPrint(models.TransientModel):
                                                followup_without_lit.name,
                                                _(" will be sent"))
                 partner.partner_id.message_post(body=message)
+        # the emails are rendered and queued by the follow-up mailing cron
+        mailing = self.env['followup.mailing']
+        mail_partners = partner_obj.browse(mail_partner_ids)
+        if mail_partners:
+            mailing = mailing._queue(mail_partners)
+            nbunknownmails = len([
+                partner for partner, partners_to_email in
+                mail_partners._get_followup_recipients().items()
+                if not partners_to_email])
         if nbunknownmails == 0:
-            resulttext += str(nbmails) + _(" email(s) sent")
+            resulttext += str(nbmails) + _(" email(s) queued")
         else:
             resulttext += str(nbmails) + _(
-                " email(s) should have been sent, but ") + str(
+                " email(s) should have been queued, but ") + str(
                 nbunknownmails) + _(
                 " had unknown email address(es)") + "\n <BR/> "
         resulttext += "<BR/>" + str(nbprints) + _(
@@ -98,32 +123,68 @@ class FollowupPrint(models.TransientModel):
         result['needprinting'] = needprinting
         result['resulttext'] = resulttext
         result['action'] = action or {}
+        result['mailing_id'] = mailing.id
         return result
 
     def do_update_followup_level(self, to_update, partner_list, date):
-        for id in to_update.keys():
-            if to_update[id]['partner_id'] in partner_list:
-                self.env['account.move.line'].browse([int(id)]).write(
-                    {'followup_line_id': to_update[id]['level'],
-                     'followup_date': date})
+        """ Set the new follow-up level of the lines of the processed
+        partners, with one UPDATE per level and chunk of lines """
+        partner_list = set(partner_list)
+        line_ids_by_level = defaultdict(list)
+        for line_id, values in to_update.items():
+            if values['partner_id'] in partner_list:
+                line_ids_by_level[values['level']].append(int(line_id))
+        move_line_obj = self.env['account.move.line']
+        move_line_obj.flush_model(['followup_line_id', 'followup_date'])
+        partner_ids = set()
+        for level, line_ids in line_ids_by_level.items():
+            for chunk in split_every(UPDATE_CHUNK_SIZE, sorted(line_ids)):
+                self._cr.execute('''
+                    UPDATE account_move_line
+                       SET followup_line_id = %s, followup_date = %s,
+                           write_uid = %s, write_date = (now() at time zone 'UTC')
+                     WHERE id IN %s
+                 RETURNING partner_id''', (level, date, self.env.uid, chunk))
+                partner_ids.update(row[0] for row in self._cr.fetchall())
+        move_line_obj.invalidate_model(['followup_line_id', 'followup_date', 'write_uid', 'write_date'])
+        # the stored level of the partners depends on the updated lines
+        partners = self.env['res.partner'].browse(partner_ids)
+        self.env.add_to_compute(partners._fields['latest_followup_level_id_without_lit'], partners)
 
     def clear_manual_actions(self, partner_list):
+        """ Clear the manual actions of the partners not processed and
+        without open receivable anymore, found with one query on the
+        receivable summary and cleared with one write """
         partner_list_ids = [partner.partner_id.id for partner in self.env[
             'followup.stat.by.partner'].browse(partner_list)]
-        ids = self.env['res.partner'].search(
-            ['&', ('id', 'not in', partner_list_ids), '|',
-             ('payment_responsible_id', '!=', False),
-             ('payment_next_action_date', '!=', False)])
-
-        partners_to_clear = []
-        for part in ids:
-            if not part.unreconciled_aml_ids:
-                partners_to_clear.append(part.id)
-                part.action_done()
+        partner_obj = self.env['res.partner']
+        partner_obj.flush_model(['active', 'payment_responsible_id',
+                                 'payment_next_action_date'])
+        self.env['account.move.line'].flush_model()
+        self._cr.execute('''
+            SELECT p.id
+              FROM res_partner p
+             WHERE p.active
+               AND (p.payment_responsible_id IS NOT NULL
+                    OR p.payment_next_action_date IS NOT NULL)
+               AND p.id != ALL(%s)
+               AND NOT EXISTS (SELECT 1
+                                 FROM followup_receivable_summary s
+                                WHERE s.partner_id = p.id)''',
+                         (partner_list_ids,))
+        partners_to_clear = partner_obj.browse(
+            [row[0] for row in self._cr.fetchall()])
+        # access rules of the user still apply
+        partners_to_clear = partners_to_clear._filter_access_rules('write')
+        partners_to_clear.action_done()
         return len(partners_to_clear)
 
     def do_process(self):
         context = dict(self.env.context or {})
+        # the lines updated by this processing and by the transactions it
+        # cannot see are written after this time, they are evaluated again by
+        # the next incremental processing
+        run_time = self._get_run_time()
 
         tmp = self._get_partners_followp()
         partner_list = tmp['partner_ids']
@@ -138,6 +199,8 @@ class FollowupPrint(models.TransientModel):
             partner_list, data)
         context.update(restot_context)
         nbactionscleared = self.clear_manual_actions(partner_list)
+        self.followup_id.sudo().write({'last_run_date': date,
+                                       'last_run_time': run_time})
         if nbactionscleared > 0:
             restot['resulttext'] = restot['resulttext'] + "<li>" + _(
                 "%s partners have no credits and as such the "
@@ -146,6 +209,7 @@ class FollowupPrint(models.TransientModel):
             'om_account_followup.view_om_account_followup_sending_results')
         context.update({'description': restot['resulttext'],
                         'needprinting': restot['needprinting'],
+                        'followup_mailing_id': restot['mailing_id'],
                         'report_data': restot['action']})
         return {
             'name': _('Send Letters and Emails: Actions Summary'),
@@ -161,67 +225,85 @@ class FollowupPrint(models.TransientModel):
     def _get_msg(self):
         return self.env.user.company_id.follow_up_msg
 
+    def _get_run_time(self):
+        """ Start of the oldest transaction running on the database, the
+        lines written by the transactions not committed yet are not visible
+        to this processing and have a later write date """
+        self._cr.execute('''
+            SELECT LEAST(now(), MIN(xact_start)) AT TIME ZONE 'UTC'
+              FROM pg_stat_activity
+             WHERE datname = current_database()''')
+        return self._cr.fetchone()[0]
+
+    def _get_incremental_start(self, followup, date):
+        """ Last processing of the follow-up the lines can be evaluated from
+        incrementally, every line reaching a new level before it was updated
+        by it.
+
+        :return: (last sending date, time the changed lines are evaluated
+                 from), or None when all the lines must be evaluated """
+        if self.full_run or not followup.last_run_date or \
+                not followup.last_run_time or date < followup.last_run_date:
+            return None
+        return (followup.last_run_date,
+                followup.last_run_time - INCREMENTAL_MARGIN)
+
     def _get_partners_followp(self):
-        data = self
-        company_id = data.company_id.id
+        """ Overdue receivable lines reaching the next level of the follow-up
+        at the sending date, resolved in SQL: each line is joined to the level
+        following its current one and kept when its due date is older than the
+        delay of that level.
+
+        After a previous processing, only the lines reaching their next level
+        after its sending date and the lines changed since then can qualify,
+        the others are skipped unless a full recomputation is asked """
+        company_id = self.company_id.id
         context = self.env.context
-        self._cr.execute(
-            '''SELECT
-                    l.partner_id,
-                    l.followup_line_id,
-                    l.date_maturity,
-                    l.date, l.id
-                FROM account_move_line AS l
-                LEFT JOIN account_account AS a
-                ON (l.account_id=a.id)
-                WHERE (l.full_reconcile_id IS NULL)
-                AND a.account_type = 'asset_receivable'
-                AND (l.partner_id is NOT NULL)
-                AND (l.debit > 0)
-                AND (l.company_id = %s)
-                AND (l.blocked = False)
-                ORDER BY l.date''' % (company_id))
-        move_lines = self._cr.fetchall()
-        old = None
-        fups = {}
         fup_id = 'followup_id' in context and context[
-            'followup_id'] or data.followup_id.id
-        date = 'date' in context and context['date'] or data.date
-        date = fields.Date.to_string(date)
-        current_date = datetime.date(*time.strptime(date, '%Y-%m-%d')[:3])
-        self._cr.execute(
-            '''SELECT *
-            FROM followup_line
-            WHERE followup_id=%s
-            ORDER BY delay''' % (fup_id,))
-
-        for result in self._cr.dictfetchall():
-            delay = datetime.timedelta(days=result['delay'])
-            fups[old] = (current_date - delay, result['id'])
-            old = result['id']
-
-        partner_list = []
+            'followup_id'] or self.followup_id.id
+        date = fields.Date.to_date(
+            'date' in context and context['date'] or self.date)
+        incremental_start = self._get_incremental_start(
+            self.env['followup.followup'].browse(fup_id), date)
+        incremental_clause = ''
+        if incremental_start:
+            incremental_clause = '''
+               AND (COALESCE(l.date_maturity, l.date) > %(last_run_date)s::date - lv.delay
+                    OR l.write_date >= %(last_run_time)s)'''
+        self.env['account.move.line'].flush_model(
+            ['partner_id', 'followup_line_id', 'date_maturity', 'date',
+             'full_reconcile_id', 'debit', 'company_id', 'blocked',
+             'write_date'])
+        self._cr.execute('''
+            WITH levels AS (
+                SELECT id, delay, LAG(id) OVER (ORDER BY delay) AS previous_id
+                  FROM followup_line
+                 WHERE followup_id = %(followup_id)s
+            )
+            SELECT l.id, l.partner_id * 10000 + l.company_id, lv.id
+              FROM account_move_line AS l
+              JOIN account_account AS a ON (l.account_id = a.id)
+              JOIN levels AS lv
+                ON (lv.previous_id IS NOT DISTINCT FROM l.followup_line_id)
+             WHERE l.full_reconcile_id IS NULL
+               AND a.account_type = 'asset_receivable'
+               AND l.partner_id IS NOT NULL
+               AND l.debit > 0
+               AND l.company_id = %(company_id)s
+               AND l.blocked = False
+               AND COALESCE(l.date_maturity, l.date) <= %(date)s::date - lv.delay
+               {incremental_clause}
+          ORDER BY l.date'''.format(incremental_clause=incremental_clause), {
+            'followup_id': fup_id,
+            'company_id': company_id,
+            'date': date,
+            'last_run_date': incremental_start and incremental_start[0],
+            'last_run_time': incremental_start and incremental_start[1],
+        })
+        partner_list = {}
         to_update = {}
-
-        for partner_id, followup_line_id, date_maturity, date, id in \
-                move_lines:
-            if not partner_id:
-                continue
-            if followup_line_id not in fups:
-                continue
-            stat_line_id = partner_id * 10000 + company_id
-            if date_maturity:
-                date_maturity = fields.Date.to_string(date_maturity)
-                if date_maturity <= fups[followup_line_id][0].strftime(
-                        '%Y-%m-%d'):
-                    if stat_line_id not in partner_list:
-                        partner_list.append(stat_line_id)
-                    to_update[str(id)] = {'level': fups[followup_line_id][1],
-                                          'partner_id': stat_line_id}
-            elif date and date <= fups[followup_line_id][0].strftime(
-                    '%Y-%m-%d'):
-                if stat_line_id not in partner_list:
-                    partner_list.append(stat_line_id)
-                to_update[str(id)] = {'level': fups[followup_line_id][1],
-                                      'partner_id': stat_line_id}
-        return {'partner_ids': partner_list, 'to_update': to_update}
+        for line_id, stat_line_id, level_id in self._cr.fetchall():
+            partner_list[stat_line_id] = True
+            to_update[str(line_id)] = {'level': level_id,
+                                       'partner_id': stat_line_id}
+        return {'partner_ids': list(partner_list), 'to_update': to_update}
@@ -19,5 +19,11 @@ class FollowupSendingResults(models.TransientModel):
     def _get_need_printing(self):
         return self.env.context.get('needprinting')
 
+    def _get_mailing(self):
+        return self.env.context.get('followup_mailing_id')
+
     description = fields.Text("Description", readonly=True,default=_get_description)
     needprinting = fields.Boolean("Needs Printing", default=_get_need_printing)
+    mailing_id = fields.Many2one('followup.mailing', "Mailing", readonly=True, default=_get_mailing)
+    mailing_state = fields.Selection(related='mailing_id.state', string="Mailing Status")
+    mailing_progress = fields.Float(related='mailing_id.progress', string="Emails Progress")
@@ -2,4 +2,5 @@
 
 from . import account_fiscal_year
 from . import account_settings
+from . import fiscal_calendar
 from . import res_company
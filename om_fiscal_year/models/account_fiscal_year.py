@@ -48,3 +48,19 @@ class AccountFiscalYear(models.Model):
             if self.search_count(domain) > 0:
                 raise ValidationError(_('You can not have an overlap between two fiscal years, '
                                         'please correct the start and/or end dates of your fiscal years.'))
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        fiscal_years = super(AccountFiscalYear, self).create(vals_list)
+        self.env['account.fiscal.calendar']._invalidate()
+        return fiscal_years
+
+    def write(self, vals):
+        res = super(AccountFiscalYear, self).write(vals)
+        self.env['account.fiscal.calendar']._invalidate()
+        return res
+
+    def unlink(self):
+        res = super(AccountFiscalYear, self).unlink()
+        self.env['account.fiscal.calendar']._invalidate()
+        return res
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+import bisect
+from datetime import timedelta
+
+from odoo import api, models, tools
+from odoo.tools import date_utils
+
+
+class AccountFiscalCalendar(models.AbstractModel):
+    """ Resolution of the fiscal year of a date for a company.
+
+        The fiscal years of a company and its fiscal year end are loaded once
+        into ranges sorted by start date and searched with bisect. The index
+        is cleared when a fiscal year or the fiscal year end of a company changes.
+    """
+    _name = 'account.fiscal.calendar'
+    _description = 'Fiscal Calendar'
+
+    @api.model
+    @tools.ormcache('company_id')
+    def _get_fiscal_year_index(self, company_id):
+        self.env['account.fiscal.year'].flush_model(['date_from', 'date_to', 'company_id'])
+        self.env.cr.execute("""
+            SELECT date_from, date_to
+              FROM account_fiscal_year
+             WHERE company_id = %s
+          ORDER BY date_from
+        """, (company_id,))
+        ranges = tuple(self.env.cr.fetchall())
+        company = self.env['res.company'].sudo().browse(company_id)
+        return (tuple(date_from for date_from, date_to in ranges), ranges,
+                company.fiscalyear_last_day, int(company.fiscalyear_last_month))
+
+    @api.model
+    def get_fiscal_year(self, company, day):
+        """ :return: (date_from, date_to) of the fiscal year of ``company`` containing ``day`` """
+        starts, ranges, last_day, last_month = self._get_fiscal_year_index(company.id)
+        index = bisect.bisect_right(starts, day) - 1
+        if index >= 0 and day <= ranges[index][1]:
+            return ranges[index]
+        date_from, date_to = date_utils.get_fiscal_year(day, day=last_day, month=last_month)
+        # outside the fiscal years, the default year is cut at the neighbouring ones
+        if index >= 0:
+            date_from = max(date_from, ranges[index][1] + timedelta(days=1))
+        if index + 1 < len(ranges):
+            date_to = min(date_to, ranges[index + 1][0] - timedelta(days=1))
+        return date_from, date_to
+
+    @api.model
+    def _invalidate(self):
+        self.clear_caches()
@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 
+from datetime import datetime, time
+
 from odoo import api, fields, models, _
 from odoo.exceptions import RedirectWarning, ValidationError
 
@@ -7,6 +9,22 @@ from odoo.exceptions import RedirectWarning, ValidationError
 class ResCompany(models.Model):
     _inherit = 'res.company'
 
+    def compute_fiscalyear_dates(self, current_date):
+        """ Fiscal year containing ``current_date``, from the fiscal years of the
+        company when one covers it and from its fiscal year end otherwise """
+        self.ensure_one()
+        date_from, date_to = self.env['account.fiscal.calendar'].get_fiscal_year(
+            self, fields.Date.to_date(current_date))
+        if isinstance(current_date, datetime):
+            date_from, date_to = datetime.combine(date_from, time.min), datetime.combine(date_to, time.min)
+        return {'date_from': date_from, 'date_to': date_to}
+
+    def write(self, values):
+        res = super(ResCompany, self).write(values)
+        if 'fiscalyear_last_day' in values or 'fiscalyear_last_month' in values:
+            self.env['account.fiscal.calendar']._invalidate()
+        return res
+
     # RedirectWarning is changed with validation error to remove error of missing reconciliation view
     def _validate_fiscalyear_lock(self, values):
         if values.get('fiscalyear_lock_date'):